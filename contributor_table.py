@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 10:21:54 2026
+
+The contributors of the app as one table (first name, last name, affiliation,
+ORCID, ROR ID and the position), so many people can be changed, added, removed
+or put in another order at once and saved in one go.
+
+The table editor of streamlit keeps what was changed (edited rows, added rows,
+deleted rows), only those rows are checked and looked up again when saving:
+a row whose name changed and has no ORCID gets one if the ORCID search finds
+exactly one person, a row whose affiliation changed gets the ROR ID of the
+organization with exactly that name. The other rows are taken over as they are,
+so saving a change in a list of 300 people does one or two lookups, not 300.
+Nothing is saved while a changed row has a problem.
+"""
+
+import math
+import re
+
+import pandas as pd
+
+from keyword_vocabulary import term_key
+from metadata_model import ORCID_PATTERN, split_name
+
+
+TABLE_COLUMNS = ['position', 'first_name', 'last_name', 'affiliation', 'orcid', 'ror_id']
+#ROR IDs are 9 characters starting with 0, also accepted as the full https://ror.org/... link
+ROR_PATTERN = r'^0[a-z0-9]{6}\d{2}$'
+
+
+def _text(value) -> str:
+    #cells that were emptied come back as None (or NaN)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value).strip()
+
+
+def _position(value):
+    try:
+        position = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(position) else position
+
+
+def to_row(contrib: dict, position: int) -> dict:
+    first, last = split_name(contrib.get('name', ''))
+    return {'position': position,
+            'first_name': first,
+            'last_name': last,
+            'affiliation': contrib.get('affiliation', ''),
+            'orcid': (contrib.get('orcid_data') or {}).get('orcid_id', ''),
+            'ror_id': (contrib.get('ror_data') or {}).get('ror_id', '')}
+
+
+def to_table(contributors: list, rows=None) -> pd.DataFrame:
+    #rows: the contributors to show (a page or the search results), all by default
+    rows = range(len(contributors)) if rows is None else rows
+    return pd.DataFrame([to_row(contributors[i], i + 1) for i in rows], columns=TABLE_COLUMNS)
+
+
+def count_changes(changes: dict) -> int:
+    #rows changed, added or deleted in the table editor (its session state)
+    changes = changes or {}
+    return len(changes.get('edited_rows', {})) + len(changes.get('added_rows', [])) + len(changes.get('deleted_rows', []))
+
+
+def _check(label: str, row: dict) -> list:
+    problems = []
+    if not row['first_name'] or not row['last_name']:
+        problems.append(f"{label}: first and last name are needed")
+    if row['orcid'] and not re.match(ORCID_PATTERN, row['orcid']):
+        problems.append(f"{label}: {row['orcid']} is not an ORCID (format: 0000-0000-0000-0000)")
+    if row['ror_id'] and not re.match(ROR_PATTERN, row['ror_id']):
+        problems.append(f"{label}: {row['ror_id']} is not a ROR ID (e.g. 00pc48d59)")
+    return problems
+
+
+def _ror_match(affiliation: str, results: list) -> dict:
+    #only an organization with exactly this name (or other name) is taken without asking
+    key = term_key(affiliation)
+    for result in results or []:
+        if key in {term_key(name) for name in [result.get('name', '')] + result.get('aliases', [])}:
+            return result
+    return {}
+
+
+def _resolve(label: str, row: dict, edited: set, old: dict, find_orcid, find_ror, found: dict, notes: list) -> dict:
+    #the contributor of a changed row, the ORCID/ROR data is kept where the ID didn't change
+    old = old or {}
+    name = f"{row['first_name']} {row['last_name']}"
+    contrib = {'name': name, 'affiliation': row['affiliation']}
+
+    old_orcid = old.get('orcid_data') or {}
+    if row['orcid']:
+        if row['orcid'] == old_orcid.get('orcid_id'):
+            contrib['orcid_data'] = old_orcid
+        else:
+            contrib['orcid_data'] = {'orcid_id': row['orcid'], 'given_names': row['first_name'],
+                                     'family_name': row['last_name'], 'institution': '', 'display_name': name}
+    elif find_orcid and 'orcid' not in edited and name != old.get('name'):
+        #a new person or another name, an ORCID that was emptied on purpose stays empty
+        key = ('orcid', term_key(row['first_name']), term_key(row['last_name']))
+        if key not in found:
+            found[key] = find_orcid(row['first_name'], row['last_name'])
+        if len(found[key]) == 1:
+            contrib['orcid_data'] = found[key][0]
+            notes.append(f"{label}: ORCID {found[key][0]['orcid_id']} found for {name}")
+            if not contrib['affiliation'] and found[key][0].get('institution'):
+                contrib['affiliation'] = found[key][0]['institution']
+
+    old_ror = old.get('ror_data') or {}
+    affiliation_changed = contrib['affiliation'] != old.get('affiliation', '')
+    if row['ror_id'] and ('ror_id' in edited or not affiliation_changed):
+        if row['ror_id'] == old_ror.get('ror_id'):
+            contrib['ror_data'] = old_ror
+        else:
+            contrib['ror_data'] = {'ror_id': row['ror_id'], 'name': contrib['affiliation'], 'country': 'N/A', 'aliases': []}
+    elif find_ror and contrib['affiliation'] and affiliation_changed:
+        key = ('ror', term_key(contrib['affiliation']))
+        if key not in found:
+            found[key] = _ror_match(contrib['affiliation'], find_ror(contrib['affiliation']))
+        if found[key]:
+            contrib['ror_data'] = found[key]
+            notes.append(f"{label}: ROR ID {found[key]['ror_id']} for {contrib['affiliation']}")
+        else:
+            notes.append(f"{label}: no organization called {contrib['affiliation']} in ROR, "
+                         "use the ROR lookup of the form or enter the ROR ID in the table")
+    return contrib
+
+
+def apply_changes(contributors: list, changes: dict, find_orcid=None, find_ror=None, rows=None) -> tuple:
+    #the table editor changes on the contributor list -> (new list, problems, notes)
+    #problems: nothing is changed, notes: what was looked up
+    #find_orcid(first, last) and find_ror(affiliation) return the lookup results of the app
+    #rows: the contributors that were in the table (as for to_table), added rows go at the end
+    changes = changes or {}
+    rows = list(range(len(contributors)) if rows is None else rows)
+    deleted = {rows[int(i)] for i in changes.get('deleted_rows', [])}
+    edited_rows = {rows[int(i)]: values for i, values in changes.get('edited_rows', {}).items()}
+
+    #(position, before/at/after the row there, order, contributor), the rows that weren't touched keep theirs
+    kept, dirty = [], []
+    for i, contrib in enumerate(contributors):
+        if i in deleted:
+            continue
+        if i in edited_rows:
+            dirty.append((f"Row {i + 1}", {**to_row(contrib, i + 1), **edited_rows[i]}, set(edited_rows[i]), contrib, i))
+        else:
+            kept.append((i + 1, 1, i, contrib))
+    for j, values in enumerate(changes.get('added_rows', [])):
+        row = {**dict.fromkeys(TABLE_COLUMNS), **values}
+        dirty.append((f"New row {j + 1}", row, set(values), None, len(contributors) + j))
+
+    problems = []
+    for label, row, _, _, _ in dirty:
+        for column in TABLE_COLUMNS[1:]:
+            row[column] = _text(row[column])
+        row['ror_id'] = row['ror_id'].replace('https://ror.org/', '')
+        problems += _check(label, row)
+    if problems:
+        return contributors, problems, []
+
+    found, notes = {}, []
+    for label, row, edited, old, order in dirty:
+        contrib = _resolve(label, row, edited, old, find_orcid, find_ror, found, notes)
+        position = _position(row['position'])
+        #a row moved up (or a new row) goes before the one that is at that position now,
+        #a row moved down after it, so it ends up at the position either way
+        if position is None:
+            position, side = math.inf, 1
+        elif 'position' not in edited:
+            side = 1
+        else:
+            side = 2 if old is not None and position > order + 1 else 0
+        kept.append((position, side, order, contrib))
+    kept.sort(key=lambda entry: entry[:3])
+    return [contrib for _, _, _, contrib in kept], [], notes
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 09:04:31 2026
+
+Coordinates in other formats -> WGS84 decimal degrees (what DataCite wants).
+Accepted: Swiss LV95 (2 600 000 / 1 200 000), Swiss LV03 (600 000 / 200 000),
+degrees minutes seconds (46°57'08"N, 46 57 8.2 N, 46°57.14'N) and decimal degrees.
+Which one it is is worked out from the values, and so is the order of the
+Swiss grid numbers (east/north or north/east) and of DMS with N/S/E/W letters.
+Decimal degrees are always read as latitude, longitude.
+
+Everything works on whole columns at once (numpy), for the uploaded tables,
+convert_point does one point for the forms. DMS text is read with one regular
+expression over the whole column (not one call per row), each different value
+once.
+
+The Swiss grid formulas are the approximate ones from swisstopo
+(accurate to about 1 m, plenty for sampling sites):
+https://www.swisstopo.admin.ch/en/maps-data-online/calculation-services.html
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+WGS84 = "WGS84"
+LV95 = "LV95"
+LV03 = "LV03"
+DMS = "DMS"
+#index = the code used while converting
+SYSTEMS = np.array(["", WGS84, LV95, LV03, DMS])
+_CODES = {name: code for code, name in enumerate(SYSTEMS.tolist())}
+
+#ranges of the Swiss grids, east and north (covers Switzerland with a margin)
+LV95_EAST = (2_450_000, 2_850_000)
+LV95_NORTH = (1_050_000, 1_320_000)
+LV03_EAST = (450_000, 850_000)
+LV03_NORTH = (50_000, 320_000)
+
+#degrees, minutes, seconds, any separators, sign or N/S/E/W
+#(within one line, whitespace is [^\S\n]), see parse_dms
+DMS_PATTERN = (r'^[^\S\n]*(?P<hemi1>[NSEWnsew])?[^\S\n]*(?P<sign>[-+])?[^\S\n]*(?P<deg>\d+(?:[.,]\d+)?)'
+               r'(?:[^\d.,\n]+(?P<min>\d+(?:[.,]\d+)?))?(?:[^\d.,\n]+(?P<sec>\d+(?:[.,]\d+)?))?'
+               r'[^\dNSEWnsew\n]*(?P<hemi2>[NSEWnsew])?[^\S\n]*$')
+#one match per line of a joined column, all groups empty where the line isn't DMS
+_DMS_LINES = re.compile(r'^(?:' + DMS_PATTERN[1:-1] + r'|.*)$', re.MULTILINE)
+
+
+def _numbers(values):
+    #column -> (float array, the column as text or None if it was numbers already)
+    array = np.asarray(values)
+    if array.dtype.kind in 'iuf':
+        return array.astype(float), None
+    text = pd.Series(array, dtype="object")
+    try:
+        #all plain numbers as text, numpy reads them without pandas' checks per row
+        return text.to_numpy().astype(float), text
+    except (TypeError, ValueError):
+        pass
+    numbers = pd.to_numeric(text, errors='coerce')
+    #decimal commas (46,951) only where plain reading failed
+    retry = numbers.isna() & text.astype(str).str.contains(',', regex=False)
+    if retry.any():
+        numbers[retry] = pd.to_numeric(text[retry].astype(str).str.replace(',', '.', regex=False), errors='coerce')
+    return numbers.to_numpy(dtype=float), text
+
+
+def _in_range(values, bounds):
+    return (values >= bounds[0]) & (values <= bounds[1])
+
+
+def swiss_to_wgs84(east, north, system=LV95):
+    #LV95 or LV03 east/north (arrays) -> latitude, longitude arrays
+    east = np.asarray(east, dtype=float)
+    north = np.asarray(north, dtype=float)
+    if system == LV95:
+        y = (east - 2_600_000) / 1e6
+        x = (north - 1_200_000) / 1e6
+    else:
+        y = (east - 600_000) / 1e6
+        x = (north - 200_000) / 1e6
+    #in 10000" units, then to degrees
+    #(products instead of ** 3, numpy's pow is slow on big arrays)
+    x2 = x * x
+    y2 = y * y
+    lon = y * (4.728982 + 0.791484 * x + 0.1306 * x2 - 0.0436 * y2) + 2.6779094
+    lat = 16.9023892 + x * (3.238272 - 0.002528 * x - 0.0140 * x2) - y2 * (0.270978 + 0.0447 * x)
+    return lat * (100 / 36), lon * (100 / 36)
+
+
+def parse_dms(values):
+    #strings (or numbers) -> (decimal degrees, hemisphere letter) arrays
+    #NaN where it isn't a coordinate, hemisphere '' when there is no letter
+    #logger files repeat the same few positions, each different text is read once
+    rows, texts = pd.factorize(np.array([str(value) for value in pd.Series(values, dtype="object")], dtype=object))
+    texts = texts.tolist()
+    if not texts:
+        return np.full(len(rows), np.nan), np.full(len(rows), '')
+    #the whole column in one findall, decimal commas are decimal points in every part of the pattern
+    #and the hemisphere letters are wanted in capitals anyway
+    joined = '\n'.join(texts)
+    if joined.count('\n') != len(texts) - 1:
+        joined = '\n'.join(text.replace('\n', ' ') for text in texts)
+    parts = np.array(_DMS_LINES.findall(joined.replace(',', '.').upper()), dtype=str)
+    hemi1, sign, deg, minute, second, hemi2 = parts.T
+
+    def number(column):
+        return np.where(column == '', 'nan', column).astype(float)
+
+    degrees = number(deg)
+    minutes = np.nan_to_num(number(minute))
+    seconds = np.nan_to_num(number(second))
+    decimal = degrees + minutes / 60 + seconds / 3600
+    #minutes/seconds over 60 means it wasn't DMS after all
+    decimal[(minutes >= 60) | (seconds >= 60)] = np.nan
+
+    hemisphere = np.where(hemi1 != '', hemi1, hemi2)
+    negative = (sign == '-') | np.isin(hemisphere, ['S', 'W'])
+    decimal[negative] *= -1
+    return decimal[rows], hemisphere[rows]
+
+
+def to_wgs84(first, second, system="auto"):
+    #two columns of coordinates -> latitude, longitude and the detected system per row
+    #first/second can be numbers or text (DMS); decimal degrees are always (latitude, longitude),
+    #Swiss grid values and DMS with N/S/E/W letters are taken in either order
+    #rows that can't be read get NaN and an empty system
+    a, first_text = _numbers(first)
+    b, second_text = _numbers(second)
+
+    lat = np.full(len(a), np.nan)
+    lon = np.full(len(a), np.nan)
+    codes = np.zeros(len(a), dtype=np.int8)
+    numeric = ~np.isnan(a) & ~np.isnan(b)
+
+    for grid, east_range, north_range in ((LV95, LV95_EAST, LV95_NORTH), (LV03, LV03_EAST, LV03_NORTH)):
+        if system not in ("auto", grid):
+            continue
+        east_first = numeric & (codes == 0) & _in_range(a, east_range) & _in_range(b, north_range)
+        north_first = numeric & (codes == 0) & _in_range(b, east_range) & _in_range(a, north_range)
+        east = np.where(north_first, b, a)
+        north = np.where(north_first, a, b)
+        rows = east_first | north_first
+        lat[rows], lon[rows] = swiss_to_wgs84(east[rows], north[rows], grid)
+        codes[rows] = _CODES[grid]
+
+    if system in ("auto", WGS84):
+        rows = numeric & (codes == 0) & (np.abs(a) <= 90) & (np.abs(b) <= 180)
+        lat[rows], lon[rows] = a[rows], b[rows]
+        codes[rows] = _CODES[WGS84]
+
+    if system in ("auto", DMS):
+        rows = (codes == 0) & ~numeric
+        if rows.any() and first_text is not None and second_text is not None:
+            dms_a, hemi_a = parse_dms(first_text[rows])
+            dms_b, hemi_b = parse_dms(second_text[rows])
+            #longitude first if the letters say so (7°26'E 46°57'N)
+            swap = np.isin(hemi_a, ['E', 'W']) | np.isin(hemi_b, ['N', 'S'])
+            row_lat = np.where(swap, dms_b, dms_a)
+            row_lon = np.where(swap, dms_a, dms_b)
+            ok = ~np.isnan(row_lat) & ~np.isnan(row_lon) & (np.abs(row_lat) <= 90) & (np.abs(row_lon) <= 180)
+            indices = np.flatnonzero(rows)[ok]
+            lat[indices], lon[indices] = row_lat[ok], row_lon[ok]
+            codes[indices] = _CODES[DMS]
+
+    return lat, lon, SYSTEMS[codes]
+
+
+def convert_point(first: str, second: str):
+    #one point from a form -> (latitude, longitude, system), ValueError if it can't be read
+    lat, lon, systems = to_wgs84([first], [second])
+    if not systems[0]:
+        raise ValueError(f"'{first}', '{second}' are not coordinates in WGS84, LV95, LV03 or degrees/minutes/seconds")
+    return round(float(lat[0]), 6), round(float(lon[0]), 6), systems[0]
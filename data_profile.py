@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 14:36:52 2026
+
+Reading the coverage out of the data files themselves, instead of typing the
+dates and coordinates by hand: first/last time stamp, the periods with data
+(a gap of more than a day starts a new period, for campaigns and deployments),
+the area of the lat/lon values, the variable names and the number of rows.
+
+CSV files are read in chunks and NetCDF variables slice by slice, only the
+running min/max are kept, so the memory use stays the same for a file of a few
+MB or a few GB.
+
+NetCDF needs netCDF4 (all NetCDF files) or scipy (classic NetCDF 3 files, memory
+mapped), whichever is installed:
+    pip install netCDF4
+
+From the terminal:
+    python data_profile.py data/*.csv data/profiles.nc
+    python data_profile.py data_folder
+"""
+
+import argparse
+import csv
+import glob
+import io
+import os
+import re
+import sys
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from coordinates import DMS, WGS84, to_wgs84
+from geometry import bounding_box
+from lake_gazetteer import get_gazetteer
+from metadata_time import PERIOD_GAP_SECONDS, intervals_from_timestamps, merge_intervals, parse_instant
+
+#optional, for NetCDF files
+try:
+    import netCDF4
+except ImportError:
+    netCDF4 = None
+try:
+    from scipy.io import netcdf_file
+except ImportError:
+    netcdf_file = None
+
+
+#rows per CSV chunk / values per NetCDF slice
+CHUNK_ROWS = 200_000
+#bytes looked at to guess the CSV separator
+SNIFF_BYTES = 64 * 1024
+#collection periods kept before merging them again (memory stays bounded)
+MAX_PENDING_PERIODS = 10_000
+
+TIME_COLUMNS = ('datetime', 'date_time', 'timestamp', 'time', 'date', 'datum', 'zeit', 'time_utc', 'datetime_utc')
+#only columns that can't be anything but degrees (x/y, e/n, east/north are often model or grid axes)
+LATITUDE_COLUMNS = ('latitude', 'lat', 'pointlatitude')
+LONGITUDE_COLUMNS = ('longitude', 'lon', 'lng', 'long', 'pointlongitude')
+#share of the rows with coordinates that have to be degrees in range before the location is filled in
+MIN_COORDINATE_SHARE = 0.95
+#numbers in a time column are unix seconds only between these (a counter or 20240131 isn't a time)
+EPOCH_SECONDS_RANGE = (datetime(1971, 1, 1, tzinfo=timezone.utc).timestamp(),
+                       datetime(2100, 1, 1, tzinfo=timezone.utc).timestamp())
+NETCDF_EXTENSIONS = ('.nc', '.nc4', '.netcdf', '.cdf')
+DATA_EXTENSIONS = ('.csv', '.txt', '.tsv', '.dat') + NETCDF_EXTENSIONS
+
+#"days since 2000-01-01 00:00:00" -> seconds per unit
+TIME_UNITS = {'seconds': 1, 'second': 1, 'secs': 1, 'sec': 1, 's': 1,
+              'minutes': 60, 'minute': 60, 'mins': 60, 'min': 60,
+              'hours': 3600, 'hour': 3600, 'hrs': 3600, 'hr': 3600, 'h': 3600,
+              'days': 86400, 'day': 86400, 'd': 86400}
+TIME_UNITS_PATTERN = re.compile(r'^\s*(?P<unit>\w+)\s+since\s+(?P<epoch>.+?)\s*(?:UTC|GMT)?\s*$', re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class DataProfile:
+    path: str
+    kind: str  #'csv' or 'netcdf'
+    rows: int = 0
+    variables: list = field(default_factory=list)
+    start: datetime | None = None
+    end: datetime | None = None
+    #(west, east, south, north)
+    box: tuple | None = None
+    #[(start, end)] datetimes of the periods with data, sorted
+    periods: list = field(default_factory=list)
+    #why something wasn't filled in (a time or coordinate column that didn't look right)
+    notes: list = field(default_factory=list)
+
+    def period_dates(self) -> list:
+        #the periods as {'start': 'YYYY-MM-DD', 'end': 'YYYY-MM-DD'} (collection_periods in the front ends)
+        return [{'start': f"{start:%Y-%m-%d}", 'end': f"{end:%Y-%m-%d}"} for start, end in self.periods]
+
+    def location(self):
+        #(lake name or '', latitude, longitude) of the middle of the area, None without coordinates
+        if self.box is None:
+            return None
+        west, east, south, north = self.box
+        latitude, longitude = round((south + north) / 2, 6), round((west + east) / 2, 6)
+        match = get_gazetteer().locate(latitude, longitude)
+        return (match.lake.name if match else ''), latitude, longitude
+
+
+def merge_profiles(profiles) -> DataProfile:
+    #several files of one dataset -> one profile covering all of them
+    profiles = list(profiles)
+    if not profiles:
+        raise ValueError("No data files")
+    merged = replace(profiles[0], variables=list(profiles[0].variables), notes=list(profiles[0].notes))
+    periods = [period for profile in profiles for period in profile.periods]
+    if periods:
+        starts, ends = np.array([[start.timestamp(), end.timestamp()] for start, end in periods]).T
+        starts, ends, _ = merge_intervals(starts, ends, PERIOD_GAP_SECONDS)
+        merged.periods = [(_datetime(start), _datetime(end)) for start, end in zip(starts, ends)]
+    for profile in profiles[1:]:
+        merged.path = f"{merged.path}, {profile.path}"
+        merged.rows += profile.rows
+        merged.variables += [v for v in profile.variables if v not in merged.variables]
+        merged.notes += profile.notes
+        starts = [t for t in (merged.start, profile.start) if t is not None]
+        ends = [t for t in (merged.end, profile.end) if t is not None]
+        merged.start = min(starts) if starts else None
+        merged.end = max(ends) if ends else None
+        boxes = [b for b in (merged.box, profile.box) if b is not None]
+        if boxes:
+            west, east, south, north = np.array(boxes).T
+            merged.box = (float(west.min()), float(east.max()), float(south.min()), float(north.max()))
+    return merged
+
+
+def _datetime(seconds) -> datetime:
+    return datetime.fromtimestamp(float(seconds), tz=timezone.utc)
+
+
+class _Extent:
+    #running min/max over the chunks, and the periods with data
+    __slots__ = ("start", "end", "box", "_starts", "_ends")
+
+    def __init__(self, box=None):
+        self.start = self.end = None
+        self.box = box
+        self._starts, self._ends = [], []
+
+    def add_times(self, seconds):
+        seconds = np.asarray(seconds, dtype=float)
+        seconds = seconds[~np.isnan(seconds)]
+        if len(seconds):
+            low, high = float(seconds.min()), float(seconds.max())
+            self.start = low if self.start is None else min(self.start, low)
+            self.end = high if self.end is None else max(self.end, high)
+            starts, ends = intervals_from_timestamps(seconds, PERIOD_GAP_SECONDS)
+            self._starts.append(starts)
+            self._ends.append(ends)
+            if sum(map(len, self._starts)) > MAX_PENDING_PERIODS:
+                self._merge()
+
+    def _merge(self):
+        if self._starts:
+            starts, ends, _ = merge_intervals(np.concatenate(self._starts), np.concatenate(self._ends), PERIOD_GAP_SECONDS)
+            self._starts, self._ends = [starts], [ends]
+
+    def periods(self) -> list:
+        self._merge()
+        if not self._starts:
+            return []
+        return [(_datetime(start), _datetime(end)) for start, end in zip(self._starts[0], self._ends[0])]
+
+    def add_points(self, latitudes, longitudes):
+        box = bounding_box(latitudes, longitudes)
+        if box is not None and self.box is not None:
+            box = (min(box[0], self.box[0]), max(box[1], self.box[1]), min(box[2], self.box[2]), max(box[3], self.box[3]))
+        self.box = box or self.box
+
+    def times(self):
+        return tuple(None if ts is None else _datetime(ts) for ts in (self.start, self.end))
+
+
+##################################################
+"""CSV"""
+##################################################
+
+def _find_column(columns, candidates):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def _sniff_separator(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+
+def _csv_times(chunk: pd.DataFrame, time_column, date_column, clock_column) -> np.ndarray:
+    #seconds since 1970 for the rows of a chunk (NaN where it can't be read),
+    #None if the time column holds numbers that aren't unix seconds
+    if time_column is not None:
+        values = chunk[time_column]
+        if pd.api.types.is_numeric_dtype(values):
+            seconds = values.to_numpy(dtype=float)
+            read = seconds[~np.isnan(seconds)]
+            if len(read) and (read.min() < EPOCH_SECONDS_RANGE[0] or read.max() > EPOCH_SECONDS_RANGE[1]):
+                return None
+            return seconds
+    else:
+        #separate date and time columns
+        values = chunk[date_column].astype(str) + ' ' + chunk[clock_column].astype(str)
+    times = pd.to_datetime(values, errors='coerce', utc=True, format='ISO8601')
+    if times.isna().all():
+        #not iso, dd.mm.yyyy is more common here than mm.dd.yyyy
+        times = pd.to_datetime(values, errors='coerce', utc=True, dayfirst=True)
+    return ((times - pd.Timestamp(0, tz='UTC')) / pd.Timedelta(seconds=1)).to_numpy(dtype=float)
+
+
+def _degrees(lat_values, lon_values):
+    #-> (latitude, longitude with NaN where it isn't a point, rows with coordinates, rows in degrees)
+    #only decimal degrees and DMS count (a Swiss grid value in a latitude column is a mistake),
+    #0/0 is the usual fill value and counted as missing
+    lat, lon, systems = to_wgs84(lat_values, lon_values)
+    ok = np.isin(systems, [WGS84, DMS])
+    empty = pd.isna(lat_values) & pd.isna(lon_values)
+    fill = ok & (lat == 0) & (lon == 0)
+    ok &= ~fill
+    lat[~ok] = np.nan
+    lon[~ok] = np.nan
+    return lat, lon, int((~empty & ~fill).sum()), int(ok.sum())
+
+
+def profile_csv(source, name=None, chunk_rows=CHUNK_ROWS) -> DataProfile:
+    #path or file-like (an upload) -> DataProfile, read chunk by chunk
+    name = name or (source if isinstance(source, str) else getattr(source, 'name', 'data.csv'))
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            sample = f.read(SNIFF_BYTES)
+    else:
+        sample = source.read(SNIFF_BYTES)
+        source.seek(0)
+    text = sample.decode('utf-8-sig', errors='ignore')
+    separator = _sniff_separator(text)
+
+    #the header says which columns are needed, only those are parsed
+    header = pd.read_csv(io.StringIO(text), sep=separator, nrows=0, skipinitialspace=True).columns
+    columns = {str(c).strip().lower().replace(' ', '_'): c for c in header}
+    time_column = _find_column(columns, TIME_COLUMNS)
+    date_column, clock_column = columns.get('date'), columns.get('time')
+    split_time = date_column is not None and clock_column is not None
+    if split_time:
+        time_column = None
+    lat_column = _find_column(columns, LATITUDE_COLUMNS)
+    lon_column = _find_column(columns, LONGITUDE_COLUMNS)
+    used = [c for c in (time_column, lat_column, lon_column) + ((date_column, clock_column) if split_time else ())
+            if c is not None]
+
+    profile = DataProfile(path=os.path.basename(str(name)), kind='csv',
+                          variables=[str(c).strip() for c in header if c not in used])
+    extent = _Extent()
+    read_times = time_column is not None or split_time
+    with_coordinates = in_degrees = 0
+    #(a file without time or coordinates is still read for the number of rows)
+    chunks = pd.read_csv(source, sep=separator, chunksize=chunk_rows, encoding='utf-8-sig',
+                         skipinitialspace=True, usecols=used or [header[0]])
+    for chunk in chunks:
+        profile.rows += len(chunk)
+        if read_times:
+            seconds = _csv_times(chunk, time_column, date_column, clock_column)
+            if seconds is None:
+                read_times = False
+                extent = _Extent(box=extent.box)
+                profile.notes.append(f"'{time_column}' has numbers that aren't unix seconds "
+                                     f"(1971 to 2100), the dates are not filled in")
+            else:
+                extent.add_times(seconds)
+        if lat_column is not None and lon_column is not None:
+            lat, lon, rows, good = _degrees(chunk[lat_column].to_numpy(), chunk[lon_column].to_numpy())
+            with_coordinates += rows
+            in_degrees += good
+            extent.add_points(lat, lon)
+
+    profile.start, profile.end = extent.times()
+    profile.periods = extent.periods()
+    profile.box = extent.box
+    if with_coordinates and in_degrees < MIN_COORDINATE_SHARE * with_coordinates:
+        profile.box = None
+        profile.notes.append(f"only {in_degrees:,} of {with_coordinates:,} rows of '{lat_column}'/'{lon_column}' "
+                             f"are degrees in range, the location is not filled in")
+    return profile
+
+
+##################################################
+"""NETCDF"""
+##################################################
+
+def _attribute(variable, name, default=''):
+    value = getattr(variable, name, default)
+    return value.decode('utf-8', errors='ignore') if isinstance(value, bytes) else value
+
+
+def _epoch_seconds(units: str):
+    #"hours since 1990-01-01 00:00" -> (seconds per unit, epoch in seconds since 1970), None if it isn't time
+    match = TIME_UNITS_PATTERN.match(units or '')
+    if not match or match.group('unit').lower() not in TIME_UNITS:
+        return None
+    epoch = match.group('epoch').replace('T', ' ').strip()
+    try:
+        return TIME_UNITS[match.group('unit').lower()], parse_instant(epoch)
+    except ValueError:
+        return None
+
+
+def _is_latitude(name, variable):
+    return (_attribute(variable, 'standard_name') == 'latitude' or _attribute(variable, 'units') in ('degrees_north', 'degree_north')
+            or name.lower() in ('lat', 'latitude'))
+
+
+def _is_longitude(name, variable):
+    return (_attribute(variable, 'standard_name') == 'longitude' or _attribute(variable, 'units') in ('degrees_east', 'degree_east')
+            or name.lower() in ('lon', 'long', 'longitude'))
+
+
+def _slices(variable, chunk_rows):
+    #the values of a variable as float arrays, a block of the first dimension at a time
+    #(fill values as NaN, the file is only read block by block)
+    shape = variable.shape
+    if not shape:
+        yield np.atleast_1d(np.ma.filled(np.ma.asarray(variable[...], dtype=float), np.nan))
+        return
+    missing = [v for v in (_attribute(variable, '_FillValue', None), _attribute(variable, 'missing_value', None)) if v is not None]
+    per_row = max(1, int(np.prod(shape[1:], dtype=np.int64)))
+    step = max(1, chunk_rows // per_row)
+    for start in range(0, shape[0], step):
+        values = np.ma.filled(np.ma.asarray(variable[start:start + step], dtype=float), np.nan)
+        for value in missing:
+            values[values == float(np.asarray(value).ravel()[0])] = np.nan
+        yield values
+
+
+def _dimension_size(dim, value, variables) -> int:
+    #netCDF4 dimensions have a len(), scipy gives the size or None for the unlimited one
+    if hasattr(value, '__len__'):
+        return len(value)
+    if value is not None:
+        return int(value)
+    return next((v.shape[0] for v in variables.values() if tuple(getattr(v, 'dimensions', ()))[:1] == (dim,)), 0)
+
+
+def _min_max(variable, chunk_rows) -> list:
+    #[min, max] of a variable read in slices, [] if it has no values
+    low = high = None
+    for values in _slices(variable, chunk_rows):
+        values = values[~np.isnan(values)]
+        if len(values):
+            low = float(values.min()) if low is None else min(low, float(values.min()))
+            high = float(values.max()) if high is None else max(high, float(values.max()))
+    return [] if low is None else [low, high]
+
+
+def _open_netcdf(source, name):
+    #netCDF4.Dataset or scipy netcdf_file, from a path or the bytes of an upload
+    if netCDF4 is not None:
+        if isinstance(source, str):
+            return netCDF4.Dataset(source, 'r')
+        return netCDF4.Dataset(os.path.basename(str(name)), 'r', memory=bytes(source))
+    if netcdf_file is not None:
+        if isinstance(source, str):
+            return netcdf_file(source, 'r', mmap=True)
+        return netcdf_file(io.BytesIO(bytes(source)), 'r', mmap=False)
+    raise ValueError(f"Can't read '{name}': reading NetCDF needs netCDF4 or scipy (pip install netCDF4)")
+
+
+def profile_netcdf(source, name=None, chunk_rows=CHUNK_ROWS) -> DataProfile:
+    #path or bytes -> DataProfile, only the time and lat/lon variables are read, in slices
+    name = name or source
+    dataset = _open_netcdf(source, name)
+    try:
+        profile = DataProfile(path=os.path.basename(str(name)), kind='netcdf')
+        extent = _Extent()
+        variables = dataset.variables
+        dimensions = dataset.dimensions
+
+        #rows = the time dimension (or the unlimited one, or the longest)
+        sizes = {dim: _dimension_size(dim, value, variables) for dim, value in dimensions.items()}
+        time_dimension = next((dim for dim in sizes if dim.lower() == 'time'), None)
+        if time_dimension is None and sizes:
+            time_dimension = max(sizes, key=sizes.get)
+        profile.rows = sizes.get(time_dimension, 0)
+
+        #min/max of every lat and lon variable, works for grids (separate axes) and tracks alike
+        latitudes, longitudes = [], []
+        for var_name, variable in variables.items():
+            units = _attribute(variable, 'units')
+            time_units = _epoch_seconds(units) if (_attribute(variable, 'standard_name') == 'time'
+                                                   or var_name.lower() == 'time' or 'since' in units) else None
+            if time_units is not None:
+                factor, epoch = time_units
+                for values in _slices(variable, chunk_rows):
+                    extent.add_times(values.ravel() * factor + epoch)
+            elif _is_latitude(var_name, variable):
+                latitudes.extend(_min_max(variable, chunk_rows))
+            elif _is_longitude(var_name, variable):
+                longitudes.extend(_min_max(variable, chunk_rows))
+            elif var_name not in dimensions:
+                #measured variables, the long name reads better as a keyword
+                profile.variables.append(_attribute(variable, 'long_name') or var_name)
+        if latitudes and longitudes:
+            if -90 <= min(latitudes) <= max(latitudes) <= 90 and -180 <= min(longitudes) <= max(longitudes) <= 180:
+                extent.add_points([min(latitudes), max(latitudes)], [min(longitudes), max(longitudes)])
+            else:
+                profile.notes.append("the latitude/longitude variables are outside -90 to 90 / -180 to 180, "
+                                     "the location is not filled in")
+    finally:
+        dataset.close()
+
+    profile.start, profile.end = extent.times()
+    profile.periods = extent.periods()
+    profile.box = extent.box
+    return profile
+
+
+##################################################
+"""ANY FILE"""
+##################################################
+
+def profile_file(source, name=None) -> DataProfile:
+    #CSV or NetCDF by the file name, source is a path, the bytes of an upload or a file-like object
+    name = name or (source if isinstance(source, str) else getattr(source, 'name', ''))
+    if str(name).lower().endswith(NETCDF_EXTENSIONS):
+        if not isinstance(source, (str, bytes, bytearray, memoryview)):
+            source = source.read()
+        return profile_netcdf(source, name)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(bytes(source))
+    try:
+        return profile_csv(source, name)
+    except (UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise ValueError(f"Could not read '{name}' as CSV: {e}") from e
+
+
+def find_data_files(paths) -> list:
+    #files, folders (searched for CSV/NetCDF files) and wildcards like data/*.csv
+    files = []
+    for pattern in paths:
+        for path in sorted(glob.glob(os.path.expanduser(pattern))) or [pattern]:
+            if os.path.isdir(path):
+                for dirpath, _, filenames in os.walk(path):
+                    files.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(DATA_EXTENSIONS))
+            elif os.path.exists(path):
+                files.append(path)
+    return sorted(set(files))
+
+
+def profile_paths(paths):
+    #-> (one DataProfile for all the files or None, error messages)
+    profiles, errors = [], []
+    for path in find_data_files(paths):
+        try:
+            profiles.append(profile_file(path))
+        except (OSError, ValueError) as e:
+            errors.append(f"{path}: {e}")
+    return (merge_profiles(profiles) if profiles else None), errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coverage (time, area, variables, rows) of CSV/NetCDF data files")
+    parser.add_argument("files", nargs="+")
+    args = parser.parse_args(argv)
+
+    profiles = []
+    for path in find_data_files(args.files):
+        try:
+            profiles.append(profile_file(path))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {path}: {e}")
+    if not profiles:
+        return 1
+
+    for profile in profiles + ([merge_profiles(profiles)] if len(profiles) > 1 else []):
+        print(f"\n{profile.path}")
+        print(f"    rows: {profile.rows}")
+        print(f"    time: {profile.start.isoformat() if profile.start else '-'} to {profile.end.isoformat() if profile.end else '-'}")
+        if len(profile.periods) > 1:
+            print(f"    periods with data: {', '.join(f'{p[0]:%Y-%m-%d}/{p[1]:%Y-%m-%d}' for p in profile.periods)}")
+        if profile.box:
+            west, east, south, north = profile.box
+            print(f"    area: latitude {south:.6f} to {north:.6f}, longitude {west:.6f} to {east:.6f}")
+            place, latitude, longitude = profile.location()
+            print(f"    location: {place or 'not a known lake'} ({latitude}, {longitude})")
+        print(f"    variables: {', '.join(profile.variables)}")
+        for note in profile.notes:
+            print(f"    note: {note}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
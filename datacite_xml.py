@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:05:31 2026
+
+DataCite XML export (kernel 4.6) for repositories that only take XML.
+The elements are written straight to the output as we walk through the record
+(creators, contributors, geoLocations, subjects...), nothing builds a full DOM,
+so records with thousands of locations/contributors stay cheap to export.
+Several records can be streamed into one file or into a zip.
+More info on the XML schema : https://schema.datacite.org/meta/kernel-4.6/
+"""
+
+import io
+import zipfile
+from xml.sax.saxutils import XMLGenerator
+
+from metadata_model import DatasetMetadata, iter_dates, iter_descriptions, iter_geo_locations, resource_type_general
+
+
+KERNEL_NAMESPACE = "http://datacite.org/schema/kernel-4"
+SCHEMA_LOCATION = "http://datacite.org/schema/kernel-4 https://schema.datacite.org/meta/kernel-4.6/metadata.xsd"
+XSI_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+
+class XmlWriter:
+    #thin wrapper around the sax XMLGenerator that takes care of indenting
+    def __init__(self, out, indent="  "):
+        self.gen = XMLGenerator(out, encoding="utf-8", short_empty_elements=True)
+        self.indent = indent
+        self.depth = 0
+
+    def _newline(self):
+        if self.indent is not None:
+            self.gen.ignorableWhitespace("\n" + self.indent * self.depth)
+
+    def start(self, name, attrs=None):
+        #startDocument already ends with a newline
+        if self.depth:
+            self._newline()
+        self.gen.startElement(name, attrs or {})
+        self.depth += 1
+
+    def end(self, name):
+        self.depth -= 1
+        self._newline()
+        self.gen.endElement(name)
+
+    def element(self, name, text="", attrs=None):
+        #skip the empty attributes so we don't write attr=""
+        attrs = {k: str(v) for k, v in (attrs or {}).items() if v not in (None, "")}
+        self._newline()
+        self.gen.startElement(name, attrs)
+        if text != "" and text is not None:
+            self.gen.characters(str(text))
+        self.gen.endElement(name)
+
+
+def _write_person(w: XmlWriter, person, tag: str, attrs=None):
+    #creator and contributor look the same apart from the tag names
+    w.start(tag, attrs)
+    w.element(f"{tag}Name", person.name, {"nameType": person.name_type})
+    if person.orcid_id:
+        w.element("nameIdentifier", person.orcid_id,
+                  {"nameIdentifierScheme": "ORCID", "schemeURI": "https://orcid.org"})
+    if person.affiliation:
+        affiliation_attrs = {}
+        if person.affiliation.ror_id:
+            affiliation_attrs = {"affiliationIdentifier": person.affiliation.ror_id,
+                                 "affiliationIdentifierScheme": "ROR",
+                                 "schemeURI": "https://ror.org"}
+        w.element("affiliation", person.affiliation.name, affiliation_attrs)
+    w.end(tag)
+
+
+def _write_resource(w: XmlWriter, record: DatasetMetadata, namespaced=True):
+    #elements in the order the kernel 4.6 xsd asks for
+    lang = record.language
+    attrs = {}
+    if namespaced:
+        attrs = {"xmlns": KERNEL_NAMESPACE,
+                 "xmlns:xsi": XSI_NAMESPACE,
+                 "xsi:schemaLocation": SCHEMA_LOCATION}
+    w.start("resource", attrs)
+
+    #identifier is only known once the DOI is minted, DataCite adds it when registering
+    if record.doi:
+        w.element("identifier", record.doi, {"identifierType": "DOI"})
+
+    w.start("creators")
+    for creator in record.creators:
+        _write_person(w, creator, "creator")
+    w.end("creators")
+
+    w.start("titles")
+    w.element("title", record.title, {"xml:lang": lang})
+    w.end("titles")
+
+    w.element("publisher", record.publisher, {"xml:lang": lang})
+    w.element("publicationYear", record.publication_year)
+    w.element("resourceType", record.resource_type, {"resourceTypeGeneral": resource_type_general(record.resource_type)})
+
+    if record.subjects:
+        w.start("subjects")
+        for subject in record.subjects:
+            w.element("subject", subject.subject, {"subjectScheme": subject.scheme,
+                                                   "schemeURI": subject.scheme_uri,
+                                                   "xml:lang": subject.lang})
+        w.end("subjects")
+
+    if record.contributors:
+        w.start("contributors")
+        for contrib in record.contributors:
+            _write_person(w, contrib, "contributor", {"contributorType": contrib.contributor_type or "Other"})
+        w.end("contributors")
+
+    dates = list(iter_dates(record))
+    if dates:
+        w.start("dates")
+        for date in dates:
+            attrs = {"dateType": date.date_type}
+            if date.information:
+                attrs["dateInformation"] = date.information
+            w.element("date", date.to_string(), attrs)
+        w.end("dates")
+
+    w.element("language", lang)
+
+    if record.sizes:
+        w.start("sizes")
+        for size in record.sizes:
+            w.element("size", size)
+        w.end("sizes")
+
+    if record.formats:
+        w.start("formats")
+        for file_format in record.formats:
+            w.element("format", file_format)
+        w.end("formats")
+
+    if record.version:
+        w.element("version", record.version)
+
+    if record.license:
+        w.start("rightsList")
+        w.element("rights", record.license, {"xml:lang": lang})
+        w.end("rightsList")
+
+    w.start("descriptions")
+    for text, description_type in iter_descriptions(record):
+        w.element("description", text, {"descriptionType": description_type, "xml:lang": lang})
+    w.end("descriptions")
+
+    geo_locations = list(iter_geo_locations(record))
+    if geo_locations:
+        w.start("geoLocations")
+        for location in geo_locations:
+            w.start("geoLocation")
+            if location.place:
+                w.element("geoLocationPlace", location.place)
+            if location.has_point():
+                w.start("geoLocationPoint")
+                w.element("pointLongitude", location.longitude)
+                w.element("pointLatitude", location.latitude)
+                w.end("geoLocationPoint")
+            if location.box:
+                west, east, south, north = location.box
+                w.start("geoLocationBox")
+                w.element("westBoundLongitude", west)
+                w.element("eastBoundLongitude", east)
+                w.element("southBoundLatitude", south)
+                w.element("northBoundLatitude", north)
+                w.end("geoLocationBox")
+            if location.polygon:
+                w.start("geoLocationPolygon")
+                for latitude, longitude in location.polygon:
+                    w.start("polygonPoint")
+                    w.element("pointLongitude", longitude)
+                    w.element("pointLatitude", latitude)
+                    w.end("polygonPoint")
+                w.end("geoLocationPolygon")
+            w.end("geoLocation")
+        w.end("geoLocations")
+
+    w.end("resource")
+
+
+def write_datacite_xml(record: DatasetMetadata, out, indent="  "):
+    #write one record to a file-like object (text or binary)
+    w = XmlWriter(out, indent)
+    w.gen.startDocument()
+    _write_resource(w, record)
+    w.gen.ignorableWhitespace("\n")
+    w.gen.endDocument()
+
+
+def to_datacite_xml(record: DatasetMetadata) -> str:
+    out = io.StringIO()
+    write_datacite_xml(record, out)
+    return out.getvalue()
+
+
+##################################################
+"""BULK EXPORT"""
+##################################################
+
+def write_bulk_xml(records, out, indent="  "):
+    #stream many records into one file, wrapped in a <resources> element
+    #records can be any iterable (e.g. a generator), only one is held at a time
+    w = XmlWriter(out, indent)
+    w.gen.startDocument()
+    w.start("resources", {"xmlns": KERNEL_NAMESPACE,
+                          "xmlns:xsi": XSI_NAMESPACE,
+                          "xsi:schemaLocation": SCHEMA_LOCATION})
+    count = 0
+    for record in records:
+        _write_resource(w, record, namespaced=False)
+        count += 1
+    w.end("resources")
+    w.gen.ignorableWhitespace("\n")
+    w.gen.endDocument()
+    return count
+
+
+def _default_member_name(record: DatasetMetadata, index: int) -> str:
+    title = "".join(c if c.isalnum() else "_" for c in record.title.lower()).strip("_")[:40]
+    return f"{index:05d}_{title or 'metadata'}.xml"
+
+
+def write_bulk_zip(records, zip_path, member_name=_default_member_name):
+    #stream many records into a zip, one xml file per record
+    count = 0
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for index, record in enumerate(records):
+            with zf.open(member_name(record, index), "w") as member:
+                write_datacite_xml(record, member)
+            count += 1
+    return count
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 14:06:37 2026
+
+Undo/redo for the app: every change of the entered information becomes a
+version, the app can go back and forward through them and show what changed
+between two versions. Editing or removing a contributor or a location can so
+always be taken back.
+
+Versions are copy on write: a new version points to the same stored sections
+as the one before, only the sections that changed are stored again. In the
+list sections (contributors, locations, collection periods) the list is kept
+in pieces and only the piece with the changed item is new, so a step costs
+about as much memory as what changed in it, also with hundreds of
+contributors. The pieces end after the items whose hash ends a certain way
+(not every N items), so adding or removing an item doesn't shift the pieces
+after it and those stay shared too.
+"""
+
+import copy
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+
+from metadata_drafts import encode_section
+
+
+#a piece ends after an item whose hash is divisible by this (about this many items per piece)
+PIECE_SPLIT = 8
+#the oldest versions are dropped after this many
+MAX_VERSIONS = 200
+
+
+class _Pieces(tuple):
+    #a stored list: a tuple of pieces, each a tuple of (item hash, item)
+    __slots__ = ()
+
+    def items(self):
+        return [item for piece in self for _, item in piece]
+
+    def hashes(self):
+        return [item_hash for piece in self for item_hash, _ in piece]
+
+
+@dataclass(frozen=True, slots=True)
+class Version:
+    sections: dict  #{section: {key: stored value}}, shared with the other versions where unchanged
+    hashes: dict  #{section: hash of the section}
+    changed: tuple  #sections that changed since the version before
+    time: str
+
+
+def _store_list(items: list, old) -> _Pieces:
+    #the items in pieces, pieces and items that are already stored in the old list are reused
+    old = old if isinstance(old, _Pieces) else _Pieces()
+    stored_pieces = {tuple(item_hash for item_hash, _ in piece): piece for piece in old}
+    stored_items = {item_hash: item for piece in old for item_hash, item in piece}
+    pieces, piece = [], []
+    for item in items:
+        item_hash = encode_section(item)[1]
+        piece.append((item_hash, stored_items[item_hash] if item_hash in stored_items else copy.deepcopy(item)))
+        if int(item_hash[:8], 16) % PIECE_SPLIT == 0:
+            pieces.append(piece)
+            piece = []
+    if piece:
+        pieces.append(piece)
+    return _Pieces(stored_pieces.get(tuple(item_hash for item_hash, _ in piece)) or tuple(piece) for piece in pieces)
+
+
+def _store(value, old):
+    if isinstance(value, list):
+        return _store_list(value, old)
+    #the app changes lists and dicts in place, the stored value has to be a copy
+    if old is not None and not isinstance(old, _Pieces) and old == value:
+        return old
+    return copy.deepcopy(value)
+
+
+def _restore(value):
+    #a copy again, so changing it in the app doesn't change the history
+    if isinstance(value, _Pieces):
+        return copy.deepcopy(value.items())
+    return copy.deepcopy(value)
+
+
+def _describe(item) -> str:
+    #a list item in a sentence: contributor, location, collection period, keyword
+    if isinstance(item, dict):
+        if item.get('name'):
+            return item['name']
+        if item.get('lake_name'):
+            return f"{item['lake_name']} ({item.get('latitude')}, {item.get('longitude')})"
+        if 'start' in item or 'end' in item:
+            return f"{item.get('start')} to {item.get('end')}"
+    return str(item)
+
+
+def _short(value, length=60) -> str:
+    text = str(value)
+    return text if len(text) <= length else text[:length - 3] + '...'
+
+
+class DraftHistory:
+    __slots__ = ("versions", "position")
+
+    def __init__(self):
+        self.versions = []
+        self.position = -1  #the version the app shows now
+
+    @property
+    def current(self):
+        return self.versions[self.position] if self.versions else None
+
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    def can_redo(self) -> bool:
+        return self.position < len(self.versions) - 1
+
+    def commit(self, sections: dict) -> bool:
+        #{section: {key: value}} as a new version if anything changed, the versions that were
+        #undone are dropped then (like in an editor); returns whether there is a new version
+        hashes = {name: encode_section(section)[1] for name, section in sections.items()}
+        current = self.current
+        if current is not None and hashes == current.hashes:
+            return False
+        stored, changed = {}, []
+        for name, section in sections.items():
+            if current is not None and current.hashes.get(name) == hashes[name]:
+                stored[name] = current.sections[name]
+                continue
+            old = current.sections.get(name, {}) if current is not None else {}
+            stored[name] = {key: _store(value, old.get(key)) for key, value in section.items()}
+            changed.append(name)
+        self.versions = self.versions[:self.position + 1]
+        self.versions.append(Version(stored, hashes, tuple(changed), datetime.now().strftime('%H:%M:%S')))
+        del self.versions[:-MAX_VERSIONS]
+        self.position = len(self.versions) - 1
+        return True
+
+    def state(self, index: int = None) -> dict:
+        #the flat {key: value} of a version (default the current one)
+        version = self.versions[self.position if index is None else index]
+        return {key: _restore(value) for section in version.sections.values() for key, value in section.items()}
+
+    def undo(self) -> dict:
+        if not self.can_undo():
+            raise IndexError("Nothing to undo")
+        self.position -= 1
+        return self.state()
+
+    def redo(self) -> dict:
+        if not self.can_redo():
+            raise IndexError("Nothing to redo")
+        self.position += 1
+        return self.state()
+
+    def go_to(self, index: int) -> dict:
+        if not 0 <= index < len(self.versions):
+            raise IndexError(f"No version {index}")
+        self.position = index
+        return self.state()
+
+    def diff(self, a: int, b: int) -> list:
+        #what changed from version a to version b, one line per change
+        old, new = self.versions[a], self.versions[b]
+        lines = []
+        for name in list(old.sections) + [name for name in new.sections if name not in old.sections]:
+            if old.hashes.get(name) == new.hashes.get(name):
+                continue
+            before, after = old.sections.get(name, {}), new.sections.get(name, {})
+            for key in list(before) + [key for key in after if key not in before]:
+                old_value, new_value = before.get(key), after.get(key)
+                if old_value is new_value:
+                    continue
+                if isinstance(old_value, _Pieces) or isinstance(new_value, _Pieces):
+                    lines += self._list_diff(key, old_value or _Pieces(), new_value or _Pieces())
+                elif old_value != new_value:
+                    lines.append(f"{key}: {_short(old_value)} -> {_short(new_value)}")
+        return lines
+
+    @staticmethod
+    def _list_diff(key: str, old: _Pieces, new: _Pieces) -> list:
+        #items are compared by their hash, an item that is removed and added again
+        #with the same name/place was edited
+        old_hashes, new_hashes = Counter(old.hashes()), Counter(new.hashes())
+        if old.hashes() == new.hashes():
+            return []
+        removed = [_describe(item) for item_hash, item in _unique(old, old_hashes - new_hashes)]
+        added = [_describe(item) for item_hash, item in _unique(new, new_hashes - old_hashes)]
+        edited = [text for text in added if text in removed]
+        lines = [f"{key}: - {text}" for text in removed if text not in edited]
+        lines += [f"{key}: + {text}" for text in added if text not in edited]
+        lines += [f"{key}: edited {text}" for text in edited]
+        return lines or [f"{key}: order changed"]
+
+
+def _unique(pieces: _Pieces, counts: Counter):
+    #the (hash, item) pairs of the list that are counted (each as often as counted)
+    counts = Counter(counts)
+    for piece in pieces:
+        for item_hash, item in piece:
+            if counts[item_hash] > 0:
+                counts[item_hash] -= 1
+                yield item_hash, item
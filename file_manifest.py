@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 24 09:41:27 2026
+
+File manifest of a dataset folder: size, format (MIME type) and SHA-256/MD5
+checksum of every file. Gives the DataCite sizes and formats, and the checksum
+files (manifest-sha256.txt, manifest-md5.txt, same layout as sha256sum/md5sum
+and BagIt) let anyone check later that the data is still the same:
+    cd dataset_folder && sha256sum -c manifest-sha256.txt
+
+Files are read memory mapped in chunks (both checksums in the same pass), several
+files at the same time in a thread pool (hashlib lets go of the GIL while hashing).
+The results are cached by (path, size, modification time) in a small SQLite file,
+so running it again on a big deposit only hashes the files that changed.
+Checking against the manifest (--verify) always reads every file again (a file
+that got damaged keeps its size and time), and puts the new checksums in the cache.
+
+From the terminal:
+    python file_manifest.py DATASET_FOLDER
+    python file_manifest.py DATASET_FOLDER --write       (checksum files into the folder)
+    python file_manifest.py DATASET_FOLDER --verify      (compare with manifest-sha256.txt)
+"""
+
+import argparse
+import hashlib
+import mimetypes
+import mmap
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+
+DEFAULT_CACHE = os.environ.get("METADATA_MANIFEST_CACHE", "metadata_manifest_cache.sqlite")
+#bytes hashed per step
+CHUNK_SIZE = 8 * 1024 * 1024
+#files hashed at the same time, disks don't get faster with more
+WORKERS = min(8, os.cpu_count() or 1)
+
+SHA256_MANIFEST = "manifest-sha256.txt"
+MD5_MANIFEST = "manifest-md5.txt"
+#written by us, not part of the data
+MANIFEST_FILES = (SHA256_MANIFEST, MD5_MANIFEST)
+
+#formats that mimetypes doesn't know (or gets wrong) for lake data
+EXTRA_TYPES = {
+    '.nc': 'application/x-netcdf',
+    '.nc4': 'application/x-netcdf',
+    '.cdf': 'application/x-netcdf',
+    '.h5': 'application/x-hdf5',
+    '.hdf5': 'application/x-hdf5',
+    '.parquet': 'application/vnd.apache.parquet',
+    '.geojson': 'application/geo+json',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.mat': 'application/x-matlab-data',
+    '.dat': 'application/octet-stream',
+    '.md': 'text/markdown',
+    '.yml': 'application/yaml',
+    '.yaml': 'application/yaml',
+}
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checksums (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    md5 TEXT);
+"""
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    path: str  #relative to the dataset folder, with /
+    size: int
+    mime: str
+    sha256: str
+    md5: str
+
+
+def guess_mime(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in EXTRA_TYPES:
+        return EXTRA_TYPES[extension]
+    return mimetypes.guess_type(path, strict=False)[0] or 'application/octet-stream'
+
+
+def hash_file(path: str, chunk_size=CHUNK_SIZE) -> tuple:
+    #(sha256, md5) hex digests, one pass over the file
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5(usedforsecurity=False)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            #empty files can't be memory mapped
+            return sha256.hexdigest(), md5.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for start in range(0, len(view), chunk_size):
+                    chunk = view[start:start + chunk_size]
+                    sha256.update(chunk)
+                    md5.update(chunk)
+                    chunk.release()
+            finally:
+                view.release()
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+def find_files(folder: str) -> list:
+    #all the data files under the folder (not the manifests themselves), sorted
+    files = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        #hidden folders (.git, .ipynb_checkpoints) aren't data
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename.startswith('.') or (dirpath == folder and filename in MANIFEST_FILES):
+                continue
+            files.append(path)
+    return sorted(files)
+
+
+def _open_cache(cache_path):
+    if not cache_path:
+        return None
+    conn = sqlite3.connect(cache_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(CACHE_SCHEMA)
+    return conn
+
+
+def build_manifest(folder: str, workers=WORKERS, cache_path=DEFAULT_CACHE, progress=None) -> list:
+    #-> [ManifestEntry], files that are in the cache with the same size and time aren't read again
+    #progress(done, total) is called after each file, e.g. for a progress bar
+    folder = os.path.abspath(folder)
+    if not os.path.isdir(folder):
+        raise ValueError(f"'{folder}' is not a folder")
+    files = find_files(folder)
+    stats = {path: os.stat(path) for path in files}
+
+    cache = _open_cache(cache_path)
+    known = {}
+    if cache is not None:
+        rows = cache.execute("SELECT path, size, mtime_ns, sha256, md5 FROM checksums WHERE path LIKE ? ESCAPE '\\'",
+                             (folder.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + os.sep + '%',))
+        for path, size, mtime_ns, sha256, md5 in rows:
+            stat = stats.get(path)
+            if stat is not None and stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                known[path] = (sha256, md5)
+
+    to_hash = [path for path in files if path not in known]
+    done = len(known)
+    if progress:
+        progress(done, len(files))
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            for path, digests in zip(to_hash, pool.map(hash_file, to_hash)):
+                known[path] = digests
+                done += 1
+                if cache is not None:
+                    stat = stats[path]
+                    cache.execute("INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?)",
+                                  (path, stat.st_size, stat.st_mtime_ns) + digests)
+                    #commit now and then, a crash halfway through a big deposit keeps what was done
+                    if done % 100 == 0:
+                        cache.commit()
+                if progress:
+                    progress(done, len(files))
+    finally:
+        if cache is not None:
+            cache.commit()
+            cache.close()
+
+    return [ManifestEntry(path=os.path.relpath(path, folder).replace(os.sep, '/'), size=stats[path].st_size,
+                          mime=guess_mime(path), sha256=known[path][0], md5=known[path][1])
+            for path in files]
+
+
+def format_size(size: int) -> str:
+    #1234567 -> "1.2 MB" (powers of 1000, like the file browsers)
+    for unit in ("bytes", "kB", "MB", "GB", "TB"):
+        if size < 1000 or unit == "TB":
+            return f"{size} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+        size /= 1000
+
+
+def datacite_sizes(entries) -> list:
+    #DataCite sizes: number of files and the total
+    total = sum(entry.size for entry in entries)
+    return [f"{len(entries)} files" if len(entries) != 1 else "1 file", format_size(total)]
+
+
+def datacite_formats(entries) -> list:
+    #DataCite formats: the MIME types, most used first
+    counts = {}
+    for entry in entries:
+        counts[entry.mime] = counts.get(entry.mime, 0) + 1
+    return sorted(counts, key=lambda mime: (-counts[mime], mime))
+
+
+def manifest_text(entries, algorithm='sha256') -> str:
+    #the lines of manifest-sha256.txt / manifest-md5.txt, checksum then path (two spaces)
+    return ''.join(f"{getattr(entry, algorithm)}  {entry.path}\n" for entry in entries)
+
+
+def write_manifests(entries, folder: str) -> list:
+    #manifest-sha256.txt and manifest-md5.txt in the folder, returns their paths
+    paths = []
+    for algorithm, filename in (('sha256', SHA256_MANIFEST), ('md5', MD5_MANIFEST)):
+        path = os.path.join(folder, filename)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(manifest_text(entries, algorithm))
+        paths.append(path)
+    return paths
+
+
+def _refresh_cache(cache_path, folder: str, entries):
+    #the checksums that were just computed into the cache, for the next build_manifest
+    cache = _open_cache(cache_path)
+    if cache is None:
+        return
+    folder = os.path.abspath(folder)
+    try:
+        for entry in entries:
+            path = os.path.join(folder, *entry.path.split('/'))
+            stat = os.stat(path)
+            #changed again in the meantime, the cache would have an old checksum for it
+            if stat.st_size != entry.size:
+                continue
+            cache.execute("INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?)",
+                          (path, stat.st_size, stat.st_mtime_ns, entry.sha256, entry.md5))
+        cache.commit()
+    finally:
+        cache.close()
+
+
+def verify_manifest(folder: str, workers=WORKERS, cache_path=DEFAULT_CACHE) -> list:
+    #compare the folder with its manifest-sha256.txt, returns the problems (empty = all good)
+    #every file is hashed again (not taken from the cache), the cache gets the new checksums
+    manifest_path = os.path.join(folder, SHA256_MANIFEST)
+    expected = {}
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                checksum, path = line.rstrip('\n').split('  ', 1)
+                expected[path] = checksum
+    entries = build_manifest(folder, workers, cache_path=None)
+    _refresh_cache(cache_path, folder, entries)
+    current = {entry.path: entry.sha256 for entry in entries}
+    problems = [f"missing: {path}" for path in expected if path not in current]
+    problems += [f"changed: {path}" for path in expected if path in current and current[path] != expected[path]]
+    problems += [f"not in the manifest: {path}" for path in current if path not in expected]
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sizes, formats and checksums of the files of a dataset")
+    parser.add_argument("folder")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="files hashed at the same time")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="checksum cache (SQLite)")
+    parser.add_argument("--no-cache", action="store_true", help="hash every file again")
+    parser.add_argument("--write", action="store_true", help=f"write {SHA256_MANIFEST} and {MD5_MANIFEST} into the folder")
+    parser.add_argument("--verify", action="store_true", help=f"check the files against {SHA256_MANIFEST}")
+    args = parser.parse_args(argv)
+    cache_path = None if args.no_cache else args.cache
+
+    try:
+        if args.verify:
+            problems = verify_manifest(args.folder, args.workers, cache_path)
+            for problem in problems:
+                print(problem)
+            print("OK" if not problems else f"{len(problems)} problem(s)")
+            return 1 if problems else 0
+        entries = build_manifest(args.folder, args.workers, cache_path)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 2
+
+    for entry in entries:
+        print(f"{entry.sha256}  {format_size(entry.size):>10}  {entry.mime:<28} {entry.path}")
+    print(f"\nsizes: {', '.join(datacite_sizes(entries))}")
+    print(f"formats: {', '.join(datacite_formats(entries))}")
+    if args.write:
+        for path in write_manifests(entries, args.folder):
+            print(f"Written: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
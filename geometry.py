@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 10:18:04 2026
+
+Areas for the geoLocations: the box around all the points of a record
+(geoLocationBox) and lake/site outlines (geoLocationPolygon).
+
+Outlines from a GIS can have 100 000 vertices along a shoreline, much more than
+a metadata record needs, so they are simplified with Douglas-Peucker down to a
+vertex budget: the outline keeps the vertices that are furthest away from the
+simplified line, the largest deviations first, until the budget is used up.
+"""
+
+import heapq
+import os
+
+import numpy as np
+
+
+#most points kept in a polygon (first point repeated at the end included),
+#can be changed with the METADATA_POLYGON_POINTS environment variable
+POLYGON_MAX_POINTS = int(os.environ.get("METADATA_POLYGON_POINTS", 100))
+#DataCite wants at least 4 points (a triangle plus the closing point)
+POLYGON_MIN_POINTS = 4
+
+
+def bounding_box(latitudes, longitudes):
+    #(west, east, south, north) around all the points, None if there are none
+    #(NaN = missing coordinates are left out)
+    lat = np.asarray(latitudes, dtype=float)
+    lon = np.asarray(longitudes, dtype=float)
+    ok = ~np.isnan(lat) & ~np.isnan(lon)
+    if not ok.any():
+        return None
+    lat, lon = lat[ok], lon[ok]
+    return float(lon.min()), float(lon.max()), float(lat.min()), float(lat.max())
+
+
+def _segment_distances(xy, start, end) -> np.ndarray:
+    #distance of the points between start and end to the straight line start-end
+    #(to the point itself if start and end are the same place)
+    a, b = xy[start], xy[end]
+    points = xy[start + 1:end]
+    direction = b - a
+    length2 = direction @ direction
+    if length2 == 0:
+        return np.hypot(*(points - a).T)
+    t = np.clip((points - a) @ direction / length2, 0.0, 1.0)
+    closest = a + t[:, None] * direction
+    return np.hypot(*(points - closest).T)
+
+
+def simplify_polygon(points, max_points=None, tolerance=0.0) -> list:
+    #closed ring [(latitude, longitude), ...] -> at most max_points points, closed again
+    #tolerance (degrees): stop earlier if the remaining deviations are smaller
+    max_points = max(POLYGON_MIN_POINTS, max_points or POLYGON_MAX_POINTS)
+    ring = np.asarray(points, dtype=float).reshape(-1, 2)
+    ring = ring[~np.isnan(ring).any(axis=1)]
+    if len(ring) and (ring[0] == ring[-1]).all():
+        ring = ring[:-1]
+    if len(ring) < POLYGON_MIN_POINTS - 1:
+        raise ValueError(f"A polygon needs at least {POLYGON_MIN_POINTS - 1} different points")
+
+    #the first point once more at the end, so the ring is one line from 0 to n
+    ring = np.vstack([ring, ring[:1]])
+    n = len(ring) - 1
+    if n + 1 <= max_points:
+        return [tuple(p) for p in ring.tolist()]
+
+    #flat x/y, longitude degrees are shorter away from the equator
+    xy = np.column_stack([ring[:, 1] * np.cos(np.radians(ring[:, 0].mean())), ring[:, 0]])
+
+    heap = []
+
+    def push(start, end):
+        if end - start < 2:
+            return
+        distances = _segment_distances(xy, start, end)
+        i = int(np.argmax(distances))
+        heapq.heappush(heap, (-distances[i], start, end, start + 1 + i))
+
+    #the line from the first point around and back to itself: the furthest point splits it in two
+    far = int(np.argmax(np.hypot(*(xy[1:n] - xy[0]).T))) + 1
+    keep = {0, far, n}
+    push(0, far)
+    push(far, n)
+    while heap and len(keep) < max_points:
+        distance, start, end, i = heapq.heappop(heap)
+        if -distance <= tolerance:
+            break
+        keep.add(i)
+        push(start, i)
+        push(i, end)
+
+    return [tuple(p) for p in ring[sorted(keep)].tolist()]
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:38:07 2026
+
+ISO 19115 style XML (ISO 19139 gmd/gco encoding) version of the metadata,
+for the geo portals that ask for it. Only the parts we actually collect are
+written (citation, abstract, keywords, license, spatial and temporal extent).
+Written element by element like the DataCite XML.
+"""
+
+import io
+from datetime import date
+
+from datacite_xml import XmlWriter
+from metadata_model import DatasetMetadata, ORCID_SCHEME_URI, ROR_SCHEME_URI, iter_geo_locations, resource_type_general
+
+
+NAMESPACES = {
+    "xmlns:gmd": "http://www.isotc211.org/2005/gmd",
+    "xmlns:gco": "http://www.isotc211.org/2005/gco",
+    "xmlns:gml": "http://www.opengis.net/gml/3.2",
+    "xmlns:xlink": "http://www.w3.org/1999/xlink"}
+
+CODELISTS = "http://standards.iso.org/iso/19139/resources/gmxCodelists.xml"
+
+#resourceTypeGeneral -> MD_ScopeCode, the types without a scope code of their own are a dataset
+SCOPE_CODES = {
+    "Collection": "series",
+    "Software": "software",
+    "ComputationalNotebook": "software",
+    "Service": "service",
+    "Model": "model",
+    "Instrument": "collectionHardware",
+    }
+
+
+def _string(w: XmlWriter, tag: str, value):
+    w.start(tag)
+    w.element("gco:CharacterString", value)
+    w.end(tag)
+
+
+def _code(w: XmlWriter, tag: str, codelist: str, value: str):
+    w.start(tag)
+    w.element(f"gmd:{codelist}", value, {"codeList": f"{CODELISTS}#{codelist}", "codeListValue": value})
+    w.end(tag)
+
+
+def _responsible_party(w: XmlWriter, tag: str, person, role: str, email: str = ""):
+    w.start(tag)
+    w.start("gmd:CI_ResponsibleParty")
+    _string(w, "gmd:individualName", person.name)
+    if person.affiliation:
+        _string(w, "gmd:organisationName", person.affiliation.name)
+    if email or person.orcid_id or (person.affiliation and person.affiliation.ror_id):
+        w.start("gmd:contactInfo")
+        w.start("gmd:CI_Contact")
+        if email:
+            w.start("gmd:address")
+            w.start("gmd:CI_Address")
+            _string(w, "gmd:electronicMailAddress", email)
+            w.end("gmd:CI_Address")
+            w.end("gmd:address")
+        #orcid (or else ror) as the online resource, ISO has no dedicated field for them
+        #and CI_Contact only takes one
+        if person.orcid_id:
+            link = f"{ORCID_SCHEME_URI}/{person.orcid_id}"
+        elif person.affiliation and person.affiliation.ror_id:
+            link = f"{ROR_SCHEME_URI}/{person.affiliation.ror_id}"
+        else:
+            link = ""
+        if link:
+            w.start("gmd:onlineResource")
+            w.start("gmd:CI_OnlineResource")
+            w.start("gmd:linkage")
+            w.element("gmd:URL", link)
+            w.end("gmd:linkage")
+            w.end("gmd:CI_OnlineResource")
+            w.end("gmd:onlineResource")
+        w.end("gmd:CI_Contact")
+        w.end("gmd:contactInfo")
+    _code(w, "gmd:role", "CI_RoleCode", role)
+    w.end("gmd:CI_ResponsibleParty")
+    w.end(tag)
+
+
+def _decimal(w: XmlWriter, tag: str, value):
+    w.start(tag)
+    w.element("gco:Decimal", value)
+    w.end(tag)
+
+
+def _bounding_box(w: XmlWriter, west, east, south, north):
+    w.start("gmd:geographicElement")
+    w.start("gmd:EX_GeographicBoundingBox")
+    _decimal(w, "gmd:westBoundLongitude", west)
+    _decimal(w, "gmd:eastBoundLongitude", east)
+    _decimal(w, "gmd:southBoundLatitude", south)
+    _decimal(w, "gmd:northBoundLatitude", north)
+    w.end("gmd:EX_GeographicBoundingBox")
+    w.end("gmd:geographicElement")
+
+
+def _bounding_polygon(w: XmlWriter, polygon, gml_id: str):
+    #gml posList is latitude longitude pairs for EPSG:4326
+    w.start("gmd:geographicElement")
+    w.start("gmd:EX_BoundingPolygon")
+    w.start("gmd:polygon")
+    w.start("gml:Polygon", {"gml:id": gml_id, "srsName": "http://www.opengis.net/def/crs/EPSG/0/4326"})
+    w.start("gml:exterior")
+    w.start("gml:LinearRing")
+    w.element("gml:posList", " ".join(f"{lat} {lon}" for lat, lon in polygon))
+    w.end("gml:LinearRing")
+    w.end("gml:exterior")
+    w.end("gml:Polygon")
+    w.end("gmd:polygon")
+    w.end("gmd:EX_BoundingPolygon")
+    w.end("gmd:geographicElement")
+
+
+def write_iso19115_xml(record: DatasetMetadata, out, indent="  ", date_stamp=None):
+    w = XmlWriter(out, indent)
+    w.gen.startDocument()
+    w.start("gmd:MD_Metadata", NAMESPACES)
+
+    if record.doi:
+        _string(w, "gmd:fileIdentifier", record.doi)
+    _string(w, "gmd:language", record.language)
+    _code(w, "gmd:hierarchyLevel", "MD_ScopeCode", SCOPE_CODES.get(resource_type_general(record.resource_type), "dataset"))
+
+    for creator in record.creators:
+        _responsible_party(w, "gmd:contact", creator, "pointOfContact", creator.email)
+
+    w.start("gmd:dateStamp")
+    w.element("gco:Date", (date_stamp or date.today()).isoformat())
+    w.end("gmd:dateStamp")
+
+    w.start("gmd:identificationInfo")
+    w.start("gmd:MD_DataIdentification")
+
+    #citation
+    w.start("gmd:citation")
+    w.start("gmd:CI_Citation")
+    _string(w, "gmd:title", record.title)
+    w.start("gmd:date")
+    w.start("gmd:CI_Date")
+    w.start("gmd:date")
+    w.element("gco:Date", record.publication_year)
+    w.end("gmd:date")
+    _code(w, "gmd:dateType", "CI_DateTypeCode", "publication")
+    w.end("gmd:CI_Date")
+    w.end("gmd:date")
+    if record.version:
+        _string(w, "gmd:edition", record.version)
+    if record.doi:
+        w.start("gmd:identifier")
+        w.start("gmd:MD_Identifier")
+        _string(w, "gmd:code", f"https://doi.org/{record.doi}")
+        w.end("gmd:MD_Identifier")
+        w.end("gmd:identifier")
+    for creator in record.creators:
+        _responsible_party(w, "gmd:citedResponsibleParty", creator, "author")
+    for contrib in record.contributors:
+        _responsible_party(w, "gmd:citedResponsibleParty", contrib, "originator")
+    w.end("gmd:CI_Citation")
+    w.end("gmd:citation")
+
+    _string(w, "gmd:abstract", record.description)
+
+    if record.subjects:
+        w.start("gmd:descriptiveKeywords")
+        w.start("gmd:MD_Keywords")
+        for subject in record.subjects:
+            _string(w, "gmd:keyword", subject.subject)
+        w.end("gmd:MD_Keywords")
+        w.end("gmd:descriptiveKeywords")
+
+    if record.license:
+        w.start("gmd:resourceConstraints")
+        w.start("gmd:MD_LegalConstraints")
+        _string(w, "gmd:otherConstraints", record.license)
+        w.end("gmd:MD_LegalConstraints")
+        w.end("gmd:resourceConstraints")
+
+    _string(w, "gmd:language", record.language)
+
+    collected = [d for d in record.dates if d.date_type == "Collected" and d.to_string()]
+    geo_locations = list(iter_geo_locations(record))
+    if geo_locations or collected:
+        w.start("gmd:extent")
+        w.start("gmd:EX_Extent")
+        for i, location in enumerate(geo_locations, 1):
+            if location.place:
+                w.start("gmd:geographicElement")
+                w.start("gmd:EX_GeographicDescription")
+                w.start("gmd:geographicIdentifier")
+                w.start("gmd:MD_Identifier")
+                _string(w, "gmd:code", location.place)
+                w.end("gmd:MD_Identifier")
+                w.end("gmd:geographicIdentifier")
+                w.end("gmd:EX_GeographicDescription")
+                w.end("gmd:geographicElement")
+            if location.has_point():
+                #a point is a bounding box with no size
+                _bounding_box(w, location.longitude, location.longitude, location.latitude, location.latitude)
+            if location.box:
+                _bounding_box(w, *location.box)
+            if location.polygon:
+                _bounding_polygon(w, location.polygon, f"location_{i}")
+        for i, period in enumerate(collected, 1):
+            w.start("gmd:temporalElement")
+            w.start("gmd:EX_TemporalExtent")
+            w.start("gmd:extent")
+            w.start("gml:TimePeriod", {"gml:id": f"collected_{i}"})
+            w.element("gml:beginPosition", period.start, {} if period.start else {"indeterminatePosition": "unknown"})
+            w.element("gml:endPosition", period.end, {} if period.end else {"indeterminatePosition": "unknown"})
+            w.end("gml:TimePeriod")
+            w.end("gmd:extent")
+            w.end("gmd:EX_TemporalExtent")
+            w.end("gmd:temporalElement")
+        w.end("gmd:EX_Extent")
+        w.end("gmd:extent")
+
+    w.end("gmd:MD_DataIdentification")
+    w.end("gmd:identificationInfo")
+    w.end("gmd:MD_Metadata")
+    w.gen.ignorableWhitespace("\n")
+    w.gen.endDocument()
+
+
+def to_iso19115_xml(record: DatasetMetadata) -> str:
+    out = io.StringIO()
+    write_iso19115_xml(record, out)
+    return out.getvalue()
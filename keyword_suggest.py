@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:05:37 2026
+
+Keyword suggestions from the title and description: the catalog records
+(metadata_catalog.py) with the most similar text (TF-IDF) and the keywords
+they were given, weighted by how similar they are.
+
+The model is kept next to the catalog as numpy arrays, one posting list per word
+(the records that have it and how often), memory mapped so a suggestion only reads
+the posting lists of the words in the text. Records that were added, changed or
+removed in the catalog since the last time are merged into the arrays, only their
+text is read again. The IDF is worked out from the posting list lengths when
+suggesting, so it doesn't go out of date while records are added.
+
+Several app processes can share the model folder: one of them at a time updates
+it (a lock file in the folder), the others go on with the model that is saved.
+
+From the terminal:
+    python keyword_suggest.py update                  (after indexing, only the changes)
+    python keyword_suggest.py build                   (everything again)
+    python keyword_suggest.py suggest "Oxygen profiles in Lake Geneva"
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from metadata_catalog import DEFAULT_CATALOG, connect, name_key
+from metadata_duplicates import normalize_text
+
+
+MODEL_VERSION = 1
+#similar records the keywords are taken from
+NEIGHBOURS = 20
+#words of the title count this many times
+TITLE_WEIGHT = 2
+#share of the similar records (by similarity) that must have a keyword
+MIN_SCORE = 0.1
+#how often (seconds) the app checks if the catalog changed
+CHECK_SECONDS = 10
+#records read from the catalog at once
+READ_CHUNK = 500
+#older generation folders are deleted this long after they were replaced (other processes may still read them)
+GENERATION_GRACE_SECONDS = 10 * 60
+#a lock file older than this was left by a process that stopped while updating
+LOCK_STALE_SECONDS = 10 * 60
+#the terminal commands wait this long for an update of another process
+LOCK_WAIT_SECONDS = 60
+
+#too common to say anything about a dataset
+STOPWORDS = frozenset("""
+a an and are as at be been by can data dataset datasets during for from has have in into is it its of on or
+our over the their these this those to was were which with within we all also between both each more
+most other such than that then there they using used via per
+""".split())
+
+ARRAYS = ('record_ids', 'stamps', 'doc_norms', 'term_indptr', 'term_docs', 'term_tf', 'keyword_indptr', 'keyword_ids')
+
+
+def default_model_path(db_path: str = None) -> str:
+    #a folder next to the catalog unless METADATA_KEYWORD_MODEL says otherwise
+    return os.environ.get("METADATA_KEYWORD_MODEL") or f"{db_path or DEFAULT_CATALOG}.keywords"
+
+
+def tokenize(text: str) -> list:
+    #words of at least two letters, no numbers, no stopwords
+    #(plain ASCII text has no accents to take off, that is most of the time)
+    text = text or ''
+    text = text.casefold() if text.isascii() else normalize_text(text)
+    return [w for w in re.findall(r'[^\W\d_]{2,}', text) if w not in STOPWORDS]
+
+
+def _term_counts(title: str, description: str) -> Counter:
+    counts = Counter(tokenize(description))
+    for word in tokenize(title):
+        counts[word] += TITLE_WEIGHT
+    return counts
+
+
+def _stamp(indexed_at) -> int:
+    #when the catalog (re)indexed the record, a changed file gets a new time
+    try:
+        return int(datetime.fromisoformat(indexed_at).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+class KeywordModel:
+    __slots__ = ("path", "terms", "term_ids", "keywords", "keyword_index", "catalog_state", "generation", "folder") + ARRAYS
+
+    def __init__(self, path: str):
+        self.path = path
+        self.terms, self.keywords, self.catalog_state, self.generation, self.folder = [], [], None, 0, None
+        self.record_ids = np.empty(0, dtype=np.int64)
+        self.stamps = np.empty(0, dtype=np.int64)
+        self.doc_norms = np.empty(0, dtype=np.float32)
+        self.term_indptr = np.zeros(1, dtype=np.int64)
+        self.term_docs = np.empty(0, dtype=np.int32)
+        self.term_tf = np.empty(0, dtype=np.float32)
+        self.keyword_indptr = np.zeros(1, dtype=np.int64)
+        self.keyword_ids = np.empty(0, dtype=np.int32)
+        self.term_ids, self.keyword_index = {}, {}
+
+    @classmethod
+    def load(cls, path: str):
+        #the saved model (arrays memory mapped), an empty one if there is none yet
+        model = cls(path)
+        try:
+            with open(os.path.join(path, "model.json"), encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return model
+        if info.get('version') != MODEL_VERSION:
+            return model
+        model.terms, model.keywords = info['terms'], info['keywords']
+        model.catalog_state, model.generation = info['catalog_state'], info['generation']
+        model.folder = info.get('folder', f"generation-{model.generation}")
+        try:
+            for name in ARRAYS:
+                setattr(model, name, np.load(os.path.join(path, model.folder, f"{name}.npy"), mmap_mode='r'))
+        except (OSError, ValueError):
+            #the generation was deleted (or half written) in between, as if there was no model yet
+            return cls(path)
+        model.term_ids = {term: i for i, term in enumerate(model.terms)}
+        model.keyword_index = {name_key(keyword): i for i, keyword in enumerate(model.keywords)}
+        return model
+
+    def save(self):
+        #every save is a new generation folder (a name no other process uses) and model.json
+        #points to it last, so open (memory mapped) arrays are never overwritten
+        previous = self.folder
+        self.generation += 1
+        self.folder = f"generation-{self.generation}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        folder = os.path.join(self.path, self.folder)
+        os.makedirs(folder)
+        for name in ARRAYS:
+            np.save(os.path.join(folder, f"{name}.npy"), np.asarray(getattr(self, name)))
+        info = {'version': MODEL_VERSION, 'generation': self.generation, 'folder': self.folder,
+                'catalog_state': self.catalog_state, 'terms': self.terms, 'keywords': self.keywords}
+        temp = os.path.join(self.path, f"model.json.{os.getpid()}.tmp")
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False)
+        os.replace(temp, os.path.join(self.path, "model.json"))
+        #older generations once no process should be about to read them any more
+        #(and if nothing has them open, Windows keeps them until then), the time
+        #of a folder is when it was replaced
+        now = time.time()
+        if previous and os.path.isdir(os.path.join(self.path, previous)):
+            os.utime(os.path.join(self.path, previous), (now, now))
+        for entry in os.listdir(self.path):
+            entry_path = os.path.join(self.path, entry)
+            if entry.startswith("generation-") and entry != self.folder:
+                try:
+                    replaced = now - os.path.getmtime(entry_path) > GENERATION_GRACE_SECONDS
+                except OSError:
+                    continue
+                if replaced:
+                    shutil.rmtree(entry_path, ignore_errors=True)
+
+    def _remove(self, drop: np.ndarray):
+        #take out the records where drop is True, the others are numbered again in the same order
+        keep = ~drop
+        new_number = np.cumsum(keep) - 1
+        term_of_posting = np.repeat(np.arange(len(self.terms)), np.diff(self.term_indptr))
+        kept = keep[self.term_docs]
+        self.term_indptr = np.concatenate([[0], np.cumsum(np.bincount(term_of_posting[kept], minlength=len(self.terms)))])
+        self.term_docs = new_number[self.term_docs[kept]].astype(np.int32)
+        self.term_tf = np.asarray(self.term_tf)[kept]
+
+        keyword_counts = np.diff(self.keyword_indptr)
+        self.keyword_ids = np.asarray(self.keyword_ids)[np.repeat(keep, keyword_counts)]
+        self.keyword_indptr = np.concatenate([[0], np.cumsum(keyword_counts[keep])])
+        self.record_ids = np.asarray(self.record_ids)[keep]
+        self.stamps = np.asarray(self.stamps)[keep]
+        self.doc_norms = np.asarray(self.doc_norms)[keep]
+
+    def _add(self, rows, keywords_by_record: dict):
+        #rows: (id, title, description, indexed_at), appended after the records already in the model
+        first = len(self.record_ids)
+        old_terms = np.repeat(np.arange(len(self.terms), dtype=np.int64), np.diff(self.term_indptr))
+        new_terms, new_docs, new_tf, norms = [], [], [], []
+        keyword_counts, keyword_ids = [], []
+        for number, (record_id, title, description, _) in enumerate(rows, first):
+            counts = _term_counts(title, description)
+            for term, count in counts.items():
+                term_id = self.term_ids.get(term)
+                if term_id is None:
+                    term_id = self.term_ids[term] = len(self.terms)
+                    self.terms.append(term)
+                new_terms.append(term_id)
+                new_docs.append(number)
+                #sublinear tf, a word 10 times isn't 10 times as telling
+                new_tf.append(1.0 + math.log(count))
+            #pivoted unique normalization: long abstracts don't win just by having more words
+            norms.append(math.sqrt(len(counts)) or 1.0)
+
+            ids = []
+            for keyword in keywords_by_record.get(record_id, []):
+                key = name_key(keyword)
+                if key not in self.keyword_index:
+                    self.keyword_index[key] = len(self.keywords)
+                    self.keywords.append(keyword)
+                ids.append(self.keyword_index[key])
+            keyword_counts.append(len(ids))
+            keyword_ids.extend(ids)
+
+        #merge the new postings into the per word lists (the new records come after the old ones in each)
+        all_terms = np.concatenate([old_terms, np.asarray(new_terms, dtype=np.int64)])
+        order = np.argsort(all_terms, kind='stable')
+        self.term_docs = np.concatenate([self.term_docs, np.asarray(new_docs, dtype=np.int32)])[order]
+        self.term_tf = np.concatenate([self.term_tf, np.asarray(new_tf, dtype=np.float32)])[order]
+        self.term_indptr = np.concatenate([[0], np.cumsum(np.bincount(all_terms, minlength=len(self.terms)))])
+
+        self.keyword_ids = np.concatenate([self.keyword_ids, np.asarray(keyword_ids, dtype=np.int32)])
+        self.keyword_indptr = np.concatenate([self.keyword_indptr, self.keyword_indptr[-1] + np.cumsum(keyword_counts, dtype=np.int64)])
+        self.record_ids = np.concatenate([self.record_ids, np.array([row[0] for row in rows], dtype=np.int64)])
+        self.stamps = np.concatenate([self.stamps, np.array([_stamp(row[3]) for row in rows], dtype=np.int64)])
+        self.doc_norms = np.concatenate([self.doc_norms, np.asarray(norms, dtype=np.float32)])
+
+    def similar(self, title: str, description: str, k=NEIGHBOURS):
+        #(record numbers, scores) of the k most similar records, most similar first
+        n_docs = len(self.record_ids)
+        if not n_docs:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        docs, contributions = [], []
+        for term, count in _term_counts(title, description).items():
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = int(self.term_indptr[term_id]), int(self.term_indptr[term_id + 1])
+            if start == end:
+                continue
+            idf = math.log((1 + n_docs) / (1 + end - start)) + 1.0
+            docs.append(self.term_docs[start:end])
+            contributions.append(self.term_tf[start:end] * ((1.0 + math.log(count)) * idf * idf))
+        if not docs:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        #only the records sharing a word with the text get a score
+        scores = np.bincount(np.concatenate(docs), weights=np.concatenate(contributions), minlength=n_docs)
+        scores /= self.doc_norms
+        k = min(k, n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] > 0]
+        return top, scores[top]
+
+    def suggest(self, title: str, description: str, existing=(), limit=10) -> list:
+        #[(keyword, score)]: keywords of the similar records, score = their share of the similarity
+        top, scores = self.similar(title, description)
+        if not len(top):
+            return []
+        votes = np.zeros(len(self.keywords))
+        for doc, score in zip(top, scores):
+            votes[self.keyword_ids[self.keyword_indptr[doc]:self.keyword_indptr[doc + 1]]] += score
+        votes /= scores.sum()
+
+        present = {name_key(keyword) for keyword in existing}
+        suggestions = []
+        for i in np.argsort(-votes):
+            if votes[i] < MIN_SCORE or len(suggestions) == limit:
+                break
+            if name_key(self.keywords[i]) not in present:
+                suggestions.append((self.keywords[i], float(votes[i])))
+        return suggestions
+
+
+def _catalog_state(conn) -> list:
+    #changes whenever records are added, changed or removed
+    row = conn.execute("SELECT count(*), max(id), max(indexed_at) FROM records").fetchone()
+    return [row[0], row[1], row[2]]
+
+
+def _lock(model_path: str, wait: float) -> str:
+    #the lock file of the model folder if this process got it (within wait seconds), else None
+    os.makedirs(model_path, exist_ok=True)
+    lock_path = os.path.join(model_path, "update.lock")
+    until = time.monotonic() + wait
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return lock_path
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - os.path.getmtime(lock_path) > LOCK_STALE_SECONDS:
+                os.remove(lock_path)
+                continue
+        except OSError:
+            continue
+        if time.monotonic() >= until:
+            return None
+        time.sleep(0.2)
+
+
+def update_model(db_path: str = None, model_path: str = None, rebuild=False, wait: float = 0) -> KeywordModel:
+    #bring the model up to date with the catalog, only the records that changed are read
+    #while another process updates it (wait seconds at most) the saved model is returned as it is
+    db_path = db_path or DEFAULT_CATALOG
+    model_path = model_path or default_model_path(db_path)
+    model = KeywordModel.load(model_path)
+    if not os.path.exists(db_path):
+        return model
+    conn = connect(db_path)
+    try:
+        state = _catalog_state(conn)
+        if state == model.catalog_state and not rebuild:
+            return model
+    finally:
+        conn.close()
+    lock_path = _lock(model_path, wait)
+    if lock_path is None:
+        return model
+    try:
+        _update(db_path, model_path, rebuild)
+    finally:
+        os.remove(lock_path)
+    return KeywordModel.load(model_path)
+
+
+def _update(db_path: str, model_path: str, rebuild: bool):
+    #with the lock: the saved model again (another process may have saved one), the changes, saved
+    model = KeywordModel.load(model_path)
+    if rebuild:
+        #everything again, the generations go on from the saved one
+        saved, model = model, KeywordModel(model_path)
+        model.generation, model.folder = saved.generation, saved.folder
+    conn = connect(db_path)
+    try:
+        state = _catalog_state(conn)
+        if state == model.catalog_state and not rebuild:
+            return
+        catalog = np.array(conn.execute("SELECT id, indexed_at FROM records").fetchall(), dtype=object).reshape(-1, 2)
+        ids = catalog[:, 0].astype(np.int64)
+        stamps = np.array([_stamp(value) for value in catalog[:, 1]], dtype=np.int64)
+
+        #records that are gone or were indexed again are taken out, and (again) added
+        current = dict(zip(ids.tolist(), stamps.tolist()))
+        drop = np.array([current.get(record_id) != stamp for record_id, stamp
+                         in zip(np.asarray(model.record_ids).tolist(), np.asarray(model.stamps).tolist())], dtype=bool)
+        if drop.any():
+            model._remove(drop)
+        known = set(np.asarray(model.record_ids).tolist())
+        added = [record_id for record_id in ids.tolist() if record_id not in known]
+
+        rows, keywords = [], {}
+        for start in range(0, len(added), READ_CHUNK):
+            chunk = added[start:start + READ_CHUNK]
+            marks = ', '.join('?' * len(chunk))
+            rows += [tuple(row) for row in conn.execute(
+                f"SELECT id, title, description, indexed_at FROM records WHERE id IN ({marks}) ORDER BY id", chunk)]
+            for record_id, keyword in conn.execute(f"SELECT record_id, keyword FROM keywords WHERE record_id IN ({marks})",
+                                                   chunk):
+                keywords.setdefault(record_id, []).append(keyword)
+        #merged into the arrays in one go
+        if rows:
+            model._add(rows, keywords)
+    finally:
+        conn.close()
+
+    model.catalog_state = state
+    model.save()
+
+
+#per catalog: (time it was last checked, model)
+_models = {}
+
+
+def get_model(db_path: str = None) -> KeywordModel:
+    #the model for the catalog, kept per process and checked against the catalog every CHECK_SECONDS
+    db_path = db_path or DEFAULT_CATALOG
+    checked, model = _models.get(db_path, (0.0, None))
+    if model is None or time.monotonic() - checked > CHECK_SECONDS:
+        model = update_model(db_path)
+        _models[db_path] = (time.monotonic(), model)
+    return model
+
+
+def suggest_keywords(title: str, description: str, existing=(), db_path: str = None, limit=10) -> list:
+    #used by the app and the terminal script, nothing when there is no catalog yet
+    db_path = db_path or DEFAULT_CATALOG
+    if not os.path.exists(db_path) or not (title or description):
+        return []
+    return get_model(db_path).suggest(title, description, existing, limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keyword suggestions from the metadata catalog")
+    parser.add_argument("--db", default=DEFAULT_CATALOG, help=f"catalog database (default: {DEFAULT_CATALOG})")
+    parser.add_argument("--model", help="model folder (default: next to the catalog)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="add the catalog changes to the model")
+    subparsers.add_parser("build", help="make the model again from the whole catalog")
+    suggest_parser = subparsers.add_parser("suggest", help="keywords for a title/description")
+    suggest_parser.add_argument("text", help="title and/or description")
+    suggest_parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "suggest":
+        model = update_model(args.db, args.model, wait=LOCK_WAIT_SECONDS)
+        for keyword, score in model.suggest('', args.text, limit=args.limit):
+            print(f"{score:5.0%}  {keyword}")
+        return 0
+
+    started = time.perf_counter()
+    model = update_model(args.db, args.model, rebuild=args.command == "build", wait=LOCK_WAIT_SECONDS)
+    print(f"{len(model.record_ids)} records, {len(model.terms)} words, {len(model.keywords)} keywords "
+          f"({time.perf_counter() - started:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
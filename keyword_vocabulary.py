@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 25 10:12:48 2026
+
+Keyword lists for the keyword suggestions (data/keywords.json: Datalakes
+parameters and GCMD science keywords, plus the lake names of data/lakes.json).
+A part of a keyword -> the matching terms while typing, also with one typo
+("oxyegn" still finds "Dissolved Oxygen"), and a keyword that is in a list ->
+its usual spelling with the subjectScheme/schemeUri for the export. Other names
+(aliases, e.g. "DO" for "Dissolved Oxygen") are only suggested, the front ends
+ask before a keyword is replaced by the term.
+
+Every name and every word in it is kept in one sorted list, so a prefix is a
+binary search. For the typos every name start is also stored with each letter
+left out once: a word with one wrong, missing or extra letter shares one of
+those with the typed text, which is a dictionary lookup.
+
+The built index is also kept in the shared cache (shared_cache.py, when there
+is one), so other app processes load it instead of building it again.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from shared_cache import cached, usable_cache
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+KEYWORDS_PATH = os.path.join(DATA_DIR, "keywords.json")
+LAKES_PATH = os.path.join(DATA_DIR, "lakes.json")
+
+#GCMD keywords are paths, the last part is the term
+GCMD_SEPARATOR = " > "
+#typos are only looked for in the first letters (and not in very short text)
+FUZZY_MIN_LENGTH = 4
+FUZZY_PREFIX_LENGTH = 8
+#changes when the built index changes, so the shared cache doesn't hand out an old one
+INDEX_VERSION = 2
+
+
+@dataclass(slots=True)
+class Term:
+    label: str  #what is shown
+    subject: str  #what is exported (the full path for GCMD)
+    scheme: str = ""
+    scheme_uri: str = ""
+    aliases: list = field(default_factory=list)
+
+
+def term_key(text: str) -> str:
+    #"Chlorophyll-a", "CHLOROPHYLL A" and "chlorophyll  a" should all match
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(re.sub(r'[\W_]+', ' ', text).split()).casefold()
+
+
+def _deletions(text: str) -> set:
+    #the text with each letter left out once
+    return {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def _one_edit(a: str, b: str) -> bool:
+    #a and b differ by at most one letter changed, added, left out or swapped with its neighbour
+    if abs(len(a) - len(b)) > 1:
+        return False
+    i = 0
+    while i < min(len(a), len(b)) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i:i + 2][::-1] and a[i + 2:] == b[i + 2:])
+    longer, shorter = (a, b) if len(a) > len(b) else (b, a)
+    return longer[i + 1:] == shorter[i:]
+
+
+class Vocabulary:
+    __slots__ = ("terms", "_names", "_name_keys", "_exact", "_fuzzy")
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        #the names come before the aliases, a name that is also another term's alias is that name
+        self._exact = {}
+        for i, term in enumerate(self.terms):
+            for name in (term.label, term.subject):
+                self._exact.setdefault(term_key(name), i)
+        for i, term in enumerate(self.terms):
+            for name in term.aliases:
+                self._exact.setdefault(term_key(name), i)
+        self._exact.pop('', None)
+        #every name and alias, and every word in them, as a sorted list for prefix search
+        #(word position 0 = the name itself starts with the text, shown first)
+        names = []
+        self._fuzzy = {}
+        for i, term in enumerate(self.terms):
+            for name in [term.label, term.subject] + term.aliases:
+                key = term_key(name)
+                if not key:
+                    continue
+                if name == term.subject and name != term.label:
+                    continue  #GCMD paths: only the exact match, every term starts with EARTH SCIENCE
+                words = key.split(' ')
+                for j in range(len(words)):
+                    suffix = ' '.join(words[j:])
+                    names.append((suffix, min(j, 1), i))
+                    start = suffix[:FUZZY_PREFIX_LENGTH]
+                    for length in range(FUZZY_MIN_LENGTH - 1, len(start) + 1):
+                        for variant in _deletions(start[:length]) | {start[:length]}:
+                            self._fuzzy.setdefault(variant, set()).add((start[:length], i))
+        names.sort()
+        self._names = names
+        self._name_keys = [key for key, _, _ in names]
+        #sets were only needed while building, tuples are smaller
+        self._fuzzy = {variant: tuple(found) for variant, found in self._fuzzy.items()}
+
+    @classmethod
+    def load(cls, path: str = KEYWORDS_PATH, lakes_path: str = LAKES_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        terms = []
+        for scheme in data['schemes']:
+            for entry in scheme['terms']:
+                if isinstance(entry, str):
+                    terms.append(Term(label=entry.split(GCMD_SEPARATOR)[-1], subject=entry,
+                                      scheme=scheme['name'], scheme_uri=scheme.get('uri', '')))
+                else:
+                    terms.append(Term(label=entry['label'], subject=entry.get('subject', entry['label']),
+                                      scheme=scheme['name'], scheme_uri=scheme.get('uri', ''),
+                                      aliases=entry.get('aliases', [])))
+        #lake names have no scheme, the names are the same as in the location section
+        if lakes_path and os.path.exists(lakes_path):
+            with open(lakes_path, encoding='utf-8') as f:
+                for lake in json.load(f)['lakes']:
+                    terms.append(Term(label=lake['name'], subject=lake['name'], aliases=lake.get('aliases', [])))
+        return cls(terms)
+
+    def complete(self, text: str, limit=10) -> list:
+        #terms with a name/alias (or a word in it) starting with the text, names that start
+        #with it first, then the ones with one typo, each in the order of the keyword lists
+        key = term_key(text)
+        if not key:
+            return []
+        ranked = {}
+        start = bisect.bisect_left(self._name_keys, key)
+        for name, position, index in self._names[start:]:
+            if not name.startswith(key):
+                break
+            ranked[index] = min(position, ranked.get(index, 2))
+
+        if len(ranked) < limit and len(key) >= FUZZY_MIN_LENGTH:
+            start = key[:FUZZY_PREFIX_LENGTH]
+            for variant in _deletions(start) | {start}:
+                #sharing a variant can also be two letters apart, so check
+                for prefix, index in self._fuzzy.get(variant, ()):
+                    if index not in ranked and _one_edit(start, prefix):
+                        ranked[index] = 2
+
+        return [self.terms[i] for i in sorted(ranked, key=lambda i: (ranked[i], i))[:limit]]
+
+    def to_state(self) -> dict:
+        #the built index as JSON, from_state makes the same Vocabulary again without building it
+        return {'terms': [[t.label, t.subject, t.scheme, t.scheme_uri, t.aliases] for t in self.terms],
+                'names': self._names,
+                'exact': self._exact,
+                'fuzzy': self._fuzzy}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        vocabulary = cls.__new__(cls)
+        vocabulary.terms = [Term(*term) for term in state['terms']]
+        vocabulary._names = [tuple(name) for name in state['names']]
+        vocabulary._name_keys = [key for key, _, _ in vocabulary._names]
+        vocabulary._exact = state['exact']
+        vocabulary._fuzzy = {variant: tuple(tuple(found) for found in entries)
+                             for variant, entries in state['fuzzy'].items()}
+        return vocabulary
+
+    def _find(self, keyword: str):
+        #(term, is it its name or GCMD path) for a name or alias (any case/accents/punctuation)
+        key = term_key(keyword)
+        index = self._exact.get(key)
+        if index is None:
+            return None, False
+        term = self.terms[index]
+        return term, key in (term_key(term.label), term_key(term.subject))
+
+    def lookup(self, keyword: str):
+        #the term with exactly this name or GCMD path (any case/accents/punctuation), else None
+        term, is_name = self._find(keyword)
+        return term if is_name else None
+
+    def alias_of(self, keyword: str):
+        #the term that has the keyword as another name ("DO" -> Dissolved Oxygen), else None
+        term, is_name = self._find(keyword)
+        return None if is_name else term
+
+
+@lru_cache(maxsize=1)
+def get_vocabulary() -> Vocabulary:
+    #loaded once, the bundled keyword lists
+    cache = usable_cache()
+    if cache is None or cache.name == "memory":
+        return Vocabulary.load()
+    #shared with the other processes, the key changes with the lists
+    content = hashlib.sha1()
+    for path in (KEYWORDS_PATH, LAKES_PATH):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                content.update(f.read())
+    built = []
+
+    def build():
+        built.append(Vocabulary.load())
+        return built[0].to_state()
+    state = cached(f"vocabulary:{INDEX_VERSION}:{content.hexdigest()[:16]}", build)
+    return built[0] if built else Vocabulary.from_state(state)
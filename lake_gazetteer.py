@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 13:26:55 2026
+
+Offline lake gazetteer for the location section (data/lakes.json).
+Coordinates -> the lake they are in (or the closest one), and a part of a lake
+name -> the matching lakes with a representative point, so the same lake always
+gets the same name ("LAKE GENEVA", "Lac Léman" and "Genfersee" are one lake).
+
+The lake points are kept in a small k-d tree (points on the unit sphere so the
+straight line distance orders them the same as the distance over the earth).
+"""
+
+import bisect
+import heapq
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from metadata_catalog import EARTH_RADIUS_KM, haversine_km, name_key
+
+
+LAKES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lakes.json")
+
+#a point this close to a lake (but outside its box) is still suggested as that lake
+NEARBY_KM = 2.0
+#how many of the closest lake points are checked for that
+NEAREST_CANDIDATES = 8
+#points per block in locate_many (points x lakes arrays)
+LOCATE_CHUNK = 10_000
+
+
+@dataclass(slots=True)
+class Lake:
+    name: str
+    latitude: float
+    longitude: float
+    bbox: tuple  #(west, south, east, north)
+    aliases: list = field(default_factory=list)
+
+    def contains(self, latitude, longitude) -> bool:
+        west, south, east, north = self.bbox
+        return west <= longitude <= east and south <= latitude <= north
+
+    def distance_to_bbox(self, latitude, longitude) -> float:
+        #km to the closest point of the box, 0 inside
+        west, south, east, north = self.bbox
+        return haversine_km(latitude, longitude, min(max(latitude, south), north), min(max(longitude, west), east))
+
+    def bbox_area(self) -> float:
+        west, south, east, north = self.bbox
+        return (east - west) * (north - south)
+
+
+@dataclass(slots=True)
+class LakeMatch:
+    lake: Lake
+    distance_km: float
+    inside: bool
+
+
+def _unit_vector(latitude, longitude) -> tuple:
+    phi, lmb = math.radians(latitude), math.radians(longitude)
+    return (math.cos(phi) * math.cos(lmb), math.cos(phi) * math.sin(lmb), math.sin(phi))
+
+
+class KDTree:
+    #static k-d tree over 3d points, built once, k nearest neighbour search
+    __slots__ = ("points", "_root")
+
+    def __init__(self, points):
+        self.points = list(points)
+        self._root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return None
+        axis = depth % 3
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        #node = (point index, split axis, left, right)
+        return (indices[mid], axis, self._build(indices[:mid], depth + 1), self._build(indices[mid + 1:], depth + 1))
+
+    def nearest(self, point, k=1) -> list:
+        #[(squared distance, point index)], closest first
+        heap = []  #max heap through negative distances
+
+        def search(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            candidate = self.points[index]
+            dist2 = sum((a - b) ** 2 for a, b in zip(candidate, point))
+            if len(heap) < k:
+                heapq.heappush(heap, (-dist2, index))
+            elif dist2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-dist2, index))
+
+            diff = point[axis] - candidate[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            #the other side can only help if the split plane is closer than the worst kept point
+            if len(heap) < k or diff * diff < -heap[0][0]:
+                search(far)
+
+        search(self._root)
+        return sorted((-d, i) for d, i in heap)
+
+
+class Gazetteer:
+    __slots__ = ("lakes", "_tree", "_names", "_name_keys", "_exact", "_bboxes")
+
+    def __init__(self, lakes):
+        self.lakes = list(lakes)
+        self._tree = KDTree(_unit_vector(lake.latitude, lake.longitude) for lake in self.lakes)
+        self._bboxes = np.array([lake.bbox for lake in self.lakes], dtype=float).reshape(-1, 4)
+
+        #every name and alias, and every word in them, as a sorted list for prefix search
+        #("gen" finds "Lake Geneva" and "Genfersee")
+        self._exact = {}
+        names = []
+        for i, lake in enumerate(self.lakes):
+            for name in [lake.name] + lake.aliases:
+                key = name_key(name)
+                self._exact.setdefault(key, i)
+                words = key.split(' ')
+                names.extend((' '.join(words[j:]), i) for j in range(len(words)))
+        names.sort()
+        self._names = names
+        self._name_keys = [key for key, _ in names]
+
+    @classmethod
+    def load(cls, path: str = LAKES_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(Lake(name=entry['name'], latitude=float(entry['latitude']), longitude=float(entry['longitude']),
+                        bbox=tuple(entry['bbox']), aliases=entry.get('aliases', [])) for entry in data['lakes'])
+
+    def nearest(self, latitude, longitude, k=1) -> list:
+        #[(distance_km, Lake)] to the lake points, closest first
+        results = []
+        for dist2, index in self._tree.nearest(_unit_vector(latitude, longitude), k):
+            #straight line through the earth -> distance over the surface
+            chord = math.sqrt(dist2)
+            results.append((2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2)), self.lakes[index]))
+        return results
+
+    def locate(self, latitude, longitude, max_km=NEARBY_KM):
+        #the lake the point is in (smallest box if the boxes overlap), else the lake whose
+        #box is closest, if it is within max_km, else None
+        inside = [lake for lake in self.lakes if lake.contains(latitude, longitude)]
+        if inside:
+            lake = min(inside, key=Lake.bbox_area)
+            return LakeMatch(lake, haversine_km(latitude, longitude, lake.latitude, lake.longitude), True)
+
+        #the closest lake points are the candidates, then the distance to their outline box
+        best = None
+        for _, lake in self.nearest(latitude, longitude, NEAREST_CANDIDATES):
+            distance = lake.distance_to_bbox(latitude, longitude)
+            if distance <= max_km and (best is None or distance < best.distance_km):
+                best = LakeMatch(lake, distance, False)
+        return best
+
+    def locate_many(self, latitudes, longitudes, max_km=NEARBY_KM) -> np.ndarray:
+        #locate for whole columns of points: lake names, "" where there is no lake
+        #(same rules as locate, every point against every lake box as arrays, the list of lakes is short)
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        names = np.array([lake.name for lake in self.lakes] + [""], dtype=object)
+        found = np.full(len(latitudes), len(self.lakes))
+        west, south, east, north = (self._bboxes[:, i] for i in range(4))
+        area = (east - west) * (north - south)
+
+        for start in range(0, len(latitudes), LOCATE_CHUNK):
+            lat = latitudes[start:start + LOCATE_CHUNK, None]
+            lon = longitudes[start:start + LOCATE_CHUNK, None]
+            inside = (lon >= west) & (lon <= east) & (lat >= south) & (lat <= north)
+            smallest = np.argmin(np.where(inside, area, np.inf), axis=1)
+
+            #distance to the closest point of each box
+            lat1, lon1 = np.radians(lat), np.radians(lon)
+            lat2, lon2 = np.radians(np.clip(lat, south, north)), np.radians(np.clip(lon, west, east))
+            a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+            closest = np.argmin(np.where(np.isnan(distance), np.inf, distance), axis=1)
+            near = np.take_along_axis(distance, closest[:, None], axis=1)[:, 0] <= max_km
+
+            found[start:start + LOCATE_CHUNK] = np.where(inside.any(axis=1), smallest,
+                                                         np.where(near, closest, len(self.lakes)))
+        return names[found]
+
+    def complete(self, text: str, limit=10) -> list:
+        #lakes with a name/alias (or a word in it) starting with the text
+        key = name_key(text)
+        if not key:
+            return []
+        found = []
+        start = bisect.bisect_left(self._name_keys, key)
+        for name, index in self._names[start:]:
+            if not name.startswith(key):
+                break
+            if self.lakes[index] not in found:
+                found.append(self.lakes[index])
+                if len(found) == limit:
+                    break
+        return found
+
+    def lookup(self, name: str):
+        #the lake with exactly this name or alias (any case/accents), else None
+        index = self._exact.get(name_key(name))
+        return None if index is None else self.lakes[index]
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    #loaded once, the bundled lakes
+    return Gazetteer.load()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 13:47:10 2026
+
+Many sampling locations at once, from a CSV table or a GeoJSON file, instead of
+adding stations one by one in the form.
+
+The whole table is checked in one go (numpy/pandas on the columns, no loop over
+the rows): coordinates are converted (coordinates.py, so LV95/LV03/DMS work too),
+missing and out of range values are flagged, points that are the same after
+rounding are found as duplicates (also against the locations already added),
+and rows without a name get the lake they are in (lake_gazetteer.py).
+Only the rows with a problem need to be looked at.
+
+GeoJSON polygons (lake outlines) become a location with the outline, simplified
+to a few vertices (geometry.py), and the middle of the outline as the point.
+"""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from coordinates import to_wgs84
+from geometry import simplify_polygon
+from lake_gazetteer import get_gazetteer
+
+
+#column names that are understood (lower case, spaces as _)
+NAME_COLUMNS = ('lake_name', 'lake', 'name', 'site', 'site_name', 'station', 'station_name',
+                'geolocationplace', 'place')
+LATITUDE_COLUMNS = ('latitude', 'lat', 'pointlatitude', 'north', 'northing', 'n', 'y')
+LONGITUDE_COLUMNS = ('longitude', 'lon', 'lng', 'long', 'pointlongitude', 'east', 'easting', 'e', 'x')
+
+#points closer than this (decimal places, 5 = ~1 m) count as the same point
+DUPLICATE_DECIMALS = 5
+#decimals kept for the saved coordinates
+COORDINATE_DECIMALS = 6
+
+TABLE_COLUMNS = ['lake_name', 'latitude', 'longitude']
+
+
+##################################################
+"""READING"""
+##################################################
+
+def _find_column(columns, candidates):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def read_csv_locations(source) -> pd.DataFrame:
+    #CSV (comma, semicolon or tab separated) -> lake_name, latitude, longitude as text
+    table = pd.read_csv(source, sep=None, engine='python', dtype=str, keep_default_na=False,
+                        skipinitialspace=True, encoding='utf-8-sig')
+    columns = {str(c).strip().lower().replace(' ', '_'): c for c in table.columns}
+    lat_column = _find_column(columns, LATITUDE_COLUMNS)
+    lon_column = _find_column(columns, LONGITUDE_COLUMNS)
+    if lat_column is None or lon_column is None:
+        raise ValueError(f"Could not find the coordinate columns, expected e.g. 'latitude' and 'longitude' "
+                         f"(or 'east'/'north'). Columns found: {', '.join(map(str, table.columns))}")
+    name_column = _find_column(columns, NAME_COLUMNS)
+
+    return pd.DataFrame({
+        'lake_name': table[name_column].str.strip() if name_column is not None else '',
+        'latitude': table[lat_column].str.strip(),
+        'longitude': table[lon_column].str.strip()})
+
+
+def _outline(geometry: dict) -> np.ndarray:
+    #outer ring of a Polygon, or of the largest part of a MultiPolygon, as (latitude, longitude) rows
+    if geometry['type'] == 'Polygon':
+        rings = [geometry['coordinates'][0]]
+    else:
+        rings = [polygon[0] for polygon in geometry['coordinates'] if polygon]
+    best, best_area = None, -1.0
+    for ring in rings:
+        lon, lat = np.asarray(ring, dtype=float)[:, :2].T
+        #shoelace, only to compare the parts
+        area = abs(np.dot(lon, np.roll(lat, -1)) - np.dot(lat, np.roll(lon, -1)))
+        if area > best_area:
+            best, best_area = np.column_stack([lat, lon]), area
+    return best
+
+
+def read_geojson_locations(source) -> pd.DataFrame:
+    #GeoJSON points (FeatureCollection, Feature or bare geometry) -> same table as the CSV,
+    #polygons get their simplified outline in a 'polygon' column,
+    #other geometries are kept as rows with a problem already filled in
+    document = json.load(source) if hasattr(source, 'read') else json.loads(source)
+    if document.get('type') == 'FeatureCollection':
+        features = document.get('features') or []
+    elif document.get('type') == 'Feature':
+        features = [document]
+    else:
+        features = [{'type': 'Feature', 'geometry': document, 'properties': {}}]
+
+    rows = []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        properties = {str(k).lower(): v for k, v in (feature.get('properties') or {}).items()}
+        name = next((str(properties[c]).strip() for c in NAME_COLUMNS if properties.get(c)), '')
+        if geometry.get('type') == 'Point' and len(geometry.get('coordinates') or []) >= 2:
+            #GeoJSON is longitude, latitude
+            lon, lat = geometry['coordinates'][:2]
+            rows.append((name, str(lat), str(lon), '', []))
+        elif geometry.get('type') in ('Polygon', 'MultiPolygon'):
+            try:
+                outline = _outline(geometry)
+                polygon = simplify_polygon(outline)
+            except (IndexError, TypeError, ValueError) as e:
+                rows.append((name, '', '', f"outline can't be read ({e})", []))
+                continue
+            #the middle of the outline (without the closing point) as the point of the location
+            if (outline[0] == outline[-1]).all():
+                outline = outline[:-1]
+            lat, lon = outline.mean(axis=0).round(COORDINATE_DECIMALS)
+            rows.append((name, str(lat), str(lon), '', [list(point) for point in polygon]))
+        else:
+            rows.append((name, '', '', f"not a point or polygon ({geometry.get('type') or 'no geometry'})", []))
+    return pd.DataFrame(rows, columns=TABLE_COLUMNS + ['problem', 'polygon'])
+
+
+def read_locations(content: bytes, filename: str) -> pd.DataFrame:
+    #uploaded file -> table of lake_name, latitude, longitude (text, as in the file)
+    if filename.lower().endswith(('.geojson', '.json')):
+        try:
+            return read_geojson_locations(content.decode('utf-8-sig'))
+        except (UnicodeDecodeError, json.JSONDecodeError, AttributeError) as e:
+            raise ValueError(f"Could not read '{filename}' as GeoJSON: {e}") from e
+    try:
+        return read_csv_locations(io.BytesIO(content))
+    except (UnicodeDecodeError, pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+        raise ValueError(f"Could not read '{filename}' as CSV: {e}") from e
+
+
+##################################################
+"""CHECKING"""
+##################################################
+
+def _point_keys(latitudes, longitudes) -> np.ndarray:
+    #one integer per point after rounding, same point -> same key
+    scale = 10 ** DUPLICATE_DECIMALS
+    lat = np.round(np.asarray(latitudes, dtype=float) * scale).astype(np.int64)
+    lon = np.round(np.asarray(longitudes, dtype=float) * scale).astype(np.int64)
+    return lat * (400 * scale) + lon
+
+
+def check_locations(table: pd.DataFrame, existing=()):
+    #-> (good rows, rows with a problem)
+    #good: lake_name, latitude, longitude (as in session_state.locations) and the system it was in
+    #problems: row (1 = first row of the file), the values and what is wrong
+    #(a 'problem' column from the reader is kept)
+    table = table.reset_index(drop=True)
+    problems = (table['problem'].fillna('').to_numpy(dtype=object) if 'problem' in table
+                else np.full(len(table), '', dtype=object))
+    polygons = table['polygon'] if 'polygon' in table else None
+    table = table[TABLE_COLUMNS].fillna('').astype(str)
+    rows = len(table)
+
+    lat, lon, systems = to_wgs84(table['latitude'].to_numpy(), table['longitude'].to_numpy())
+    converted = systems != ''
+
+    lat_missing = table['latitude'].str.strip().eq('').to_numpy()
+    lon_missing = table['longitude'].str.strip().eq('').to_numpy()
+    problems[lat_missing & lon_missing & (problems == '')] = 'coordinates missing'
+    problems[lat_missing & (problems == '')] = 'latitude missing'
+    problems[lon_missing & (problems == '')] = 'longitude missing'
+
+    numeric = (pd.to_numeric(table['latitude'], errors='coerce').notna()
+               & pd.to_numeric(table['longitude'], errors='coerce').notna()).to_numpy()
+    unread = ~converted & (problems == '')
+    problems[unread & numeric] = 'outside the valid range (latitude -90 to 90, longitude -180 to 180)'
+    problems[unread & ~numeric] = 'not a coordinate (decimal degrees, LV95, LV03 or degrees minutes seconds)'
+
+    #duplicates, within the file and with the locations added before
+    keys = _point_keys(np.where(converted, lat, 0), np.where(converted, lon, 0))
+    if len(existing):
+        existing_lat, existing_lon, existing_systems = to_wgs84([loc['latitude'] for loc in existing],
+                                                                [loc['longitude'] for loc in existing])
+        existing_keys = _point_keys(np.nan_to_num(existing_lat), np.nan_to_num(existing_lon))[existing_systems != '']
+        already_added = converted & np.isin(keys, existing_keys)
+        problems[already_added & (problems == '')] = 'already in the locations'
+
+    key_series = pd.Series(np.where(converted, keys, -np.arange(1, rows + 1)))
+    repeated = key_series.duplicated(keep='first').to_numpy() & (problems == '')
+    if repeated.any():
+        first_row = pd.Series(np.arange(1, rows + 1)).groupby(key_series).transform('first').to_numpy()
+        problems[repeated] = [f"same point as row {row}" for row in first_row[repeated]]
+
+    #names: known lakes get their usual name, no name -> the lake the point is in
+    gazetteer = get_gazetteer()
+    names = table['lake_name'].str.strip()
+    canonical = {name: (lake.name if (lake := gazetteer.lookup(name)) else name) for name in names.unique()}
+    names = names.map(canonical).to_numpy(dtype=object)
+    unnamed = (names == '') & converted
+    if unnamed.any():
+        names[unnamed] = gazetteer.locate_many(lat[unnamed], lon[unnamed])
+    problems[(names == '') & (problems == '')] = 'no lake/site name (and not in a known lake)'
+
+    good = problems == ''
+    good_rows = pd.DataFrame({
+        'lake_name': names[good],
+        'latitude': np.round(lat[good], COORDINATE_DECIMALS).astype(str),
+        'longitude': np.round(lon[good], COORDINATE_DECIMALS).astype(str),
+        'system': systems[good]})
+    problem_rows = table[~good].assign(problem=problems[~good])
+    if polygons is not None:
+        good_rows['polygon'] = polygons[good].to_list()
+        problem_rows['polygon'] = polygons[~good]
+    problem_rows.insert(0, 'row', np.flatnonzero(~good) + 1)
+    return good_rows, problem_rows.reset_index(drop=True)
+
+
+def to_locations(good: pd.DataFrame) -> list:
+    #checked rows -> entries for session_state.locations (the outline only where there is one)
+    locations = good[TABLE_COLUMNS].to_dict('records')
+    if 'polygon' in good:
+        for location, polygon in zip(locations, good['polygon']):
+            if isinstance(polygon, list) and polygon:
+                location['polygon'] = polygon
+    return locations
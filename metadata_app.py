@@ -11,12 +11,36 @@ for better user experience.
 
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import requests
+import pandas as pd
 import csv
-import json
 import re
+import os
+import secrets
+import glob
 from io import StringIO
 from datetime import datetime
+from metadata_model import (DateRange, keyword_replacements, keyword_subjects, merge_periods, split_keywords,
+                            to_session_state)
+from metadata_import import load_record
+from metadata_validate import validate_datacite
+from metadata_export import EXPORT_FORMATS, ExportBundle
+from metadata_catalog import check_duplicates
+from metadata_drafts import APP_SECTIONS, group_sections, list_drafts, load_draft, new_draft_id, save_draft
+from draft_history import DraftHistory
+from session_budget import session_report, track_session
+from shared_cache import cache_get, cache_put
+from metadata_time import envelope, read_periods
+from lake_gazetteer import get_gazetteer
+from keyword_vocabulary import get_vocabulary, term_key
+from keyword_suggest import suggest_keywords
+from coordinates import convert_point
+from geometry import POLYGON_MAX_POINTS
+from location_import import TABLE_COLUMNS, check_locations, read_locations, to_locations
+from contributor_table import apply_changes, count_changes, to_row, to_table
+from data_profile import DATA_EXTENSIONS, find_data_files, merge_profiles, profile_file, profile_paths
+from file_manifest import build_manifest, datacite_formats, datacite_sizes, manifest_text, MD5_MANIFEST, SHA256_MANIFEST
 
 #setup the page configuration
 st.set_page_config(
@@ -40,6 +64,17 @@ if 'current_step' not in st.session_state:
 DATASET_LICENSES = ["CC BY 4.0","CC0", "CC BY-NC 4.0", "CC BY-SA 4.0"]
 SOFTWARE_LICENSES = ["MIT", "Apache License 2.0", "GNU GPL-3.0", "GNU GLP-2.0"]
 
+#long contributor/location lists are shown in pages of this many (with a search)
+PAGE_SIZE = 20
+#the largest sessions of the server in the sidebar (for whoever runs the server)
+SHOW_SESSION_REPORT = bool(os.environ.get("METADATA_SESSION_REPORT"))
+#ORCID/ROR search results are kept this long in the cache (shared by all app processes, see shared_cache.py)
+LOOKUP_CACHE_SECONDS = 24 * 60 * 60
+#page link parameter with the draft key of the browser (only its own drafts are listed)
+DRAFT_KEY_PARAM = "draft_key"
+#files on the server are only read below this folder, without it only uploaded files can be read
+DATA_ROOT = os.environ.get("METADATA_DATA_ROOT", "")
+
 
 #orcid id
 def lookup_orcid_id(first_name, last_name, max_results =5):
@@ -50,6 +85,12 @@ def lookup_orcid_id(first_name, last_name, max_results =5):
     first_name = first_name.strip()
     last_name = last_name.strip()
     
+    #someone else may have looked up the same name already
+    cache_key = f"orcid:{first_name.casefold()}|{last_name.casefold()}|{max_results}"
+    found = cache_get(cache_key)
+    if found is not None:
+        return found
+    
     try:
         #orcid api - using the csv search because allows for affil  pull
         #want affil so if there are mult entries then its easier to differentiate
@@ -81,6 +122,8 @@ def lookup_orcid_id(first_name, last_name, max_results =5):
                 'display_name': f"{row[1].strip()} {row[2].strip()}"
                 })
         
+        #only what was found, an error is looked up again next time
+        cache_put(cache_key, parsed_results, LOOKUP_CACHE_SECONDS)
         return parsed_results
     
     except Exception as e:
@@ -98,6 +141,11 @@ def lookup_ror_id(affiliation_name, max_results= 3):
     
     search_query = affiliation_name.strip()
     
+    cache_key = f"ror:{search_query.casefold()}|{max_results}"
+    found = cache_get(cache_key)
+    if found is not None:
+        return found
+    
     try:
         #ROR api
         url = "https://api.ror.org/organizations"
@@ -111,6 +159,7 @@ def lookup_ror_id(affiliation_name, max_results= 3):
         items = data.get('items', [])
         if not items:
             st.warning("NO results found.")
+            cache_put(cache_key, [], LOOKUP_CACHE_SECONDS)
             return []
         
         
@@ -170,6 +219,7 @@ def lookup_ror_id(affiliation_name, max_results= 3):
         if not parsed_results:
             st.warning("No valid ROR results found.")
             
+        cache_put(cache_key, parsed_results, LOOKUP_CACHE_SECONDS)
         return parsed_results
     
     except Exception as e:
@@ -224,6 +274,12 @@ def validate_doi(doi_str):
 #result_key is like a dictionary key, allows for reuse of this funtion for the 
 #primary author as well as the contributors 
 
+#the search results aren't needed anymore once one is picked or they are rejected
+#(old ones are also removed after a while, see session_budget.py)
+def clear_lookup_results(result_key):
+    for key in (f'orcid_results_{result_key}', f'orcid_search_performed_{result_key}', f'ror_results_{result_key}'):
+        st.session_state.pop(key, None)
+
 def orcid_lookup_component(name_key_first, name_key_last, result_key):
     #look up ORCID ID based on first and last name - will also pull affil
     first_name = st.session_state.get(name_key_first, "")
@@ -265,13 +321,14 @@ def orcid_lookup_component(name_key_first, name_key_last, result_key):
             with col1:
                 if st.button("✅ Use this ORCID ID", key=f"use_orcid_{result_key}"):
                     st.session_state[result_key] = result
+                    clear_lookup_results(result_key)
                     #rerun the script/refreshes the script
                     #need to do this after updating the session state
                     st.rerun()
             with col2:
                 if st.button("Do not use this ORCID ID", key=f"reject_orcid_{result_key}"):
-                    st.session_state[f'orcid_results_{result_key}'] = []
                     #this also clears the search results
+                    clear_lookup_results(result_key)
                     st.rerun()
         else:
             st.write(f"Found {len(results)} matches: ")
@@ -281,7 +338,7 @@ def orcid_lookup_component(name_key_first, name_key_last, result_key):
                         key=f"select_orcid_{result_key}_{i}"):
                     
                         st.session_state[result_key] = result
-                        st.session_state[f'orcid_results_{result_key}'] = []
+                        clear_lookup_results(result_key)
                         st.rerun()
     elif search_performed and not results:
         st.error("No ORCID match found. Doublecheck first and last name or use manunal ORCID entry.")
@@ -320,11 +377,11 @@ def ror_lookup_component(affiliation_key, result_key):
                 if st.button("✅ Use this ROR ID", key=f"use_ror_{result_key}"):
                     st.session_state[result_key] = result
                     #clear the search results after selection
-                    st.session_state[f'ror_results_{result_key}'] =[]
+                    clear_lookup_results(result_key)
                     st.rerun()
             with col2:
                 if st.button("Do not use this", key=f"reject_ror_{result_key}"):
-                    st.session_state[f'ror_results_{result_key}'] = []
+                    clear_lookup_results(result_key)
                     st.rerun()
         else:
             #thar be multiple results
@@ -343,25 +400,23 @@ def ror_lookup_component(affiliation_key, result_key):
                         if st.button("Select", key = f"select_ror_{result_key}_{i}"):
                             st.session_state[result_key] = result
                             #clear serach after selection
-                            st.session_state[f'ror_results_{result_key}']=[]
+                            clear_lookup_results(result_key)
                             st.rerun()
                             
             #option to clear if none selected
             st.write("----")
             if st.button("None of these are correct", key = f"clear_ror_{result_key}"):
-                st.session_state[f'ror_results_{result_key}']=[]
+                clear_lookup_results(result_key)
                 st.rerun()
     
     #no results found
-    elif f'ror_results_{result_key}' in st.session_state and st.session_state[f'ror_results_{result_key}'] == 0:
+    elif f'ror_results_{result_key}' in st.session_state and st.session_state[f'ror_results_{result_key}'] == []:
         st.warning("No ROR ID found for this institution.")
         st.warning("Check the spelling of the institution name.")
         
         #option to clear
         if st.button("Clear and try again", key =f"clear_no_results_{result_key}"):
-            ror_results_key = f'ror_results_{result_key}'
-            if ror_results_key in st.session_state:
-                del st.session_state[ror_results_key]
+            clear_lookup_results(result_key)
             st.rerun()
             
     #show the selected ror 
@@ -375,169 +430,22 @@ def ror_lookup_component(affiliation_key, result_key):
             if result_key in st.session_state:
                 del st.session_state[result_key]
             
-            ror_results_key = f'ror_results_{result_key}'
-            if ror_results_key in st.session_state:
-                del st.session_state[ror_results_key]
+            clear_lookup_results(result_key)
             st.rerun()
                     
 
-#convert what is entered into Datacite json format
-def generate_metadata():
-    metadata = {
-        "data": {
-            "type":"dois",
-            "attributes": {
-                "titles":[{"title": st.session_state.get('dataset_title', ''),"xml:lang":"en-us"}],
-                "creators": [],
-                "publisher": "Datalakes",
-                "publicationYear": st.session_state.get('publication_year', datetime.now().year),
-                "resourceType": st.session_state.get('resource_type', 'Dataset'),
-                "descriptions": [{"description": st.session_state.get('dataset_description', ''), "descriptionType": "Abstract", "xml:lang":"en-us"}]
-                }}}
-    
-    #author/creator information
-    author_first = st.session_state.get('author_first_name', '')
-    author_last = st.session_state.get('author_last_name', '')
-    author_email = st.session_state.get('author_email', ' ')
-    
-    if author_first and author_last:
-        creator = {"name": f"{author_first} {author_last}", 
-                   "nameType": "Personal"}
-        #orcid
-        author_orcid = st.session_state.get('author_orcid_data', {})
-        if author_orcid.get('orcid_id'):
-            creator["nameIdentifiers"] = [{
-                "schemeUri": "https://orcid.org",
-                "nameIdentifier": author_orcid['orcid_id'],
-                "nameIdentifierScheme": "ORCID"}]
-        
-        #affiliation
-        affiliation_name = st.session_state.get('author_affiliation', '')
-        if affiliation_name:
-            affiliation = {"name": affiliation_name}
-            author_ror = st.session_state.get('author_ror_data', {})
-            if author_ror.get('ror_id'):
-                affiliation.update({
-                "schemeUri": "https://ror.org",
-                "affiliationIdentifier": author_ror['ror_id'],
-                "affiliationIdentifierScheme": "ROR"})
-            creator["affiliation"] = [affiliation]
-        
-        #add all the creator information into the metadata
-        metadata["data"]["attributes"]["creators"] = [creator]
-
-    #contributors
-    contributors = st.session_state.get('contributors', [])
-    #cycle throught all the contributors
-    if contributors:
-        datacite_contributors = []
-        
-        for contrib in contributors:
-            contributor={
-                "name": contrib['name'],
-                "nameType": "Personal"}
-            
-            orcid_data = contrib.get('orcid_data', {})
-            if orcid_data and orcid_data.get('orcid_id'):
-                contributor["nameIdentifiers"] = [{
-                    "schemeUri": "https://orcid.org",
-                    "nameIdentifier": orcid_data['orcid_id'],
-                    "nameIdentifierScheme": "ORCID"}]
-            
-            affiliation_name = contrib.get('affiliation', '')
-            if affiliation_name:
-                affiliation = {"name": affiliation_name}
-                ror_data = contrib.get('ror_data', {})
-                if ror_data and ror_data.get('ror_id'):
-                    affiliation.update({
-                    "schemeUri": "https://ror.org",
-                    "affiliationIdentifier": ror_data['ror_id'],
-                    "affiliationIdentifierScheme": "ROR"})
-                contributor["affiliation"] = [affiliation]
-            
-            datacite_contributors.append(contributor)
-            
-        if datacite_contributors:
-            metadata["data"]["attributes"]["contributors"] = datacite_contributors
-    
-    #add location
-    locations = st.session_state.get('locations', [])
-    if locations:
-        geo_locations = []
-        
-        for location in locations:
-            try:
-                geo_location = {
-                    "geoLocationPlace": location['lake_name']}
-                
-                lat = float(location['latitude'])
-                lon = float(location['longitude'])
-                
-                geo_location["geoLocationPoint"] = {
-                    "pointLatitude": lat,
-                    "pointLongitude": lon}
-                
-                geo_locations.append(geo_location)
-                
-            except (ValueError, TypeError, KeyError):
-                continue
-        
-        if geo_locations:
-            metadata["data"]["attributes"]["geoLocations"] = geo_locations
-
-    
-    #add temporal 
-    start_date = st.session_state.get('start_date')
-    end_date = st.session_state.get('end_date')
-    
-    if start_date or end_date:
-        dates = []
-        if start_date and end_date:
-            dates.append({"date":f"{start_date}/{end_date}", "dateType":"Collected"})
-        #only one or the other
-        elif start_date:
-            dates.append({"date": str(start_date), "dateType": "Collected"})
-        elif end_date:
-            dates.append({"date": str(end_date), "dateType": "Collected"})
-        
-        if dates:
-            metadata["data"]["attributes"]["dates"] = dates
-    
-    #keywords
-    keywords = st.session_state.get('keywords', '')
-    if keywords:
-        keywords_list = [k.strip() for k in keywords.replace('\n', ',').split(',') if k.strip()]
-        if keywords_list:
-            metadata["data"]["attributes"]["subjects"] = [{"subject": kw, "xml:lang":"en-us"} for kw in keywords_list]
-    
-    #add creator email to the description (there is not currently Jan 2026 not a field for the creator email)
-    #hopefully this changes, until then
-    description_text = metadata["data"]["attributes"]["descriptions"][0]["description"]
-    if author_email:
-        #add to description
-        metadata["data"]["attributes"]["descriptions"].append({
-            "description": f"Creator contact: {author_first} {author_last} - {author_email}",
-            "descriptionType": "Other",
-            "xlm:lang": "en-us"
-        })
-    
-    
-    #add optional fields
-    if st.session_state.get('dataset_doi'):
-        metadata["data"]["attributes"]["doi"] = st.session_state['dataset_doi']
-    
-    if st.session_state.get('license'):
-        metadata["data"]["attributes"]["rightsList"] = [{"rights": st.session_state['license'],"xml:lang":"en-us"}]
-    
-    if st.session_state.get('dataset_version'):
-        metadata["data"]["attributes"]["version"] = st.session_state['dataset_version']
-    
-    return metadata
-
 #the "app"
 def main():
     st.title("Datalakes Metadata Generator")
     st.markdown("Create DataCite compliant metadata for your datasets")
+    
+    #has to run before the sections so the widgets pick up the loaded values
+    with st.sidebar:
+        drafts_section()
+        #filled at the end, after this run's changes are in the history
+        history_box = st.container()
+        import_section()
+        data_files_section()
 
     with st.expander("Author Information", expanded = True):
         author_section()
@@ -559,8 +467,266 @@ def main():
         
     with st.expander("Preview & export", expanded = True):
         export_section()
+    
+    autosave()
+    with history_box:
+        history_section()
+    session_housekeeping()
                 
 
+#what was typed is kept as a draft after every change, only the sections that changed are written
+#every change is also a version in the undo history
+def autosave():
+    sections = group_sections(st.session_state, APP_SECTIONS)
+    if 'draft_history' not in st.session_state:
+        st.session_state.draft_history = DraftHistory()
+    st.session_state.draft_history.commit(sections)
+    #the inputs start with defaults (dates, resource type), those alone aren't a draft yet
+    if not st.session_state.get('draft_hashes') and not any(
+            st.session_state.get(key) for key in ('author_first_name', 'author_last_name', 'dataset_title',
+                                                  'dataset_description', 'contributors', 'locations', 'keywords')):
+        return
+    if 'draft_id' not in st.session_state:
+        st.session_state.draft_id = new_draft_id()
+    st.session_state.draft_hashes = save_draft(
+        st.session_state.draft_id, sections, st.session_state.get('draft_hashes', {}),
+        front_end='app', title=st.session_state.get('dataset_title', ''), owner=draft_key())
+
+#old lookup results out of the session and its size for the server report
+def session_housekeeping():
+    ctx = get_script_run_ctx()
+    track_session(ctx.session_id if ctx else 'local', st.session_state)
+    if SHOW_SESSION_REPORT:
+        with st.sidebar.expander("Largest sessions on this server"):
+            st.dataframe(pd.DataFrame(session_report(10)), hide_index = True)
+
+#callback of the undo/redo buttons, runs before the widgets so they show the restored values
+def restore_version(step):
+    history = st.session_state.draft_history
+    if step == 'undo':
+        state = history.undo()
+    elif step == 'redo':
+        state = history.redo()
+    else:
+        state = history.go_to(step)
+    #keys that weren't there yet in that version go back to their defaults
+    for keys in APP_SECTIONS.values():
+        for key in keys:
+            if key not in state and key in st.session_state:
+                del st.session_state[key]
+    st.session_state.update(state)
+    #an edit that was going on belongs to the version that is left
+    st.session_state.pop('edit_location_index', None)
+
+def history_section():
+    history = st.session_state.get('draft_history')
+    if history is None or len(history.versions) < 2:
+        return
+    st.header("Changes")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("Undo", key="undo", disabled=not history.can_undo(), on_click=restore_version, args=('undo',))
+    with col2:
+        st.button("Redo", key="redo", disabled=not history.can_redo(), on_click=restore_version, args=('redo',))
+    with st.expander(f"History ({len(history.versions)} versions)"):
+        labels = {i: f"{i + 1}. {version.time} {', '.join(version.changed) or 'start'}"
+                  for i, version in enumerate(history.versions)}
+        #newest first, by default the version before the one shown now
+        options = list(labels)[::-1]
+        default = history.position - 1 if history.position > 0 else history.position + 1
+        picked = st.selectbox("Compare with", options, index=options.index(default), format_func=labels.get,
+                              key=f"history_version_{len(history.versions)}")
+        lines = history.diff(picked, history.position)
+        if picked == history.position:
+            st.caption("This is the version shown now")
+        elif lines:
+            st.caption(f"From version {picked + 1} to the one shown now:")
+            st.code('\n'.join(lines), language=None)
+        else:
+            st.caption("Same content as the version shown now")
+        st.button("Go back to this version", key="go_to_version", disabled=picked == history.position,
+                  on_click=restore_version, args=(picked,))
+
+#pick up a draft after a reload or a session timeout
+#the drafts belong to the browser: a random key in the page link (?draft_key=...),
+#a reload keeps it, another browser (or person) gets its own and doesn't see these drafts
+def draft_key():
+    key = st.query_params.get(DRAFT_KEY_PARAM, '')
+    if not re.match(r'^[\w-]{20,}$', key):
+        key = st.session_state.get('draft_key') or secrets.token_urlsafe(24)
+        st.query_params[DRAFT_KEY_PARAM] = key
+    st.session_state.draft_key = key
+    return key
+
+def drafts_section():
+    drafts = [d for d in list_drafts('app', limit=6, owner=draft_key())
+              if d['id'] != st.session_state.get('draft_id')][:5]
+    if not drafts:
+        return
+    st.header("Unfinished drafts")
+    for draft in drafts:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.write(f"**{draft['title'] or 'No title yet'}**  \n{draft['updated_at'].replace('T', ' ')}")
+        with col2:
+            if st.button("Resume", key=f"resume_{draft['id']}"):
+                sections, hashes = load_draft(draft['id'])
+                for section in sections.values():
+                    st.session_state.update(section)
+                #go on saving into the same draft
+                st.session_state.draft_id = draft['id']
+                st.session_state.draft_hashes = hashes
+                st.rerun()
+
+#load an existing record to update it
+def import_section():
+    st.header("Update an existing record")
+    uploaded = st.file_uploader("Load DataCite JSON or XML", type = ["json", "xml"], key = "import_file",
+                                help = "Fills in all the sections from an existing metadata file. ORCID and ROR IDs in the file are used as they are.")
+    
+    #only load each file once, not on every rerun
+    if uploaded is not None:
+        file_id = getattr(uploaded, 'file_id', f"{uploaded.name}-{uploaded.size}")
+        if st.session_state.get('imported_file_id') != file_id:
+            try:
+                record = load_record(uploaded.getvalue(), uploaded.name)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.session_state.update(to_session_state(record))
+            st.session_state.imported_file_id = file_id
+            st.rerun()
+        st.success(f"Loaded: {uploaded.name}")
+
+#dates, location and variables from the data files themselves
+def fill_from_profile(profile):
+    if profile.start:
+        st.session_state.start_date = profile.start.date()
+    if profile.end:
+        st.session_state.end_date = profile.end.date()
+    #deployments with gaps in between -> one collection period each
+    if len(profile.periods) > 1:
+        st.session_state.collection_periods = merge_periods(st.session_state.get('collection_periods', []) + profile.period_dates())
+    
+    location = profile.location()
+    if location:
+        lake_name, latitude, longitude = location
+        st.session_state.setdefault('locations', [])
+        known = {(loc['latitude'], loc['longitude']) for loc in st.session_state.locations}
+        if (str(latitude), str(longitude)) not in known:
+            st.session_state.locations.append({
+                'lake_name': lake_name or os.path.splitext(profile.path.split(', ')[0])[0],
+                'latitude': str(latitude),
+                'longitude': str(longitude)})
+    
+    #variable names added to the keywords that are there already
+    keywords = split_keywords(st.session_state.get('keywords', ''))
+    present = {k.casefold() for k in keywords}
+    keywords += [v for v in profile.variables if v.casefold() not in present]
+    st.session_state.keywords = ', '.join(keywords)
+
+
+def _in_data_root(path):
+    root = os.path.realpath(DATA_ROOT)
+    return os.path.commonpath([root, os.path.realpath(path)]) == root
+
+
+def data_root_paths(text):
+    #files/folders typed in the app (below DATA_ROOT, wildcards allowed) -> the ones that exist there
+    #ValueError for a path that leads out of DATA_ROOT, links out of it are left out
+    if not DATA_ROOT:
+        raise ValueError("Files on the server can't be read here")
+    #relative to DATA_ROOT, an absolute path has to be in it
+    pattern = os.path.normpath(os.path.join(os.path.realpath(DATA_ROOT), text.strip()))
+    if not _in_data_root(pattern):
+        raise ValueError(f"{text.strip()} is not in the data folder of the server")
+    #no ** (it follows links to folders out of DATA_ROOT), folders are searched without following links
+    return [path for path in sorted(glob.glob(pattern)) if _in_data_root(path)]
+
+
+def data_files_section():
+    st.header("Fill in from data files")
+    uploaded = st.file_uploader("CSV or NetCDF data files", type = [ext.lstrip('.') for ext in DATA_EXTENSIONS],
+                                accept_multiple_files = True, key = "data_files",
+                                help = "The time period, the area and the variable names are read from the files")
+    #only where the server has a data folder (METADATA_DATA_ROOT), paths are below it
+    server_path = ""
+    if DATA_ROOT:
+        server_path = st.text_input("Or files/folder on the server", key = "data_path", placeholder = "lake_temperature/*.csv",
+                                    help = f"Below {DATA_ROOT}, for big files that are already on the server, they are read in chunks")
+    
+    if st.button("Read the data files", disabled = not (uploaded or server_path.strip())):
+        profiles, errors = [], []
+        for file in uploaded or []:
+            try:
+                profiles.append(profile_file(file.getvalue(), file.name))
+            except ValueError as e:
+                errors.append(str(e))
+        if server_path.strip():
+            try:
+                paths = data_root_paths(server_path)
+            except ValueError as e:
+                paths = []
+                errors.append(str(e))
+            #files that are links out of the data folder are left out too
+            files = [path for path in find_data_files(paths) if _in_data_root(path)]
+            profile, path_errors = profile_paths(files) if files else (None, [])
+            errors.extend(path_errors)
+            if profile is not None:
+                profiles.append(profile)
+            elif not errors:
+                errors.append(f"No CSV or NetCDF files found at {server_path.strip()}")
+        st.session_state.data_profile_errors = errors
+        if profiles:
+            profile = merge_profiles(profiles)
+            fill_from_profile(profile)
+            st.session_state.data_profile = profile
+        st.rerun()
+    
+    for error in st.session_state.get('data_profile_errors', []):
+        st.error(error)
+    profile = st.session_state.get('data_profile')
+    if profile is not None:
+        period = f"{profile.start:%Y-%m-%d} to {profile.end:%Y-%m-%d}" if profile.start and profile.end else "no time column found"
+        st.success(f"Read {profile.rows:,} rows ({period}, {len(profile.variables)} variable(s)"
+                   + (")" if profile.box else ", no coordinates found)"))
+        for note in profile.notes:
+            st.warning(f"Not filled in: {note}")
+    
+    if DATA_ROOT:
+        manifest_section(server_path)
+
+
+#sizes, formats and checksums of the dataset folder on the server (below DATA_ROOT)
+def manifest_section(path):
+    try:
+        folders = data_root_paths(path) if path.strip() else []
+    except ValueError:
+        folders = []
+    folder = folders[0] if len(folders) == 1 and os.path.isdir(folders[0]) else None
+    if st.button("File sizes, formats and checksums", disabled = folder is None,
+                 help = "For a dataset folder on the server: fills in the DataCite sizes and formats, "
+                        "and gives checksum files to check the data later (files that didn't change are not read again)"):
+        progress = st.progress(0.0, text = "Checksums")
+        try:
+            entries = build_manifest(folder, progress = lambda done, total: progress.progress(
+                done / total if total else 1.0, text = f"Checksums: {done}/{total} files"))
+        except (OSError, ValueError) as e:
+            st.error(f"Could not read the folder: {e}")
+            return
+        st.session_state.sizes = datacite_sizes(entries)
+        st.session_state.formats = datacite_formats(entries)
+        st.session_state.file_manifest = entries
+        st.rerun()
+    
+    entries = st.session_state.get('file_manifest')
+    if entries:
+        st.success(f"{', '.join(st.session_state.get('sizes', []))}: {', '.join(st.session_state.get('formats', []))}")
+        st.download_button("Download SHA-256 checksums", manifest_text(entries, 'sha256'), file_name = SHA256_MANIFEST,
+                           mime = "text/plain")
+        st.download_button("Download MD5 checksums", manifest_text(entries, 'md5'), file_name = MD5_MANIFEST,
+                           mime = "text/plain")
+
 #outline each section 
 def author_section():
     st.header("Author information")
@@ -695,14 +861,91 @@ def dataset_section():
         if st.session_state.get('dataset_title') and st.session_state.get('dataset_description'):
             st.success("Dataset information saved")
 
+#search and pages for a long list, returns the indices of the entries to show
+#only those get widgets, so a page costs the same with 5 or 500 entries
+def list_window(name, texts, disabled = False):
+    if len(texts) <= PAGE_SIZE:
+        return list(range(len(texts)))
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search = term_key(st.text_input("Search", key = f"{name}_search", disabled = disabled,
+                                        placeholder = "Part of a name, affiliation, ID, ..."))
+    found = [i for i, text in enumerate(texts) if search in text] if search else list(range(len(texts)))
+    pages = max(1, -(-len(found) // PAGE_SIZE))
+    #fewer pages after a search or a removal
+    if st.session_state.get(f"{name}_page", 1) > pages:
+        st.session_state[f"{name}_page"] = pages
+    with col2:
+        page = st.number_input("Page", min_value = 1, max_value = pages, key = f"{name}_page", disabled = disabled)
+    shown = found[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+    if search:
+        st.caption(f"{len(found)} of {len(texts)} found, page {page} of {pages}")
+    else:
+        st.caption(f"{len(texts)} in total, page {page} of {pages}")
+    return shown
+
+#the contributor table: change, add, delete or reorder many rows, then save once
+#only the changed rows are checked and looked up again (see contributor_table.py)
+def contributors_grid():
+    grid_counter = st.session_state.get('contributor_grid_counter', 0)
+    #no other page or search while there are changes that aren't saved
+    pending = count_changes(st.session_state.get(st.session_state.get('contributor_grid_key'), {}))
+    rows = list_window('contributors', [term_key(' '.join(str(v) for v in to_row(contrib, 0).values()))
+                                        for contrib in st.session_state.contributors], disabled = pending > 0)
+    #the table state belongs to the rows shown
+    grid_key = f"contributor_grid_{grid_counter}_{hash(tuple(rows))}"
+    st.session_state.contributor_grid_key = grid_key
+    st.caption("Change the cells, add rows at the bottom or select rows to delete them, # sets the order. "
+               "Nothing is kept until you save; the changed rows are then checked and get their ORCID/ROR ID looked up again.")
+    st.data_editor(to_table(st.session_state.contributors, rows), key = grid_key, num_rows = "dynamic", hide_index = True,
+                   column_config = {
+                       'position': st.column_config.NumberColumn("#", min_value = 1, step = 1, width = "small"),
+                       'first_name': st.column_config.TextColumn("First name"),
+                       'last_name': st.column_config.TextColumn("Last name"),
+                       'affiliation': st.column_config.TextColumn("Affiliation"),
+                       'orcid': st.column_config.TextColumn("ORCID", validate = r'^(\d{4}-\d{4}-\d{4}-\d{4})?$'),
+                       'ror_id': st.column_config.TextColumn("ROR ID")})
+    
+    #what was looked up when saving the last time
+    for note in st.session_state.pop('contributor_grid_notes', []):
+        st.info(note)
+    
+    changes = st.session_state.get(grid_key, {})
+    changed = count_changes(changes)
+    st.write(f"**Total contributors:** {len(st.session_state.contributors)}")
+    if not changed:
+        return
+    col1, col2 = st.columns(2)
+    with col1:
+        save = st.button(f"Save {changed} changed row(s)", type = "primary", key = "save_contributor_grid")
+    with col2:
+        discard = st.button("Discard the changes", key = "discard_contributor_grid")
+    if save:
+        with st.spinner("Checking the changed rows..."):
+            contributors, problems, notes = apply_changes(st.session_state.contributors, changes, find_orcid = lookup_orcid_id,
+                                                          find_ror = lookup_ror_id, rows = rows)
+        for problem in problems:
+            st.error(problem)
+        if not problems:
+            st.session_state.contributors = contributors
+            st.session_state.contributor_grid_notes = notes
+            st.session_state.contributor_grid_counter = grid_counter + 1
+            st.rerun()
+    if discard:
+        st.session_state.contributor_grid_counter = grid_counter + 1
+        st.rerun()
+
 ##clear form function
 def clear_contributor_form():
     #clearing any possible fields that might have been populated
     fields_to_clear = ['contrib_first', 'contrib_last', 'contrib_first_name','contrib_last_name', 'contrib_affiliation', 'manual_contrib_orcid', 'current_contrib_orcid',
-                      'current_contrib_ror', 'orcid_results_current_contrib_orcid', 'ror_results_current_contrib_ror']
+                      'current_contrib_ror']
     for field in fields_to_clear:
         if field in st.session_state:
             del st.session_state[field]
+    #the searches of the form (the "search performed" flag was left behind before)
+    clear_lookup_results('current_contrib_orcid')
+    clear_lookup_results('current_contrib_ror')
     
 
 def contributors_section():
@@ -717,310 +960,245 @@ def contributors_section():
     if 'contributors' not in st.session_state:
         st.session_state.contributors = []
     
-    #handle editing exisiting contirbutors 
-    editing_index = st.session_state.get('edit_contributor_index', None)
-    if editing_index is not None:
-        st.info(f"Editing contributor #{editing_index +1}")
-        
-        #get the contributor being edited
-        if editing_index < len(st.session_state.contributors):
-            editing_contrib = st.session_state.contributors[editing_index]
-            
-            #prepopulate with the existing data
-            names = editing_contrib['name'].split(' ', 1)
-            if 'temp_contrib_first' not in st.session_state:
-                st.session_state.temp_contrib_first = names[0] if len(names)>0 else ''
-            if 'temp_contrib_last' not in st.session_state:
-                st.session_state.temp_contrib_last = names[1] if len(names)>1 else ''
-            if 'temp_contrib_affiliation' not in st.session_state:
-                st.session_state.temp_contrib_affiliation = editing_contrib.get('affiliation' ,'') 
-     
+    #all contributors in one table, changes are saved together
     if st.session_state.contributors:
         st.subheader("Contributors")
-        for i, contrib in enumerate(st.session_state.contributors):
-            with st.expander(f"{contrib['name']} - {contrib.get('affiliation', 'No affiliation')}"):
-                col1, col2, col3 = st.columns([3,1,1])
-                
-                with col1:
-                    st.write(f"**Name:** {contrib['name']}")
-                    st.write(f"**Affiliation:** {contrib.get('affiliation', 'Not specified')}")
-                    
-                    #show orcid info if available 
-                    orcid_data = contrib.get('orcid_data', {})
-                    if orcid_data and orcid_data.get('orcid_id'):
-                        st.write(f"**ORCID:** {orcid_data['orcid_id']}")
-                        if orcid_data.get('institution'):
-                            st.write(f"**ORCID Institution:** {orcid_data['institution']}")
-                    else:
-                        st.write("**ORCID:** Not specified")
-                    
-                    #ror lookup
-                    ror_data = contrib.get('ror_data', {})
-                    if ror_data and ror_data.get('ror_id'):
-                        st.write(f"**ROR ID:** {ror_data['ror_id']}")
-                        st.write(f"**ROR Country:** {ror_data.get('country', 'Not specified')}")
-                    else:
-                        st.write("**ROR ID:** Not specified")
-                
-                #add edit option
-                with col2:
-                    if st.button("Edit", key=f"edit_contrib_{i}"):
-                        #store exisiting contributor data for editing
-                        st.session_state.edit_contributor_index = i
-                        names = contrib['name'].split(' ',1)
-                        st.session_state.temp_contrib_first = names[0] if len(names)>0 else ''
-                        st.session_state.temp_contrib_last = names[1] if len(names)>1 else ''
-                        st.session_state.temp_contrib_affiliation = contrib.get('affiliation', '')
-                        st.session_state.temp_contrib_orcid = contrib.get('orcid_data', {})
-                        st.session_state.temp_contrib_ror= contrib.get('ror_data', {})
-                        st.rerun()
-                    
-                #remove the contributor
-                with col3:
-                    if st.button("Remove", key=f"remove_contrib_{i}"):
-                        st.session_state.contributors.pop(i)
-                        st.rerun()
-            
-        st.write(f"**Total contributors:** {len(st.session_state.contributors)}")
+        contributors_grid()
         st.divider()
     
-    #check if were editing an existing contributor ... this feels highly inefficient way of doing this but were going with it for now
-    editing_index = st.session_state.get('edit_contributor_index', None)
-    if editing_index is not None and editing_index < len(st.session_state.contributors):
-        st.subheader(f"Edit contributor #{editing_index +1}")
+    #add new contributors (with the ORCID and ROR lookups)
+    st.subheader("Add new contributors")
+    st.write("**Basic information**")
 
-
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            #trying hard to not have the fields autopopulated with previous entry
-            #addig this value = "" ... to try and stop that 
-            contrib_first = st.text_input("First name", key="temp_contrib_first", placeholder="Enter first name",
-                                          value=st.session_state.get('temp_contrib_first', ''))
-        with col2:
-            contrib_last = st.text_input("Last name", key="temp_contrib_last", placeholder="Enter last name",
-                                         value=st.session_state.get('temp_contrib_last', ''))
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        #trying hard to not have the fields autopopulated with previous entry
+        #addig this value = "" ... to try and stop that 
+        contrib_first = st.text_input("First name", key="contrib_first_name", placeholder="Enter first name",
+                                      value="" if st.session_state.get("form_needs_clearing") else st.session_state.get("contrib_first_name", ""))
+    with col2:
+        contrib_last = st.text_input("Last name", key="contrib_last_name", placeholder="Enter last name",
+                                     value="" if st.session_state.get("form_needs_clearing") else st.session_state.get("contrib_last_name", ""))
+    
+    st.write("**ORCID ID**")
         
-        st.write("**ORCID ID**")
+    orcid_lookup_component('contrib_first_name', 'contrib_last_name', 'current_contrib_orcid')
+    
+    #show selected orcid
+    current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
+    if current_contrib_orcid:
+        st.success(f"Selected ORCID: {current_contrib_orcid['display_name']} ({current_contrib_orcid['orcid_id']})")
+        # if current_contrib_orcid.get('institution'):
+        #     st.info(f"ORCID suggested affiliation: {current_contrib_orcid['institution']}")
 
-            
-        orcid_lookup_component('temp_contrib_first', 'temp_contrib_last', 'temp_contrib_orcid_lookup')
-        
-        #show selected orcid
-        temp_orcid = st.session_state.get('temp_contrib_orcid_lookup', {})
-        if temp_orcid:
-            st.success(f"Selected ORCID: {temp_orcid['display_name']} ({temp_orcid['orcid_id']})")
-
-        #or manual entry
-        with st.expander("OR enter ORCID manually"):
-            manual_orcid = st.text_input("ORCID ID (format: 0000-0000-0000-0000)", key = "temp_manual_contrib_orcid",
-                                                 placeholder = "0000-0000-0000-0000")
-            if manual_orcid:
-                #check to make sure the format is correct
-                manual_orcid = manual_orcid.strip()
-                orcid_pattern=r'^\d{4}-\d{4}-\d{4}-\d{4}$'
-                if re.match(orcid_pattern, manual_orcid):
-                    st.success("Valid ORCID format")
-                else:
-                    st.error("Invalid ORCID format. Expected: 0000-0000-0000-0000")
+    #or manual entry
+    with st.expander("OR enter ORCID manually"):
+        manual_contrib_orcid = st.text_input("ORCID ID (format: 0000-0000-0000-0000)", key = "manual_contrib_orcid",
+                                             placeholder = "0000-0000-0000-0000")
+        if manual_contrib_orcid:
+            #check to make sure the format is correct
+            manual_contrib_orcid = manual_contrib_orcid.strip()
+            orcid_pattern=r'^\d{4}-\d{4}-\d{4}-\d{4}$'
+            if re.match(orcid_pattern, manual_contrib_orcid):
+                st.success("Valid ORCID format")
+            else:
+                st.error("Invalid ORCID format. Expected: 0000-0000-0000-0000")
     
-        #affiliation of contributors
-        st.write("**Affiliation**")
-        
-        contrib_affiliation = st.text_input("Institution/Organization:", key="temp_contrib_affiliation", 
-                                            placeholder="Enter institution name",
-                                            value=st.session_state.get('temp_contrib_affiliation', ''))
-        
-        #look up with ROR
-        if contrib_affiliation:
-            st.write("**ROR ID lookup**")
-            ror_lookup_component('temp_contrib_affiliation', 'temp_contrib_ror_lookup')
-            
-            #show selected ror
-            temp_ror = st.session_state.get('temp_contrib_ror_lookup', {})
-            if temp_ror:
-                st.success(f"Selected ROR: {temp_ror['name']} (ROR ID:{temp_ror['ror_id']})")
-        
-        st.divider()
-        col1,col2,col3 = st.columns(3)
-        
-        with col1:
-            if st.button("Save change", type = "primary", key ="save_edit_contrib"):
-                if contrib_first and contrib_last:
-                    #update them
-                    updated_contrib={
-                        'name':f"{contrib_first.strip()} {contrib_last.strip()}",
-                        'affiliation': contrib_affiliation.strip() if contrib_affiliation else ""}
-                    
-                    temp_orcid = st.session_state.get('temp_contrib_orcid_lookup', {})
-                    manual_orcid = st.session_state.get('temp_manual_contrib_orcid', '').strip()
-                    
-                    if temp_orcid:
-                        updated_contrib['orcid_data']= temp_orcid
-                    elif manual_orcid and re.match(r'^\d{4}-\d{4}-\d{4}-\d{4}$', manual_orcid):
-                        updated_contrib['orcid_data'] = {
-                            'orcid_id': manual_orcid,
-                            'display_name': f"{contrib_first} {contrib_last}",
-                            'institution':""
-                            }
-                    
-                    #deal with ror
-                    temp_ror = st.session_state.get('temp_contrib_ror_lookup', {})
-                    if temp_ror:
-                        updated_contrib['ror_data'] = temp_ror
-                        
-                    #update the contributor list now
-                    st.session_state.contributors[editing_index] = updated_contrib
-                    
-                    #clear the editing state so slate is clean
-                    del st.session_state.edit_contributor_index
-                    for key in ['temp_contrib_first','temp_contrib_last', 'temp_contrib_affiliation',
-                                'temp_contrib_orcid_lookup','temp_contrib_ror_lookup', 'temp_contrib_ror_lookup']:
-                        if key in st.session_state:
-                            del st.session_state[key]
-                            st.rerun()
-                    
-                else:
-                    st.error("Please enter both first and last name")
-                        
-        with col2:
-            if st.button("Cancel edit", key="cancel_edit_contrib"):
-                del st.session_state.edit_contributor_index
-                for key in ['temp_contrib_first','temp_contrib_last', 'temp_contrib_affiliation',
-                            'temp_contrib_orcid_lookup','temp_contrib_ror_lookup', 'temp_contrib_ror_lookup']:
-                    if key in st.session_state:
-                        del st.session_state[key]
-                        st.rerun()
+    #affiliation of contributors
+    st.write("**Affiliation**")
+    
+    #did orcid hook us up?
+    current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
+    suggested_affiliation = current_contrib_orcid.get('institution', '')
     
-    #why did i do it this way
-    #add new contributors
+    #autofill the suggested affiliation
+    if st.session_state.get("form_needs_clearing"):
+        affiliation_value = ""
+    elif suggested_affiliation and "contrib_affiliation" not in st.session_state:
+        affiliation_value = suggested_affiliation
     else:
-        st.subheader("Add new contributors")
-        st.write("**Basic information**")
-
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            #trying hard to not have the fields autopopulated with previous entry
-            #addig this value = "" ... to try and stop that 
-            contrib_first = st.text_input("First name", key="contrib_first_name", placeholder="Enter first name",
-                                          value="" if st.session_state.get("form_needs_clearing") else st.session_state.get("contrib_first_name", ""))
-        with col2:
-            contrib_last = st.text_input("Last name", key="contrib_last_name", placeholder="Enter last name",
-                                         value="" if st.session_state.get("form_needs_clearing") else st.session_state.get("contrib_last_name", ""))
-        
-        st.write("**ORCID ID**")
-            
-        orcid_lookup_component('contrib_first_name', 'contrib_last_name', 'current_contrib_orcid')
-        
-        #show selected orcid
-        current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
-        if current_contrib_orcid:
-            st.success(f"Selected ORCID: {current_contrib_orcid['display_name']} ({current_contrib_orcid['orcid_id']})")
-            # if current_contrib_orcid.get('institution'):
-            #     st.info(f"ORCID suggested affiliation: {current_contrib_orcid['institution']}")
-    
-        #or manual entry
-        with st.expander("OR enter ORCID manually"):
-            manual_contrib_orcid = st.text_input("ORCID ID (format: 0000-0000-0000-0000)", key = "manual_contrib_orcid",
-                                                 placeholder = "0000-0000-0000-0000")
-            if manual_contrib_orcid:
-                #check to make sure the format is correct
-                manual_contrib_orcid = manual_contrib_orcid.strip()
-                orcid_pattern=r'^\d{4}-\d{4}-\d{4}-\d{4}$'
-                if re.match(orcid_pattern, manual_contrib_orcid):
-                    st.success("Valid ORCID format")
-                else:
-                    st.error("Invalid ORCID format. Expected: 0000-0000-0000-0000")
+        affiliation_value = st.session_state.get("contrib_affiliation", "")
+    #just makes it messy
+    # if suggested_affiliation:
+    #     st.info(f"ORCID suggest: {suggested_affiliation}")
+    
+    contrib_affiliation = st.text_input("Institution/Organization:", key="contrib_affiliation", 
+                                        placeholder="Enter institution name",
+                                        value=affiliation_value)
+    
+    #look up with ROR
+    if contrib_affiliation:
+        st.write("**ROR ID lookup**")
+        ror_lookup_component('contrib_affiliation', 'current_contrib_ror')
         
-        #affiliation of contributors
-        st.write("**Affiliation**")
+        #show selected ror
+        current_contrib_ror = st.session_state.get('current_contrib_ror', {})
+        if current_contrib_ror:
+            st.success(f"Selected ROR: {current_contrib_ror['name']} (ROR ID:{current_contrib_ror['ror_id']})")
+    
+    if st.session_state.get("form_needs_clearing"):
+        st.session_state.form_needs_clearing = False
         
-        #did orcid hook us up?
-        current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
-        suggested_affiliation = current_contrib_orcid.get('institution', '')
+    #add more friends
+    st.divider()
         
-        #autofill the suggested affiliation
-        if st.session_state.get("form_needs_clearing"):
-            affiliation_value = ""
-        elif suggested_affiliation and "contrib_affiliation" not in st.session_state:
-            affiliation_value = suggested_affiliation
+    col1, col2= st.columns([1,1])
+    with col1:
+        add_contributor = st.button("Add this contributor", type = "primary")
+    with col2:
+        clear_form = st.button("Clear form")
+     
+
+    #adding contrib
+    if add_contributor:
+        st.session_state.form_needs_clearing = True
+        if not contrib_first or not contrib_last:
+            st.error("Please enter first and last name")
         else:
-            affiliation_value = st.session_state.get("contrib_affiliation", "")
-        #just makes it messy
-        # if suggested_affiliation:
-        #     st.info(f"ORCID suggest: {suggested_affiliation}")
-        
-        contrib_affiliation = st.text_input("Institution/Organization:", key="contrib_affiliation", 
-                                            placeholder="Enter institution name",
-                                            value=affiliation_value)
-        
-        #look up with ROR
-        if contrib_affiliation:
-            st.write("**ROR ID lookup**")
-            ror_lookup_component('contrib_affiliation', 'current_contrib_ror')
+            #prepare the data
+            contributor_data = {'name': f"{contrib_first.strip()} {contrib_last.strip()}",
+                                'affiliation': contrib_affiliation.strip() if contrib_affiliation else ""}
+            
+            #toss in orcid if exists
+            current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
+            manual_orcid = st.session_state.get('manual_contrib_orcid', '').strip()
+
+            if current_contrib_orcid:
+                contributor_data['orcid_data'] = current_contrib_orcid
+            elif manual_orcid and re.match(r'^\d{4}-\d{4}-\d{4}-\d{4}$', manual_orcid):
+                contributor_data['orcid_data']= {
+                    'orcid_id': manual_orcid,
+                    'display_name': f"{contrib_first} {contrib_last}",
+                    'institution': ""}
             
-            #show selected ror
+            #add in ror
             current_contrib_ror = st.session_state.get('current_contrib_ror', {})
             if current_contrib_ror:
-                st.success(f"Selected ROR: {current_contrib_ror['name']} (ROR ID:{current_contrib_ror['ror_id']})")
-        
-        if st.session_state.get("form_needs_clearing"):
-            st.session_state.form_needs_clearing = False
-            
-        #add more friends
-        st.divider()
+                contributor_data['ror_data'] = current_contrib_ror
             
-        col1, col2= st.columns([1,1])
-        with col1:
-            add_contributor = st.button("Add this contributor", type = "primary")
-        with col2:
-            clear_form = st.button("Clear form")
-         
-    
-        #adding contrib
-        if add_contributor:
+            st.session_state.contributors.append(contributor_data)
             st.session_state.form_needs_clearing = True
-            if not contrib_first or not contrib_last:
-                st.error("Please enter first and last name")
-            else:
-                #prepare the data
-                contributor_data = {'name': f"{contrib_first.strip()} {contrib_last.strip()}",
-                                    'affiliation': contrib_affiliation.strip() if contrib_affiliation else ""}
-                
-                #toss in orcid if exists
-                current_contrib_orcid = st.session_state.get('current_contrib_orcid', {})
-                manual_orcid = st.session_state.get('manual_contrib_orcid', '').strip()
-    
-                if current_contrib_orcid:
-                    contributor_data['orcid_data'] = current_contrib_orcid
-                elif manual_orcid and re.match(r'^\d{4}-\d{4}-\d{4}-\d{4}$', manual_orcid):
-                    contributor_data['orcid_data']= {
-                        'orcid_id': manual_orcid,
-                        'display_name': f"{contrib_first} {contrib_last}",
-                        'institution': ""}
-                
-                #add in ror
-                current_contrib_ror = st.session_state.get('current_contrib_ror', {})
-                if current_contrib_ror:
-                    contributor_data['ror_data'] = current_contrib_ror
-                
-                st.session_state.contributors.append(contributor_data)
-                st.session_state.form_needs_clearing = True
-                # clear_contributor_form()
-                
-                st.success(f"Added contributor: {contributor_data['name']}")
-                st.rerun()
-        
-        if clear_form:
-            clear_contributor_form()
+            # clear_contributor_form()
+            
+            st.success(f"Added contributor: {contributor_data['name']}")
             st.rerun()
     
+    if clear_form:
+        clear_contributor_form()
+        st.rerun()
+
     st.info("You can add as many contributors/co-authors as needed. Or skip this section if this dataset has no co-authors.")
        
 
 #location location location
+def lake_label(lake) -> str:
+    return f"{lake.name} ({', '.join(lake.aliases)})" if lake.aliases else lake.name
+
+
+def fill_from_gazetteer(key):
+    #picked a known lake, new form with its name and point filled in
+    lake = get_gazetteer().lookup(st.session_state.get(key) or '')
+    if lake:
+        st.session_state.gazetteer_prefill = {
+            'lake_name': lake.name,
+            'latitude': str(lake.latitude),
+            'longitude': str(lake.longitude)}
+        st.session_state.location_form_counter = st.session_state.get('location_form_counter', 0) + 1
+
+
+def locate_lake(latitude, longitude):
+    #known lake at these coordinates, None if there is none or the coordinates are no good
+    try:
+        return get_gazetteer().locate(float(latitude), float(longitude))
+    except (TypeError, ValueError):
+        return None
+
+
+def convert_location(latitude, longitude):
+    #LV95/LV03 or degrees minutes seconds typed in the two fields -> (lat, lon, system) in WGS84,
+    #None when they are already fine decimal degrees or not coordinates at all
+    if not latitude.strip() or not longitude.strip():
+        return None
+    if validate_coordinates(latitude, "latitude")[0] and validate_coordinates(longitude, "longitude")[0]:
+        return None
+    try:
+        lat, lon, system = convert_point(latitude, longitude)
+    except ValueError:
+        return None
+    return str(lat), str(lon), system
+
+
+def complete_location(lake_name, latitude, longitude):
+    #other coordinate formats are converted, then the gaps are filled from the gazetteer:
+    #a known lake gets its usual name (and its point if no coordinates were given),
+    #coordinates without a name get the lake they are in
+    lake_name, latitude, longitude = lake_name.strip(), latitude.strip(), longitude.strip()
+    converted = convert_location(latitude, longitude)
+    if converted:
+        latitude, longitude, system = converted
+        st.info(f"Converted the {system} coordinates to WGS84: {latitude}, {longitude}")
+    lake = get_gazetteer().lookup(lake_name) if lake_name else None
+    if lake:
+        lake_name = lake.name
+        if not latitude and not longitude:
+            latitude, longitude = str(lake.latitude), str(lake.longitude)
+            st.info(f"Using the coordinates of {lake.name}")
+    elif not lake_name and validate_coordinates(latitude, "latitude")[0] and validate_coordinates(longitude, "longitude")[0]:
+        match = locate_lake(latitude, longitude)
+        if match:
+            lake_name = match.lake.name
+            st.info(f"Lake name from the coordinates: {lake_name}")
+    return lake_name, latitude, longitude
+
+
+def location_upload():
+    #many stations at once from a file, only the rows with a problem are shown
+    with st.expander("Upload many locations (CSV or GeoJSON)"):
+        st.write("CSV with a name column (lake/site/station) and the coordinates (latitude/longitude, "
+                 "or east/north for LV95/LV03), or a GeoJSON file with points or lake outlines (polygons, simplified to "
+                 f"at most {POLYGON_MAX_POINTS} points). Rows without a name get the lake they are in.")
+        uploaded = st.file_uploader("Locations file", type = ["csv", "txt", "geojson", "json"], key = "locations_file")
+        
+        #check a new file once, not on every rerun
+        if uploaded is not None and st.session_state.get('locations_file_id') != uploaded.file_id:
+            try:
+                table = read_locations(uploaded.getvalue(), uploaded.name)
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.session_state.locations_file_id = uploaded.file_id
+            st.session_state.location_upload = check_locations(table, st.session_state.locations)
+        
+        if 'location_upload' not in st.session_state:
+            return
+        good, problems = st.session_state.location_upload
+        st.write(f"**{len(good)}** location(s) ready to add, **{len(problems)}** row(s) need a look")
+        
+        if len(problems):
+            #fix the values in the table, then check those rows again
+            upload_counter = st.session_state.get('location_upload_counter', 0)
+            #the outlines stay in the table but aren't shown
+            edited = st.data_editor(problems, disabled = ['row', 'problem'], hide_index = True,
+                                    column_order = ['row'] + TABLE_COLUMNS + ['problem'],
+                                    key = f"location_problems_{upload_counter}")
+            if st.button("Check the corrected rows"):
+                existing = st.session_state.locations + to_locations(good)
+                fixed, still_wrong = check_locations(edited.drop(columns = ['row', 'problem']), existing)
+                #keep the row numbers of the file
+                still_wrong['row'] = edited['row'].to_numpy()[still_wrong['row'].to_numpy() - 1]
+                st.session_state.location_upload = (pd.concat([good, fixed], ignore_index = True), still_wrong)
+                st.session_state.location_upload_counter = upload_counter + 1
+                st.rerun()
+        
+        if len(good):
+            if st.button(f"Add {len(good)} location(s)", type = "primary"):
+                st.session_state.locations.extend(to_locations(good))
+                st.session_state.location_upload = (good.iloc[0:0], problems)
+                st.rerun()
+
+
 def location_section():
     st.header("Location")        
     
@@ -1029,13 +1207,22 @@ def location_section():
         st.session_state.locations = []
     
     if st.session_state.locations:
-        for i, location in enumerate(st.session_state.locations):
+        shown = list_window('locations', [term_key(f"{location['lake_name']} {location['latitude']} {location['longitude']}")
+                                          for location in st.session_state.locations])
+        for i in shown:
+            location = st.session_state.locations[i]
             with st.expander(f"{location['lake_name']} ({location['latitude']}, {location['longitude']})"):
                 col1, col2, col3 = st.columns([2,1,1])
                 with col1:
                     st.write(f"**Lake/Site name:** {location['lake_name']}")
                     st.write(f"**Latitude (decimal degrees):** {location['latitude']}")
                     st.write(f"**Longitude (decimal degrees):** {location['longitude']}")
+                    if location.get('polygon'):
+                        st.write(f"**Outline:** polygon with {len(location['polygon'])} points")
+                    #point somewhere else than the name says?
+                    match = locate_lake(location['latitude'], location['longitude'])
+                    if match and match.lake.name != location['lake_name']:
+                        st.caption(f"These coordinates are {'in' if match.inside else 'near'} {match.lake.name}")
                 with col2:
                     if st.button(f"Edit", key=f"edit_location_{i}"):
                         #add in the exisiting location data
@@ -1051,6 +1238,8 @@ def location_section():
         st.write(f"**Total locations:** {len(st.session_state.locations)}")
         st.divider()
     
+    location_upload()
+    
     st.subheader("Add new location")
     
     #are we editing existing location?
@@ -1058,8 +1247,17 @@ def location_section():
     if editing_index is not None:
         st.info(f"Editing location #{editing_index +1}")
 
+    #known lakes, the list can be searched by typing (also the other names, e.g. Léman, Bodensee)
+    form_counter = st.session_state.get('location_form_counter', 0)
+    st.selectbox(
+        "Pick a known lake (optional)", options = [lake.name for lake in get_gazetteer().lakes], index = None,
+        format_func = lambda name: lake_label(get_gazetteer().lookup(name)),
+        placeholder = "Type to search the lakes", key = f"gazetteer_lake_{form_counter}",
+        on_change = fill_from_gazetteer, args = (f"gazetteer_lake_{form_counter}",),
+        help = "Fills in the name and a representative point of the lake, the coordinates can still be changed")
+    
     #trying to get the form to clear are submission, on the struggle for some reason
-    form_key = f"location_form_{st.session_state.get('location_form_counter', 0)}"
+    form_key = f"location_form_{form_counter}"
    
     with st.form(form_key):
         #for editing, temp vals are good
@@ -1067,10 +1265,11 @@ def location_section():
             default_lake = st.session_state.get('temp_lake_name', '')
             default_lat = st.session_state.get('temp_latitude', '')
             default_lon = st.session_state.get('temp_longitude', '')
-        else: #fresh and clean - new spot
-            default_lake = ''
-            default_lon = ''
-            default_lat = ''
+        else: #fresh and clean - new spot, unless a known lake was picked
+            prefill = st.session_state.get('gazetteer_prefill', {})
+            default_lake = prefill.get('lake_name', '')
+            default_lon = prefill.get('longitude', '')
+            default_lat = prefill.get('latitude', '')
         
         lake_name = st.text_input("Lake/Site name", value = default_lake, placeholder="Enter lake name")
         
@@ -1079,21 +1278,26 @@ def location_section():
             latitude = st.text_input(
                 "Latitude (decimal degrees)",
                 value = default_lat,
-                placeholder = "e.g. 47.404")
+                placeholder = "e.g. 47.404",
+                help = "Swiss coordinates (LV95/LV03 east and north) or degrees minutes seconds (47°24'14\"N) are converted")
         with col2:
             longitude = st.text_input(
                 "Longitude (decimal degrees)",
                 value = default_lon,
-                placeholder = "e.g. 8.609")
+                placeholder = "e.g. 8.609",
+                help = "Swiss coordinates (LV95/LV03 east and north) or degrees minutes seconds (8°36'32\"E) are converted")
         
-        #check its in decimal degrees
+        #check its in decimal degrees (or something that gets converted)
         validation_message = []
-        if latitude:
+        converted = convert_location(latitude, longitude)
+        if converted:
+            st.caption(f"{converted[2]} coordinates, will be saved as {converted[0]}, {converted[1]}")
+        elif latitude:
             is_valid, message = validate_coordinates(latitude, "latitude")
             if not is_valid:
                 validation_message.append(f"Latitude: {message}")
                 
-        if longitude:
+        if longitude and not converted:
             is_valid, message = validate_coordinates(longitude, "longitude")
             if not is_valid:
                 validation_message.append(f"Longitude: {message}")
@@ -1116,6 +1320,7 @@ def location_section():
         
         #handle the submission
         if submit_button:
+            lake_name, latitude, longitude = complete_location(lake_name, latitude, longitude)
             if not lake_name.strip():
                 st.error("Please enter lake/site name")
             elif not latitude.strip():
@@ -1142,7 +1347,8 @@ def location_section():
                     
                     if editing_index is not None:
                         #then we are updating an exisiting location
-                        st.session_state.locations[editing_index] = new_location
+                        #an uploaded outline stays with the location
+                        st.session_state.locations[editing_index] = {**st.session_state.locations[editing_index], **new_location}
                         st.success(f"Updated location: {lake_name}")
                         
                         #clear editing status so theres no funny business
@@ -1155,6 +1361,7 @@ def location_section():
                         if 'location_form_counter' not in st.session_state:
                             st.session_state.location_form_counter = 0
                         st.session_state.location_form_counter += 1
+                        st.session_state.pop('gazetteer_prefill', None)
                             
                         
                     st.rerun()
@@ -1170,6 +1377,7 @@ def location_section():
                 del st.session_state.temp_latitude
             if 'temp_longitude' in st.session_state:
                 del st.session_state.temp_longitude       
+            st.session_state.pop('gazetteer_prefill', None)
             st.rerun()
     
         
@@ -1188,6 +1396,41 @@ def temporal_section():
     with col2:
         st.date_input("End date (format: YYYY/MM/DD)", key="end_date")
 
+    #several campaigns/deployments with gaps: a list of periods, overlapping or touching ones are merged
+    if st.button("Add as a collection period", key="add_period",
+                 help="For data collected in several periods with gaps in between"):
+        if st.session_state.get('start_date') and st.session_state.get('end_date'):
+            period = {'start': str(st.session_state.start_date), 'end': str(st.session_state.end_date)}
+            st.session_state.collection_periods = merge_periods(st.session_state.get('collection_periods', []) + [period])
+        else:
+            st.error("Start and end date are needed for a period")
+
+    with st.expander("Upload collection periods (CSV with start and end columns)"):
+        periods_file = st.file_uploader("Periods file", type=['csv', 'txt'], key="periods_file")
+        if periods_file and st.button("Add the periods", key="add_periods_file"):
+            periods, problems = read_periods(periods_file.getvalue().decode('utf-8-sig', errors='replace'))
+            for problem in problems:
+                st.warning(problem)
+            if periods:
+                st.session_state.collection_periods = merge_periods(st.session_state.get('collection_periods', []) + periods)
+                st.success(f"{len(periods)} period(s) added")
+
+    periods = st.session_state.get('collection_periods', [])
+    if periods:
+        st.write(f"**Collection periods ({len(periods)}):**")
+        for i, period in enumerate(periods):
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.write(f"{period['start']} to {period['end'] or 'open'}")
+            with col2:
+                if st.button("Remove", key=f"remove_period_{i}"):
+                    st.session_state.collection_periods = periods[:i] + periods[i + 1:]
+                    st.rerun()
+        overall = envelope(DateRange(start=p['start'], end=p['end']) for p in periods)
+        if overall:
+            st.caption(f"Overall: {overall.start} to {overall.end or 'open'}. "
+                       "The list is exported instead of the start and end date above.")
+
     #sneakey submit button
     st.divider()
     if st.button("Save information", type = "primary", key="submit_temporal"):
@@ -1196,19 +1439,75 @@ def temporal_section():
             st.success("Saved")
 
 
+#suggestion buttons, runs before the keywords text area is drawn again
+def add_keyword(keyword):
+    keywords = split_keywords(st.session_state.get('keywords', ''))
+    if keyword.casefold() not in {k.casefold() for k in keywords}:
+        st.session_state.keywords = ', '.join(keywords + [keyword])
+
+
+#"take the term instead" buttons, the keyword is replaced where it is in the list
+def replace_keyword(keyword, subject):
+    keywords = split_keywords(st.session_state.get('keywords', ''))
+    present = {k.casefold() for k in keywords}
+    replaced = []
+    for k in keywords:
+        if k != keyword:
+            replaced.append(k)
+        elif subject.casefold() not in present:
+            replaced.append(subject)
+            present.add(subject.casefold())
+    st.session_state.keywords = ', '.join(replaced)
+
+
 #keyword collection
 def keywords_section():
     st.header("Keywords")
     
+    #suggestions from the keyword lists (also finds it with a typo)
+    search = st.text_input("Search the keyword lists (Datalakes parameters, GCMD science keywords, lakes)",
+                           key="keyword_search", placeholder="e.g. oxygen, chloro, secchi")
+    if search:
+        terms = get_vocabulary().complete(search, limit=8)
+        if terms:
+            cols = st.columns(4)
+            for i, term in enumerate(terms):
+                with cols[i % 4]:
+                    st.button(f"+ {term.label}", key=f"suggested_keyword_{i}", on_click=add_keyword, args=(term.subject,),
+                              help=f"{term.scheme}: {term.subject}" if term.scheme else "Lake name")
+        else:
+            st.caption("Not in the keyword lists, it can still be added as it is")
+    
+    #keywords of the datasets in the catalog with a similar title/description (only when there is a catalog)
+    suggestions = suggest_keywords(st.session_state.get('dataset_title', ''), st.session_state.get('dataset_description', ''),
+                                   split_keywords(st.session_state.get('keywords', '')), limit=8)
+    if suggestions:
+        st.write("**Used for similar datasets:**")
+        cols = st.columns(4)
+        for i, (keyword, score) in enumerate(suggestions):
+            with cols[i % 4]:
+                st.button(f"+ {keyword}", key=f"catalog_keyword_{i}", on_click=add_keyword, args=(keyword,),
+                          help=f"Given to {score:.0%} of the most similar datasets in the catalog")
+    
     keywords = st.text_area("Keywords (one per line or comma seperated)",
                             key="keywords", height = 100, placeholder="e.g. measurement type, descriptor, variables collected")
     
     if keywords:
-        #make a list
-        keyword_list = [k.strip() for k in keywords.replace('\n', ',').split(',') if k.strip()] 
-        if keyword_list:
-            st.write(f"**Preview ({len(keyword_list)} keywords):**")
-            st.write(" - ".join(keyword_list))
+        #as they will be exported, keywords from the lists with their usual spelling
+        subjects = keyword_subjects(split_keywords(keywords))
+        if subjects:
+            st.write(f"**Preview ({len(subjects)} keywords):**")
+            st.write(" - ".join(f"{s.subject} ({s.scheme})" if s.scheme else s.subject for s in subjects))
+        
+        #other names of terms in the lists, only replaced if they click it
+        replacements = keyword_replacements(split_keywords(keywords))
+        if replacements:
+            st.caption("Other names of terms in the keyword lists, use the term instead?")
+            cols = st.columns(3)
+            for i, (keyword, term) in enumerate(replacements):
+                with cols[i % 3]:
+                    st.button(f"{keyword} → {term.label}", key=f"replace_keyword_{i}", on_click=replace_keyword,
+                              args=(keyword, term.subject), help=f"{term.scheme}: {term.subject}" if term.scheme else "Lake name")
 
     #sneakey submit button
     st.divider()
@@ -1253,12 +1552,30 @@ def export_section():
 
     #gen and display metadata for review
     try:
-        metadata = generate_metadata()
+        #normalize once, every format below is rendered from this
+        bundle = ExportBundle.from_session_state(st.session_state)
+        metadata = bundle.datacite()
         
         
         with st.expander("**Open to preview Metadata JSON:**"):
             st.json(metadata)
         
+        #check against the DataCite schema
+        schema_errors = validate_datacite(metadata)
+        if schema_errors:
+            with st.expander(f"DataCite schema check: {len(schema_errors)} issue(s)"):
+                for error in schema_errors:
+                    st.warning(error)
+        else:
+            st.success("Metadata is valid against the DataCite 4.6 schema")
+        
+        #described before? (only checked when there is a metadata catalog)
+        duplicates = check_duplicates(bundle.record)
+        if duplicates:
+            st.warning("This looks like a dataset that already has metadata, please check before exporting:")
+            for score, row in duplicates:
+                st.write(f"- {score:.0%} similar: **{row['title']}** ({row['doi'] or row['path']})")
+        
         #only export if all fields are there
         if not missing:
             st.subheader("Export the file")
@@ -1271,24 +1588,31 @@ def export_section():
             with col2:
                 #show the preview filename
                 timestamp = datetime.now().strftime('%Y%m%d')
-                full_filename=f"metadata_{filename_prefix}_{timestamp}.json"
+                filename_stem = f"metadata_{filename_prefix}_{timestamp}"
                 st.write("**Preview:**")
-                st.code(full_filename, language ="text")
+                st.code(f"{filename_stem}.json", language ="text")
             
-            json_str = json.dumps(metadata, indent = 2)
+            #only the selected formats get rendered
+            selected_formats = st.multiselect(
+                "Export formats", options = list(EXPORT_FORMATS), default = ["datacite-json"],
+                format_func = lambda name: EXPORT_FORMATS[name].label, key = "export_formats",
+                help = "DataCite JSON is what Datalakes uses. XML for repositories that only take XML, JSON-LD for search engines.")
             
             col1,col2 = st.columns([1,3])
             with col1:
-                st.download_button(
-                    label="Download JSON",
-                    data=json_str,
-                    file_name=full_filename,
-                    mime="application/json",
-                    type="primary")
+                for i, name in enumerate(selected_formats):
+                    export_format = EXPORT_FORMATS[name]
+                    st.download_button(
+                        label=f"Download {export_format.label}",
+                        data=bundle.render(name),
+                        file_name=bundle.filename(name, filename_stem),
+                        mime=export_format.mime,
+                        type="primary" if i == 0 else "secondary",
+                        key=f"download_{name}")
         
             with col2:
                 if st.button("Copy to clipboard"):
-                    st.code(json_str, language="json")
+                    st.code(bundle.render("datacite-json"), language="json")
                     st.info("JSON displayed above. You can copy and paste it where you like.")
     except Exception as e:
         st.error(f"Error generating the metadata: {str(e)}")
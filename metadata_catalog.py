@@ -0,0 +1,628 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 10:15:03 2026
+
+Searchable catalog of all the exported metadata files (instead of grep).
+The DataCite JSON/XML files are read into a local SQLite database with the
+title, people (names, ORCIDs, RORs), lakes, keywords, license, version and DOI,
+plus a full text index (FTS5) over title and description.
+
+Re-indexing is incremental: files with the same size and modification time are
+skipped, and files that were touched but have the same content (sha256) are not
+parsed again.
+
+From the terminal:
+    python metadata_catalog.py index ./metadata_output
+    python metadata_catalog.py query --lake "Lake Geneva" --orcid 0000-0002-1825-0097
+    python metadata_catalog.py query --text "oxygen profiles"
+    python metadata_catalog.py query --bbox 6.1 46.2 6.9 46.5
+    python metadata_catalog.py query --near 46.45 6.6 --radius 5
+    python metadata_catalog.py nearest 46.45 6.6 -k 5
+    python metadata_catalog.py query --collected 2022-06-01/2022-09-30
+    python metadata_catalog.py query --collected-within 2022
+    python metadata_catalog.py duplicates new_metadata.json
+
+The geoLocations are kept in an R-tree (SQLite rtree module) so bounding box,
+radius and nearest dataset searches don't have to look at every point
+(points, boxes and polygon outlines, distances are to the closest point of the area).
+The collection periods (dateType Collected) are kept in a second, one dimensional,
+R-tree for overlap and containment searches (see metadata_time.py for the formats).
+Every record also gets a MinHash signature with LSH band keys (metadata_duplicates.py)
+to warn about datasets that were already described.
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from datetime import datetime
+
+import numpy as np
+
+from geometry import bounding_box
+from metadata_duplicates import (BANDS, DUPLICATE_THRESHOLD, band_keys, minhash_signature, record_text,
+                                 signature_from_bytes, signature_to_bytes, similarity)
+from metadata_import import load_record
+from metadata_time import date_range_bounds, parse_period
+
+
+#where the catalog lives unless told otherwise
+DEFAULT_CATALOG = os.environ.get("METADATA_CATALOG", "metadata_catalog.sqlite")
+
+METADATA_EXTENSIONS = ('.json', '.xml')
+
+#bump when the tables change, older catalogs are then re-indexed on the next run
+SCHEMA_VERSION = 5
+#tables that changed columns in a version are dropped and made again when opening an older catalog
+CHANGED_TABLES = {5: ('locations', 'locations_rtree')}
+
+EARTH_RADIUS_KM = 6371.0088
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    title TEXT,
+    description TEXT,
+    doi TEXT,
+    license TEXT,
+    version TEXT,
+    publication_year INTEGER,
+    resource_type TEXT,
+    indexed_at TEXT);
+CREATE INDEX IF NOT EXISTS records_doi ON records(doi);
+CREATE INDEX IF NOT EXISTS records_license ON records(license);
+
+CREATE TABLE IF NOT EXISTS people (
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    role TEXT,
+    name TEXT,
+    orcid TEXT,
+    affiliation TEXT,
+    ror TEXT);
+CREATE INDEX IF NOT EXISTS people_record ON people(record_id);
+CREATE INDEX IF NOT EXISTS people_orcid ON people(orcid);
+CREATE INDEX IF NOT EXISTS people_ror ON people(ror);
+
+CREATE TABLE IF NOT EXISTS lakes (
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    name TEXT,
+    name_key TEXT);
+CREATE INDEX IF NOT EXISTS lakes_record ON lakes(record_id);
+CREATE INDEX IF NOT EXISTS lakes_key ON lakes(name_key);
+
+CREATE TABLE IF NOT EXISTS keywords (
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    keyword TEXT,
+    keyword_key TEXT);
+CREATE INDEX IF NOT EXISTS keywords_record ON keywords(record_id);
+CREATE INDEX IF NOT EXISTS keywords_key ON keywords(keyword_key);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(title, description);
+
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY,
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    place TEXT,
+    latitude REAL,
+    longitude REAL,
+    --extent of the point/box/polygon, a point is a box with no size
+    west REAL,
+    east REAL,
+    south REAL,
+    north REAL);
+CREATE INDEX IF NOT EXISTS locations_record ON locations(record_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS locations_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat);
+
+--collection periods in seconds since 1970, open sides use metadata_time.OPEN_START/OPEN_END
+--(the rtree only keeps float32 so the exact values are in periods)
+CREATE TABLE IF NOT EXISTS periods (
+    id INTEGER PRIMARY KEY,
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE,
+    date TEXT,
+    start_ts REAL,
+    end_ts REAL);
+CREATE INDEX IF NOT EXISTS periods_record ON periods(record_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS periods_rtree USING rtree(id, start_ts, end_ts);
+
+--MinHash signature of title + description, and one LSH key per band
+CREATE TABLE IF NOT EXISTS minhash (
+    record_id INTEGER PRIMARY KEY REFERENCES records(id) ON DELETE CASCADE,
+    signature BLOB);
+CREATE TABLE IF NOT EXISTS lsh_bands (
+    band INTEGER,
+    key INTEGER,
+    record_id INTEGER NOT NULL REFERENCES records(id) ON DELETE CASCADE);
+CREATE INDEX IF NOT EXISTS lsh_bands_key ON lsh_bands(band, key);
+CREATE INDEX IF NOT EXISTS lsh_bands_record ON lsh_bands(record_id);
+"""
+
+
+##################################################
+"""HELPERS"""
+##################################################
+
+def name_key(name: str) -> str:
+    #"LAKE GENEVA", "Lake  Geneva" and "lake geneva" should all match
+    #(the terminal version upper-cases the lake names, the app doesn't)
+    name = unicodedata.normalize('NFKD', name or '')
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    return re.sub(r'\s+', ' ', name).strip().casefold()
+
+
+def clean_identifier(value: str) -> str:
+    #accept ORCID/ROR as bare id or full url
+    return re.sub(r'^https?://(www\.)?(orcid\.org|ror\.org)/', '', (value or '').strip())
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    #great circle distance
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(latitude, longitude, radius_km) -> tuple:
+    #(west, south, east, north) box around the circle, used to ask the rtree first
+    angle = radius_km / EARTH_RADIUS_KM
+    south = latitude - math.degrees(angle)
+    north = latitude + math.degrees(angle)
+    if south <= -90 or north >= 90 or angle >= math.pi / 2:
+        #circle goes over a pole, all longitudes
+        return (-180.0, max(south, -90.0), 180.0, min(north, 90.0))
+    dlon = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    west, east = longitude - dlon, longitude + dlon
+    if west < -180 or east > 180:
+        #over the date line, keep it simple
+        west, east = -180.0, 180.0
+    return (west, south, east, north)
+
+
+def connect(db_path: str = DEFAULT_CATALOG) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.create_function("haversine_km", 4, haversine_km, deterministic=True)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version:
+        for changed_in, tables in CHANGED_TABLES.items():
+            if version < changed_in:
+                conn.executescript(''.join(f"DROP TABLE IF EXISTS {table};" for table in tables))
+    conn.executescript(SCHEMA)
+    if version < SCHEMA_VERSION:
+        #new tables, forget the file times so everything gets indexed again
+        with conn:
+            conn.execute("UPDATE records SET size = NULL, mtime = NULL, content_hash = NULL")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def _file_hash(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+##################################################
+"""INDEXING"""
+##################################################
+
+def _delete_record(conn: sqlite3.Connection, record_id: int):
+    conn.execute("DELETE FROM records_fts WHERE rowid = ?", (record_id,))
+    #the rtree doesn't know about foreign keys
+    conn.execute("DELETE FROM locations_rtree WHERE id IN (SELECT id FROM locations WHERE record_id = ?)", (record_id,))
+    conn.execute("DELETE FROM periods_rtree WHERE id IN (SELECT id FROM periods WHERE record_id = ?)", (record_id,))
+    conn.execute("DELETE FROM records WHERE id = ?", (record_id,))
+
+
+def _extent(location):
+    #(west, east, south, north) around the point, box and outline of a geoLocation, None if it has none
+    latitudes = [latitude for latitude, _ in location.polygon]
+    longitudes = [longitude for _, longitude in location.polygon]
+    if location.has_point():
+        latitudes.append(location.latitude)
+        longitudes.append(location.longitude)
+    if location.box:
+        west, east, south, north = location.box
+        latitudes.extend((south, north))
+        longitudes.extend((west, east))
+    return bounding_box(latitudes, longitudes)
+
+
+def _insert_record(conn: sqlite3.Connection, path: str, size: int, mtime: float, content_hash: str, record) -> int:
+    cur = conn.execute(
+        "INSERT INTO records (path, size, mtime, content_hash, title, description, doi, license, version, "
+        "publication_year, resource_type, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (path, size, mtime, content_hash, record.title, record.description, record.doi, record.license,
+         record.version, record.publication_year, record.resource_type, datetime.now().isoformat(timespec='seconds')))
+    record_id = cur.lastrowid
+
+    conn.execute("INSERT INTO records_fts (rowid, title, description) VALUES (?, ?, ?)",
+                 (record_id, record.title, record.description))
+
+    people = [(record_id, 'creator', p.name, p.orcid_id, p.affiliation.name if p.affiliation else '',
+               p.affiliation.ror_id if p.affiliation else '') for p in record.creators]
+    people += [(record_id, 'contributor', p.name, p.orcid_id, p.affiliation.name if p.affiliation else '',
+                p.affiliation.ror_id if p.affiliation else '') for p in record.contributors]
+    conn.executemany("INSERT INTO people VALUES (?, ?, ?, ?, ?, ?)", people)
+
+    lakes = {name_key(g.place): g.place for g in record.geo_locations if g.place}
+    conn.executemany("INSERT INTO lakes VALUES (?, ?, ?)", [(record_id, name, key) for key, name in lakes.items()])
+
+    for location in record.geo_locations:
+        extent = _extent(location)
+        if extent is None:
+            continue
+        west, east, south, north = extent
+        cur = conn.execute("INSERT INTO locations (record_id, place, latitude, longitude, west, east, south, north) "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                           (record_id, location.place, location.latitude, location.longitude, west, east, south, north))
+        conn.execute("INSERT INTO locations_rtree VALUES (?, ?, ?, ?, ?)", (cur.lastrowid, west, east, south, north))
+
+    for date_range in record.dates:
+        if date_range.date_type != "Collected":
+            continue
+        try:
+            start_ts, end_ts = date_range_bounds(date_range)
+        except ValueError:
+            #dates we can't read are still in the file, just not searchable
+            continue
+        cur = conn.execute("INSERT INTO periods (record_id, date, start_ts, end_ts) VALUES (?, ?, ?, ?)",
+                           (record_id, date_range.to_string(), start_ts, end_ts))
+        conn.execute("INSERT INTO periods_rtree VALUES (?, ?, ?)", (cur.lastrowid, start_ts, end_ts))
+
+    signature = minhash_signature(record_text(record))
+    if signature is not None:
+        conn.execute("INSERT INTO minhash VALUES (?, ?)", (record_id, signature_to_bytes(signature)))
+        conn.executemany("INSERT INTO lsh_bands VALUES (?, ?, ?)",
+                         [(band, key, record_id) for band, key in enumerate(band_keys(signature))])
+
+    keywords = {name_key(s.subject): s.subject for s in record.subjects if s.subject}
+    conn.executemany("INSERT INTO keywords VALUES (?, ?, ?)", [(record_id, kw, key) for key, kw in keywords.items()])
+
+    return record_id
+
+
+def index_file(conn: sqlite3.Connection, path: str, record=None) -> str:
+    #(re)index one file, returns 'skipped', 'touched', 'indexed' or 'error: ...'
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    row = conn.execute("SELECT id, size, mtime, content_hash FROM records WHERE path = ?", (path,)).fetchone()
+
+    #same size and time, nothing to do
+    if row and row['size'] == stat.st_size and row['mtime'] == stat.st_mtime:
+        return 'skipped'
+
+    content_hash = _file_hash(path)
+    if row and row['content_hash'] == content_hash:
+        #touched but not changed, just remember the new time
+        conn.execute("UPDATE records SET size = ?, mtime = ? WHERE id = ?", (stat.st_size, stat.st_mtime, row['id']))
+        return 'touched'
+
+    if record is None:
+        try:
+            record = load_record(path)
+        except (OSError, ValueError) as e:
+            return f"error: {e}"
+
+    if row:
+        _delete_record(conn, row['id'])
+    _insert_record(conn, path, stat.st_size, stat.st_mtime, content_hash, record)
+    return 'indexed'
+
+
+def find_metadata_files(paths) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith(METADATA_EXTENSIONS))
+        elif os.path.exists(path):
+            files.append(path)
+    return sorted(os.path.abspath(f) for f in files)
+
+
+def index_paths(conn: sqlite3.Connection, paths, prune: bool = True) -> dict:
+    #index all metadata files under the given folders, returns counts per outcome
+    counts = {'indexed': 0, 'touched': 0, 'skipped': 0, 'removed': 0, 'errors': []}
+    files = find_metadata_files(paths)
+    with conn:
+        for path in files:
+            outcome = index_file(conn, path)
+            if outcome.startswith('error'):
+                counts['errors'].append((path, outcome[7:]))
+            else:
+                counts[outcome] += 1
+
+        #forget files that were deleted from the indexed folders
+        if prune:
+            folders = tuple(os.path.join(os.path.abspath(p), '') for p in paths if os.path.isdir(p))
+            seen = set(files)
+            for row in conn.execute("SELECT id, path FROM records").fetchall():
+                if row['path'].startswith(folders) and row['path'] not in seen:
+                    _delete_record(conn, row['id'])
+                    counts['removed'] += 1
+    return counts
+
+
+def add_to_catalog(path: str, record=None, db_path: str = None):
+    #called after a file is exported, only when a catalog is set up: an explicit db_path, the
+    #METADATA_CATALOG environment variable or a DEFAULT_CATALOG that was made (the catalog that
+    #check_duplicates and the keyword suggestions read)
+    if not (db_path or os.environ.get("METADATA_CATALOG") or os.path.exists(DEFAULT_CATALOG)):
+        return None
+    db_path = db_path or DEFAULT_CATALOG
+    conn = connect(db_path)
+    try:
+        with conn:
+            return index_file(conn, path, record)
+    finally:
+        conn.close()
+
+
+##################################################
+"""QUERIES"""
+##################################################
+
+def _fts_query(text: str) -> str:
+    #quote every word so user input can't break the FTS syntax
+    words = re.findall(r'\w+', text or '')
+    return ' '.join(f'"{w}"' for w in words)
+
+
+#km from the point (?, ?) to the closest point of a location's extent
+DISTANCE = "haversine_km(?, ?, max(l.south, min(?, l.north)), max(l.west, min(?, l.east)))"
+SPATIAL_FILTER = ("r.id IN (SELECT l.record_id FROM locations_rtree g JOIN locations l ON l.id = g.id "
+                  "WHERE g.max_lon >= ? AND g.min_lon <= ? AND g.max_lat >= ? AND g.min_lat <= ?")
+
+
+#the rtree narrows it down, the exact check is on the periods table
+OVERLAP_FILTER = ("r.id IN (SELECT p.record_id FROM periods_rtree t JOIN periods p ON p.id = t.id "
+                  "WHERE t.end_ts >= ? AND t.start_ts <= ? AND p.end_ts >= ? AND p.start_ts <= ?)")
+WITHIN_FILTER = ("r.id IN (SELECT p.record_id FROM periods_rtree t JOIN periods p ON p.id = t.id "
+                 "WHERE t.start_ts >= ? AND t.end_ts <= ? AND p.start_ts >= ? AND p.end_ts <= ?)")
+
+
+def _rtree_floor(value: float) -> float:
+    #the rtree stores float32 rounded outwards, compare with a little slack
+    #so the exact check on the periods table gets all the candidates
+    return value - abs(value) * 1e-6 - 1
+
+
+def _rtree_ceil(value: float) -> float:
+    return value + abs(value) * 1e-6 + 1
+
+
+def query(conn: sqlite3.Connection, text=None, lake=None, orcid=None, ror=None, person=None,
+          keyword=None, license=None, doi=None, bbox=None, near=None, radius_km=10.0,
+          collected=None, collected_within=None, limit=50) -> list:
+    #all filters are combined with AND
+    #bbox is (west, south, east, north), near is (latitude, longitude) with radius_km around it
+    #collected: datasets collected at any time during this period (e.g. "2022-06/2022-09")
+    #collected_within: datasets collected entirely inside this period
+    where = []
+    params = []
+    order = "r.publication_year DESC, r.title"
+    joins = ""
+
+    if text and _fts_query(text):
+        joins = "JOIN records_fts f ON f.rowid = r.id"
+        where.append("records_fts MATCH ?")
+        params.append(_fts_query(text))
+        order = "f.rank"
+    if lake:
+        where.append("EXISTS (SELECT 1 FROM lakes l WHERE l.record_id = r.id AND l.name_key = ?)")
+        params.append(name_key(lake))
+    if orcid:
+        where.append("EXISTS (SELECT 1 FROM people p WHERE p.record_id = r.id AND p.orcid = ?)")
+        params.append(clean_identifier(orcid))
+    if ror:
+        where.append("EXISTS (SELECT 1 FROM people p WHERE p.record_id = r.id AND p.ror = ?)")
+        params.append(clean_identifier(ror))
+    if person:
+        where.append("EXISTS (SELECT 1 FROM people p WHERE p.record_id = r.id AND p.name LIKE ?)")
+        params.append(f"%{person}%")
+    if keyword:
+        where.append("EXISTS (SELECT 1 FROM keywords k WHERE k.record_id = r.id AND k.keyword_key = ?)")
+        params.append(name_key(keyword))
+    if license:
+        where.append("r.license = ?")
+        params.append(license)
+    if doi:
+        where.append("r.doi = ?")
+        params.append(doi)
+    if bbox:
+        west, south, east, north = bbox
+        where.append(SPATIAL_FILTER + ")")
+        params.extend([west, east, south, north])
+    if collected:
+        start_ts, end_ts = parse_period(collected)
+        where.append(OVERLAP_FILTER)
+        params.extend([_rtree_floor(start_ts), _rtree_ceil(end_ts), start_ts, end_ts])
+    if collected_within:
+        start_ts, end_ts = parse_period(collected_within)
+        where.append(WITHIN_FILTER)
+        params.extend([_rtree_floor(start_ts), _rtree_ceil(end_ts), start_ts, end_ts])
+    if near:
+        latitude, longitude = near
+        west, south, east, north = radius_bbox(latitude, longitude, radius_km)
+        #the rtree gives the candidates in the box, the exact distance does the rest
+        where.append(SPATIAL_FILTER + f" AND {DISTANCE} <= ?)")
+        params.extend([west, east, south, north, latitude, longitude, latitude, longitude, radius_km])
+
+    sql = (f"SELECT r.id, r.path, r.title, r.doi, r.publication_year, r.license, r.version FROM records r {joins} "
+           f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} LIMIT ?")
+    return conn.execute(sql, params + [limit]).fetchall()
+
+
+def nearest(conn: sqlite3.Connection, latitude, longitude, k=10) -> list:
+    #the k closest datasets as (distance_km, row), closest first
+    #the search box starts small and grows until k datasets are inside the circle,
+    #anything outside the box is further away than the circle radius so can't be closer
+    radius = 1.0
+    while True:
+        west, south, east, north = radius_bbox(latitude, longitude, radius)
+        rows = conn.execute(
+            f"SELECT l.record_id, MIN({DISTANCE}) AS distance "
+            "FROM locations_rtree g JOIN locations l ON l.id = g.id "
+            "WHERE g.max_lon >= ? AND g.min_lon <= ? AND g.max_lat >= ? AND g.min_lat <= ? "
+            "GROUP BY l.record_id ORDER BY distance",
+            (latitude, longitude, latitude, longitude, west, east, south, north)).fetchall()
+        found = [(row['distance'], row['record_id']) for row in rows if row['distance'] <= radius]
+        if len(found) >= k or radius >= math.pi * EARTH_RADIUS_KM:
+            break
+        radius *= 4
+
+    results = []
+    for distance, record_id in found[:k]:
+        row = conn.execute("SELECT id, path, title, doi, publication_year, license, version FROM records WHERE id = ?",
+                           (record_id,)).fetchone()
+        results.append((distance, row))
+    return results
+
+
+def find_duplicates(conn: sqlite3.Connection, record, threshold=DUPLICATE_THRESHOLD, exclude_path=None, limit=5) -> list:
+    #catalog records that probably describe the same dataset, as (similarity, row), most similar first
+    #a record with the same DOI is the same dataset being updated, not a duplicate
+    signature = minhash_signature(record_text(record))
+    if signature is None:
+        return []
+
+    #only the records sharing at least one band are looked at
+    values = ', '.join(['(?, ?)'] * BANDS)
+    params = [v for band, key in enumerate(band_keys(signature)) for v in (band, key)]
+    candidates = conn.execute(
+        f"SELECT m.record_id, m.signature FROM minhash m WHERE m.record_id IN "
+        f"(SELECT b.record_id FROM (VALUES {values}) v JOIN lsh_bands b ON b.band = v.column1 AND b.key = v.column2)",
+        params).fetchall()
+    if not candidates:
+        return []
+
+    #score all the candidates at once, only the close ones are looked up
+    scores = similarity(signature, np.vstack([signature_from_bytes(blob) for _, blob in candidates]))
+    results = []
+    exclude_path = os.path.abspath(exclude_path) if exclude_path else None
+    for (record_id, _), score in zip(candidates, scores):
+        if score < threshold:
+            continue
+        row = conn.execute("SELECT id, path, title, doi, publication_year, license, version FROM records WHERE id = ?",
+                           (record_id,)).fetchone()
+        if row['path'] == exclude_path or (record.doi and row['doi'] == record.doi):
+            continue
+        results.append((float(score), row))
+    results.sort(key=lambda item: -item[0])
+    return results[:limit]
+
+
+def check_duplicates(record, db_path: str = None, exclude_path=None) -> list:
+    #used before exporting, does nothing when there is no catalog yet
+    db_path = db_path or DEFAULT_CATALOG
+    if not os.path.exists(db_path):
+        return []
+    conn = connect(db_path)
+    try:
+        return find_duplicates(conn, record, exclude_path=exclude_path)
+    finally:
+        conn.close()
+
+
+def _print_rows(rows):
+    for row in rows:
+        print(f"{row['publication_year']}  {row['title']}  {row['doi'] or ''}\n      {row['path']}")
+    print(f"\n{len(rows)} dataset(s) found")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Catalog of exported metadata files")
+    parser.add_argument("--db", default=DEFAULT_CATALOG, help=f"catalog database (default: {DEFAULT_CATALOG})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="add/update metadata files in the catalog")
+    index_parser.add_argument("paths", nargs="+", help="metadata files or folders")
+    index_parser.add_argument("--no-prune", action="store_true", help="keep entries for files that no longer exist")
+
+    query_parser = subparsers.add_parser("query", help="search the catalog")
+    query_parser.add_argument("--text", help="full text search in title and description")
+    query_parser.add_argument("--lake", help="lake/site name")
+    query_parser.add_argument("--orcid", help="ORCID of a creator or contributor")
+    query_parser.add_argument("--ror", help="ROR ID of an affiliation")
+    query_parser.add_argument("--person", help="part of a creator/contributor name")
+    query_parser.add_argument("--keyword", help="keyword")
+    query_parser.add_argument("--license", help="license, e.g. 'CC BY 4.0'")
+    query_parser.add_argument("--doi", help="DOI")
+    query_parser.add_argument("--bbox", nargs=4, type=float, metavar=("WEST", "SOUTH", "EAST", "NORTH"),
+                              help="only datasets with a location inside the box (decimal degrees)")
+    query_parser.add_argument("--near", nargs=2, type=float, metavar=("LAT", "LON"),
+                              help="only datasets with a location within --radius of this point")
+    query_parser.add_argument("--radius", type=float, default=10.0, help="radius in km for --near (default: 10)")
+    query_parser.add_argument("--collected", metavar="PERIOD",
+                              help="collected at any time during the period, e.g. 2022-06-01/2022-09-30, 2022 or 2022-06/")
+    query_parser.add_argument("--collected-within", metavar="PERIOD",
+                              help="collected entirely inside the period")
+    query_parser.add_argument("--limit", type=int, default=50)
+
+    nearest_parser = subparsers.add_parser("nearest", help="datasets closest to a point")
+    nearest_parser.add_argument("latitude", type=float)
+    nearest_parser.add_argument("longitude", type=float)
+    nearest_parser.add_argument("-k", type=int, default=10, help="number of datasets (default: 10)")
+
+    duplicates_parser = subparsers.add_parser("duplicates", help="catalog records that look like the same dataset")
+    duplicates_parser.add_argument("path", help="metadata file to check")
+    duplicates_parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD,
+                                   help=f"minimum similarity between 0 and 1 (default: {DUPLICATE_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db)
+
+    if args.command == "index":
+        counts = index_paths(conn, args.paths, prune=not args.no_prune)
+        for path, error in counts['errors']:
+            print(f"ERROR {path}: {error}")
+        print(f"{counts['indexed']} indexed, {counts['touched'] + counts['skipped']} unchanged, "
+              f"{counts['removed']} removed, {len(counts['errors'])} errors")
+        return 1 if counts['errors'] else 0
+
+    if args.command == "nearest":
+        for distance, row in nearest(conn, args.latitude, args.longitude, args.k):
+            print(f"{distance:8.2f} km  {row['title']}  {row['doi'] or ''}\n      {row['path']}")
+        return 0
+
+    if args.command == "duplicates":
+        try:
+            record = load_record(args.path)
+        except (OSError, ValueError) as e:
+            print(f"ERROR: {e}")
+            return 2
+        duplicates = find_duplicates(conn, record, args.threshold, exclude_path=args.path)
+        for score, row in duplicates:
+            print(f"{score:5.0%}  {row['title']}  {row['doi'] or ''}\n      {row['path']}")
+        print(f"\n{len(duplicates)} likely duplicate(s)")
+        return 1 if duplicates else 0
+
+    try:
+        rows = query(conn, text=args.text, lake=args.lake, orcid=args.orcid, ror=args.ror, person=args.person,
+                     keyword=args.keyword, license=args.license, doi=args.doi, bbox=args.bbox, near=args.near,
+                     radius_km=args.radius, collected=args.collected, collected_within=args.collected_within,
+                     limit=args.limit)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 2
+    _print_rows(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
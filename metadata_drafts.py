@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 09:48:21 2026
+
+Unfinished metadata is kept as a draft in a small SQLite file, so a session
+timeout, a reload of the page or a closed terminal doesn't lose what was typed.
+The app saves after every change and the terminal script after every section,
+both can pick a draft up again.
+
+A draft is stored per section (author, contributors, locations, ...): the
+section is written as JSON with a hash of it, and saving only writes the
+sections whose hash changed since the last save, so saving a record with a
+long contributor list while editing the keywords only writes the keywords.
+
+Every draft has an owner: the app keeps a random draft key per browser (in the
+page link), a draft is only listed for the key it was saved with, so nobody
+sees or resumes the drafts (names, emails, ORCIDs) of somebody else.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import uuid
+from datetime import date, datetime, timedelta
+
+
+DEFAULT_DRAFTS = os.environ.get("METADATA_DRAFTS", "metadata_drafts.sqlite")
+#drafts not touched for this long are removed
+KEEP_DAYS = 30
+
+#the session state keys of the app per section (the ones from_session_state reads)
+APP_SECTIONS = {
+    'author': ['author_first_name', 'author_last_name', 'author_email', 'author_affiliation',
+               'author_orcid_data', 'author_ror_data', 'manual_author_orcid'],
+    'dataset': ['dataset_title', 'dataset_description', 'publication_year', 'resource_type',
+                'dataset_version', 'license', 'dataset_doi'],
+    'contributors': ['contributors'],
+    'locations': ['locations'],
+    'time': ['start_date', 'end_date', 'collection_periods'],
+    'keywords': ['keywords'],
+    'files': ['sizes', 'formats']}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    id TEXT PRIMARY KEY,
+    front_end TEXT,
+    owner TEXT,
+    title TEXT,
+    created_at TEXT,
+    updated_at TEXT);
+CREATE TABLE IF NOT EXISTS draft_sections (
+    draft_id TEXT NOT NULL REFERENCES drafts(id) ON DELETE CASCADE,
+    section TEXT NOT NULL,
+    content TEXT,
+    content_hash TEXT,
+    PRIMARY KEY (draft_id, section));
+"""
+
+
+def _to_json(value):
+    #dates of the date inputs, turned back into dates when loading
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, date):
+        return {'__date__': value.isoformat()}
+    raise TypeError(f"{type(value).__name__} can't be saved in a draft")
+
+
+def _from_json(value: dict):
+    if '__datetime__' in value:
+        return datetime.fromisoformat(value['__datetime__'])
+    if '__date__' in value:
+        return date.fromisoformat(value['__date__'])
+    return value
+
+
+def encode_section(section) -> tuple:
+    #(JSON, hash), the same content always gives the same JSON
+    text = json.dumps(section, default=_to_json, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return text, hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def connect(db_path: str = None) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path or DEFAULT_DRAFTS)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    #files from before there were owners
+    if 'owner' not in {row['name'] for row in conn.execute("PRAGMA table_info(drafts)")}:
+        conn.execute("ALTER TABLE drafts ADD COLUMN owner TEXT")
+    return conn
+
+
+def new_draft_id() -> str:
+    return uuid.uuid4().hex
+
+
+def group_sections(state, sections: dict, rest: str = None) -> dict:
+    #{section: {key: value}} from a flat state (session state or generator metadata),
+    #keys that aren't in any section go into the rest section if there is one
+    grouped = {name: {key: state[key] for key in keys if key in state} for name, keys in sections.items()}
+    if rest:
+        known = {key for keys in sections.values() for key in keys}
+        grouped[rest] = {key: value for key, value in state.items() if key not in known}
+    return grouped
+
+
+def save_draft(draft_id: str, sections: dict, hashes: dict = None, front_end: str = '', title: str = '',
+               db_path: str = None, owner: str = '') -> dict:
+    #write the sections that changed since the last save, returns the hashes of what is saved now
+    #(hashes=None: compare with what is in the store)
+    #owner: who may list the draft again (the draft key of the browser in the app)
+    encoded = {name: encode_section(section) for name, section in sections.items()}
+    conn = None
+    try:
+        if hashes is None:
+            conn = connect(db_path)
+            hashes = dict(conn.execute("SELECT section, content_hash FROM draft_sections WHERE draft_id = ?",
+                                       (draft_id,)).fetchall())
+        changed = {name: value for name, value in encoded.items() if hashes.get(name) != value[1]}
+        if not changed:
+            return hashes
+        conn = conn or connect(db_path)
+        now = datetime.now().isoformat(timespec='seconds')
+        with conn:
+            conn.execute("INSERT INTO drafts (id, front_end, owner, title, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                         "ON CONFLICT(id) DO UPDATE SET title = excluded.title, updated_at = excluded.updated_at",
+                         (draft_id, front_end, owner, title, now, now))
+            conn.executemany("INSERT OR REPLACE INTO draft_sections VALUES (?, ?, ?, ?)",
+                             [(draft_id, name, text, content_hash) for name, (text, content_hash) in changed.items()])
+    finally:
+        if conn is not None:
+            conn.close()
+    return {**hashes, **{name: content_hash for name, (_, content_hash) in changed.items()}}
+
+
+def load_draft(draft_id: str, db_path: str = None) -> tuple:
+    #({section: {key: value}}, {section: hash}), ValueError if there is no such draft
+    conn = connect(db_path)
+    try:
+        rows = conn.execute("SELECT section, content, content_hash FROM draft_sections WHERE draft_id = ?",
+                            (draft_id,)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        raise ValueError(f"No draft {draft_id}")
+    return ({row['section']: json.loads(row['content'], object_hook=_from_json) for row in rows},
+            {row['section']: row['content_hash'] for row in rows})
+
+
+def list_drafts(front_end: str = None, db_path: str = None, limit=10, owner: str = None) -> list:
+    #the latest drafts (id, front_end, owner, title, created_at, updated_at), old ones are removed first
+    #owner: only the drafts saved with this owner
+    db_path = db_path or DEFAULT_DRAFTS
+    if not os.path.exists(db_path):
+        return []
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM drafts WHERE updated_at < ?",
+                         ((datetime.now() - timedelta(days=KEEP_DAYS)).isoformat(timespec='seconds'),))
+        where = {}
+        if front_end:
+            where["front_end = ?"] = front_end
+        if owner is not None:
+            where["owner = ?"] = owner
+        sql = ("SELECT * FROM drafts" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY updated_at DESC LIMIT ?")
+        return conn.execute(sql, list(where.values()) + [limit]).fetchall()
+    finally:
+        conn.close()
+
+
+def delete_draft(draft_id: str, db_path: str = None):
+    #once the metadata is saved for good
+    db_path = db_path or DEFAULT_DRAFTS
+    if not os.path.exists(db_path):
+        return
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM drafts WHERE id = ?", (draft_id,))
+    finally:
+        conn.close()
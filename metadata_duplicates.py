@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:12:48 2026
+
+Finding metadata records that describe the same dataset twice (slightly different
+title or abstract). The title and description are cut into overlapping pieces of
+text (shingles), each record gets a MinHash signature of those pieces, and the
+signature is split into bands for locality sensitive hashing (LSH): two records
+that share one band are candidates, and their signatures say how similar they are.
+
+The signatures and band keys are stored in the catalog (metadata_catalog.py),
+looking up a record only touches the records that share a band with it, so it
+stays fast with a lot of records.
+"""
+
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+
+#20 bands of 6 rows: records with a similarity of 0.7 share a band 92% of the time,
+#0.8 and up practically always, unrelated texts (~0.3) only 1.5% of the time
+BANDS = 20
+ROWS = 6
+NUM_PERM = BANDS * ROWS
+
+SHINGLE_SIZE = 5
+#from this on the records are reported as likely duplicates
+DUPLICATE_THRESHOLD = 0.7
+
+#(a * x + b) mod p, the same fixed permutations everywhere so stored signatures stay comparable
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.default_rng(20261021)
+_A = _rng.integers(1, int(_PRIME), NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERM, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    #lower case, no accents, no punctuation, single spaces
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).casefold()
+    return ' '.join(re.findall(r'\w+', text))
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    #a 31 bit hash of every SHINGLE_SIZE characters long piece of the text, duplicates removed
+    #(polynomial hash over the characters, computed for all the pieces at once)
+    text = normalize_text(text)
+    if not text:
+        return np.empty(0, dtype=np.uint64)
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    size = min(SHINGLE_SIZE, len(codes))
+    hashes = np.zeros(len(codes) - size + 1, dtype=np.uint64)
+    for i in range(size):
+        hashes = (hashes * np.uint64(1_000_003) + codes[i:len(codes) - size + 1 + i]) % _PRIME
+    return np.unique(hashes)
+
+
+def record_text(record) -> str:
+    return f"{record.title} {record.description}"
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    #NUM_PERM minimum hash values of the shingles, None for empty text
+    hashes = shingle_hashes(text)
+    if not len(hashes):
+        return None
+    #all permutations of all shingles at once, (NUM_PERM, shingles)
+    values = (_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signature: np.ndarray) -> list:
+    #one key per band, as signed 64 bit integers for SQLite
+    rows = signature.reshape(BANDS, ROWS)
+    return [int.from_bytes(hashlib.blake2b(row.tobytes(), digest_size=8).digest(), 'little', signed=True)
+            for row in rows]
+
+
+def signature_to_bytes(signature: np.ndarray) -> bytes:
+    return signature.astype('<u4').tobytes()
+
+
+def signature_from_bytes(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype='<u4')
+
+
+def similarity(signature: np.ndarray, others: np.ndarray):
+    #estimated Jaccard similarity of the shingle sets, others can be one signature
+    #or a (records, NUM_PERM) array to compare with many at once
+    return np.count_nonzero(others == signature, axis=-1) / NUM_PERM
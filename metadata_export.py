@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:02:44 2026
+
+Export engine for all the output formats.
+The record is normalized once (session state / terminal answers -> DatasetMetadata)
+and every requested format is rendered from that same record, only when it is
+asked for, and kept so asking twice costs nothing.
+
+New formats are added with the register_format decorator:
+
+    @register_format("my-format", "My format", "txt", "text/plain")
+    def render_my_format(bundle):
+        return f"{bundle.record.title} ({bundle.datacite()['data']['attributes']['publicationYear']})"
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
+from datacite_xml import to_datacite_xml
+from iso19115_xml import to_iso19115_xml
+from metadata_json import dumps as json_dumps
+from metadata_model import DatasetMetadata, from_generator_metadata, from_session_state, to_datacite
+from schemaorg_jsonld import to_schemaorg_jsonld
+
+
+@dataclass(slots=True, frozen=True)
+class ExportFormat:
+    name: str
+    label: str
+    extension: str
+    mime: str
+    render: Callable
+
+
+#all the known formats, name -> ExportFormat
+EXPORT_FORMATS = {}
+
+
+def register_format(name: str, label: str, extension: str, mime: str):
+    #decorator to add a format writer, the function gets an ExportBundle
+    #and returns the file content (str or bytes)
+    def decorator(func):
+        EXPORT_FORMATS[name] = ExportFormat(name, label, extension, mime, func)
+        return func
+    return decorator
+
+
+class ExportBundle:
+    #one record, normalized once, rendered lazily into any registered format
+    __slots__ = ("record", "_datacite", "_rendered")
+
+    def __init__(self, record: DatasetMetadata):
+        self.record = record
+        self._datacite = None
+        self._rendered = {}
+
+    @classmethod
+    def from_session_state(cls, state):
+        return cls(from_session_state(state))
+
+    @classmethod
+    def from_generator_metadata(cls, metadata: dict):
+        return cls(from_generator_metadata(metadata))
+
+    def datacite(self) -> dict:
+        #the DataCite dict is used by the preview, validation and the json writer
+        if self._datacite is None:
+            self._datacite = to_datacite(self.record)
+        return self._datacite
+
+    def render(self, name: str):
+        if name not in self._rendered:
+            try:
+                export_format = EXPORT_FORMATS[name]
+            except KeyError:
+                raise ValueError(f"Unknown export format '{name}'. Known formats: {', '.join(EXPORT_FORMATS)}") from None
+            self._rendered[name] = export_format.render(self)
+        return self._rendered[name]
+
+    def filename(self, name: str, stem: str) -> str:
+        return f"{stem}.{EXPORT_FORMATS[name].extension}"
+
+
+##################################################
+"""BUILT IN FORMATS"""
+##################################################
+
+@register_format("datacite-json", "DataCite JSON", "json", "application/json")
+def render_datacite_json(bundle: ExportBundle):
+    #canonical so the same metadata always gives the same file
+    return json_dumps(bundle.datacite(), canonical=True)
+
+
+@register_format("datacite-xml", "DataCite XML", "xml", "application/xml")
+def render_datacite_xml(bundle: ExportBundle):
+    return to_datacite_xml(bundle.record)
+
+
+@register_format("schemaorg-jsonld", "schema.org JSON-LD", "jsonld", "application/ld+json")
+def render_schemaorg_jsonld(bundle: ExportBundle):
+    return json_dumps(to_schemaorg_jsonld(bundle.record), canonical=True)
+
+
+@register_format("iso19115-xml", "ISO 19115 XML", "iso19115.xml", "application/xml")
+def render_iso19115_xml(bundle: ExportBundle):
+    return to_iso19115_xml(bundle.record)
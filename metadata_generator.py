@@ -11,20 +11,49 @@ More info on DataCite metadata schema : https://datacite-metadata-schema.readthe
 
 """
 
-import json
 from datetime import datetime
 import re
 import requests
 import os
 from io import StringIO
 import csv
+from metadata_model import (from_generator_metadata, keyword_replacements, keyword_subjects, merge_periods, to_datacite,
+                            to_generator_metadata)
+from metadata_import import load_record
+from metadata_json import dumps as json_dumps, write_json
+from metadata_validate import validate_datacite
+from metadata_export import EXPORT_FORMATS, ExportBundle
+from metadata_catalog import add_to_catalog, check_duplicates
+from metadata_drafts import delete_draft, group_sections, list_drafts, load_draft, new_draft_id, save_draft
+from metadata_time import parse_period
+from lake_gazetteer import get_gazetteer
+from keyword_vocabulary import get_vocabulary
+from keyword_suggest import suggest_keywords, update_model
+from coordinates import WGS84, convert_point
+from data_profile import profile_paths
+from file_manifest import build_manifest, datacite_formats, datacite_sizes, write_manifests
 #from pathlib import Path
 #import yaml
 
 
 class DatalakeMetadataGen:
+    #section name, the metadata keys it fills, the function collecting it
+    SECTIONS = [
+        ("BASIC INFORMATION", ['creatorName', 'affiliation', 'affiliationIdentifier', 'identifiers', 'title',
+                               'description', 'publicationYear', 'resourceType'], 'collect_initial_metadata'),
+        ("CONTRIBUTORS", ['contributors'], 'collect_contributors'),
+        ("LOCATION", ['geoLocationPlace', 'pointLatitude', 'pointLongitude', 'other_locations'], 'collect_location'),
+        ("DATA INFO", ['license', 'doi', 'version'], 'collect_attributes'),
+        ("KEYWORDS", ['keywords_list'], 'collect_keywords'),
+        ("TEMPORAL COVERAGE", ['startDate', 'startTime', 'endDate', 'endTime', 'collection_periods'], 'collect_temporal_coverage')]
+    
     def __init__(self):
         self.metadata = {}
+        #file_manifest entries when the dataset folder was checked
+        self.manifest = []
+        #unfinished metadata is saved as a draft after every section (metadata_drafts.py)
+        self.draft_id = new_draft_id()
+        self.draft_hashes = {}
     
     ##################################################
     """FIRST DEFINE ALL THE CHECKS AND VALIDATIONS"""
@@ -332,6 +361,12 @@ class DatalakeMetadataGen:
                 else:
                     print("Identifiers: None")
             
+            elif key == 'collection_periods' and value:
+                print(f"Other collection periods: {', '.join(p['start'] + '/' + p['end'] for p in value)}")
+            
+            elif key == 'other_locations' and value:
+                print(f"Other locations: {', '.join(l['place'] or 'outline/box' for l in value)}")
+            
             elif isinstance(value,list):
                 if value:
                     print(f"{key.capitalize()}: {', '.join(str(v) for v in value)}")
@@ -773,13 +808,23 @@ class DatalakeMetadataGen:
             print("---------------------------------")
             
             #user input and validate its in the correct format
-            lat_input = self.get_user_input("\nLatitude (decimal degrees)")
-            latitude = self.validate_coordinates(lat_input, "latitude")
-            
-            lon_input = self.get_user_input("\nLongitude (decimal degrees)")
-            longitude = self.validate_coordinates(lon_input, "longitude")
+            #no coordinates -> the point of a known lake is used
+            #Swiss grid (LV95/LV03) and degrees minutes seconds are converted
+            lat_input = self.get_user_input("\nLatitude (decimal degrees, or LV95/LV03 east), leave empty to pick a known lake", required = False)
+            latitude = ""
+            
+            if lat_input:
+                lon_input = self.get_user_input("\nLongitude (decimal degrees, or LV95/LV03 north)")
+                lat_input, lon_input = self.convert_coordinates(lat_input, lon_input)
+                latitude = self.validate_coordinates(lat_input, "latitude")
+                longitude = self.validate_coordinates(lon_input, "longitude")
+                suggested_lake = self.suggest_lake(latitude, longitude)
+                lake_input = self.get_user_input("\nName of lake", default = suggested_lake or None)
+            else:
+                longitude = ""
+                lake_input = self.get_user_input("\nName of lake")
             
-            lake_input = self.get_user_input("\nName of lake").strip().upper()
+            lake_input, latitude, longitude = self.complete_location(lake_input, latitude, longitude)
         
             location_fields = {
                 'geoLocationPlace': lake_input,
@@ -800,7 +845,8 @@ class DatalakeMetadataGen:
                         break
                     if field_to_correct == 'geoLocationPlace':
                         lake_input = self.get_user_input("Name of lake")
-                        location_fields['geoLocationPlace'] = lake_input.strip().upper()
+                        location_fields['geoLocationPlace'], _, _ = self.complete_location(
+                            lake_input, location_fields['pointLatitude'], location_fields['pointLongitude'])
                     elif field_to_correct == 'pointLatitude':
                         lat_input = self.get_user_input("Latitude (decimal degrees)")
                         location_fields['pointLatitude'] = self.validate_coordinates(lat_input, "pointLatitude")
@@ -813,6 +859,62 @@ class DatalakeMetadataGen:
                         self.metadata.update(location_fields)
                         return
    
+    def convert_coordinates(self, first: str, second: str):
+        #LV95/LV03/DMS -> WGS84 decimal degrees, anything else is returned as typed
+        try:
+            latitude, longitude, system = convert_point(first, second)
+        except ValueError:
+            return first, second
+        if system == WGS84:
+            return first, second
+        print(f"Converted the {system} coordinates to WGS84: {latitude}, {longitude}")
+        return str(latitude), str(longitude)
+    
+    def suggest_lake(self, latitude: str, longitude: str) -> str:
+        #known lake at the coordinates (bundled gazetteer, offline), "" if none
+        try:
+            match = get_gazetteer().locate(float(latitude), float(longitude))
+        except ValueError:
+            return ""
+        if match is None:
+            return ""
+        where = "in" if match.inside else f"{match.distance_km:.1f} km from"
+        print(f"These coordinates are {where} {match.lake.name}")
+        return match.lake.name
+    
+    def choose_lake(self, name: str):
+        #known lake for the typed name, offers the closest names if it isn't an exact match
+        gazetteer = get_gazetteer()
+        lake = gazetteer.lookup(name)
+        if lake:
+            return lake
+        options = gazetteer.complete(name, limit = 5)
+        if not options:
+            return None
+        print("\nKnown lakes matching the name:")
+        for i, option in enumerate(options, 1):
+            other_names = f" ({', '.join(option.aliases)})" if option.aliases else ""
+            print(f"{i}. {option.name}{other_names}")
+        choice = self.get_user_input("Number of the lake (enter to keep the name as typed)", required = False)
+        if choice.isdigit() and 1 <= int(choice) <= len(options):
+            return options[int(choice) - 1]
+        return None
+    
+    def complete_location(self, lake_input: str, latitude: str, longitude: str):
+        #known lakes always get the same name, and their point if there are no coordinates
+        lake = self.choose_lake(lake_input)
+        if lake:
+            if not latitude:
+                latitude, longitude = str(lake.latitude), str(lake.longitude)
+                print(f"Using the coordinates of {lake.name}: {latitude}, {longitude}")
+            return lake.name, latitude, longitude
+        
+        if not latitude:
+            #not a known lake, coordinates are needed after all
+            latitude = self.validate_coordinates(self.get_user_input("\nLatitude (decimal degrees)"), "latitude")
+            longitude = self.validate_coordinates(self.get_user_input("\nLongitude (decimal degrees)"), "longitude")
+        return lake_input.strip().upper(), latitude, longitude
+   
     """ COLLECT TEMPORAL INFORMATION"""
     def collect_temporal_coverage(self):
         #start and end times of the data collection
@@ -838,6 +940,7 @@ class DatalakeMetadataGen:
             
             if self.get_yes_no("\nIs this information correct?"):
                 self.metadata.update(temporal_fields)
+                self.collect_collection_periods()
                 break
             
             else:
@@ -859,8 +962,29 @@ class DatalakeMetadataGen:
                     
                     if self.get_yes_no("Is this information correct now?"):
                         self.metadata.update(temporal_fields)
+                        self.collect_collection_periods()
                         return
     
+    def collect_collection_periods(self):
+        #data collected in several campaigns/deployments with gaps in between,
+        #overlapping or touching periods are merged when the record is made
+        periods = list(self.metadata.get('collection_periods') or [])
+        if periods:
+            print(f"\nOther collection periods: {', '.join(p['start'] + '/' + p['end'] for p in periods)}")
+        
+        while self.get_yes_no("\nAdd another collection period?"):
+            start = self.get_user_input("\nStart (YYYY-MM-DD or YYYY-MM-DDThh:mm:ss)", required = False)
+            end = self.get_user_input("\nEnd (YYYY-MM-DD or YYYY-MM-DDThh:mm:ss)", required = False)
+            try:
+                parse_period(f"{start}/{end}")
+            except ValueError as e:
+                print(f"Not added: {e}")
+                continue
+            periods.append({'start': start, 'end': end})
+        
+        if periods:
+            self.metadata['collection_periods'] = merge_periods(periods)
+    
     
     """COLLECT ATTRIBUTIONS"""    
     def collect_attributes(self):
@@ -911,20 +1035,40 @@ class DatalakeMetadataGen:
                         return
                     
     """COLLECT KEYWORDS"""   
+    def show_keyword_suggestions(self, text):
+        #matches from the keyword lists (Datalakes parameters, GCMD science keywords, lakes)
+        terms = get_vocabulary().complete(text, limit = 10)
+        if not terms:
+            print("Nothing found in the keyword lists, it can still be added as it is")
+        for term in terms:
+            print(f"  {term.subject}" + (f"  [{term.scheme}]" if term.scheme else "  [lake]"))
+    
     def collect_keywords(self):
-        #collect keywords - just user input, this is a spot where finding a good suggestion
-        #of keywords could be helpful - I've looked but haven't found anything great
-        #we could also ask james to use the datalakes variable names and put them somewhere
-        #as a suggested start? 
+        #collect keywords - user input, with suggestions from the keyword lists
+        #(data/keywords.json, the datalakes variable names and GCMD) when starting with ?
         while True:
             print("---------------------------------")
             print(" KEYWORDS")
             print("---------------------------------")
+            
+            #keywords of similar datasets in the catalog, if there is one
+            suggestions = suggest_keywords(self.metadata.get('title', ''), self.metadata.get('description', ''),
+                                           self.metadata.get('keywords_list') or [])
+            if suggestions:
+                print(f"Used for similar datasets: {', '.join(keyword for keyword, _ in suggestions)}")
     
-            keywords_input = self.get_user_input("\nKeywords (comma seperated)", required = False)
+            keywords_input = self.get_user_input("\nKeywords (comma seperated, or ?text to search the keyword lists)", required = False)
+            while keywords_input.startswith('?'):
+                self.show_keyword_suggestions(keywords_input[1:])
+                keywords_input = self.get_user_input("\nKeywords (comma seperated, or ?text to search the keyword lists)", required = False)
             
             if keywords_input:
-                keywords_list = [kw.strip() for kw in keywords_input.split(',') if kw.strip()]
+                #keywords from the lists with their usual spelling, other names only if they want the term
+                keywords_input = [kw.strip() for kw in keywords_input.split(',') if kw.strip()]
+                for keyword, term in keyword_replacements(keywords_input):
+                    if self.get_yes_no(f"\n'{keyword}' is another name of '{term.label}' ({term.scheme or 'lake'}), use that instead?"):
+                        keywords_input = [term.subject if kw == keyword else kw for kw in keywords_input]
+                keywords_list = [s.subject for s in keyword_subjects(keywords_input)]
                 
             else:
                 keywords_list = []
@@ -988,165 +1132,89 @@ class DatalakeMetadataGen:
         
     def to_datacite_json(self) -> dict:
         """Convert collected metadata to DataCite JSON format"""
-        
-        #build creator array
-        creators = []
-        if self.metadata.get('creatorName'):
-            creator = {
-                "name": self.metadata['creatorName'],
-                "nameType": "Personal"
-                }
-            
-            #start with none
-            affiliations = None
+        #the conversion is shared with the streamlit app, see metadata_model.py
+        return to_datacite(from_generator_metadata(self.metadata))
 
-            if self.metadata.get('affiliation'): #get no ROR
-                affiliations = {
-                    "name": self.metadata['affiliation']}
-                if self.metadata.get('affiliationIdentifier'):
-                    affiliations.update({
-                        "name": self.metadata['affiliation'],
-                        "schemeUri": "https://ror.org",
-                        "affiliationIdentifier": self.metadata['affiliationIdentifier'],
-                        "affiliationIdentifierScheme": "ROR"})
-                creator['affiliation'] = [affiliations]
-                
-                
-            #add in identifiers if they exist
-            #start with empty
-            nameIdentifiers = None
-            
-            if self.metadata.get('identifiers'):
-                for identifier in self.metadata['identifiers']:
-                    if identifier.get('identifier_type') == 'ORCID':  
-                        nameIdentifiers = {
-                            "schemeUri": "https://orcid.org",
-                            "nameIdentifier": self.metadata['identifiers'],
-                            "nameIdentifierScheme": "ORCID"}
-                        break
-        
-            if nameIdentifiers:
-                creator['nameIdentifiers'] = [nameIdentifiers]
-            
-            #create the creators segment (to be added to the final json format at the end)
-            creators.append(creator)
-
-        #build contributors array
-        contributors = []
-        if self.metadata.get('contributors'):
-            #cycle through as many contributors as they are
-            for contrib in self.metadata['contributors']:
-                contributor = {
-                    "name": contrib['contributorName'],
-                    "nameType" :"Personal"}
-                
-                if contrib.get('contributor_affiliation'):
-                    affiliation = {"name": contrib['contributor_affiliation']}
-                    if contrib.get('contributor_affiliationIdentifier'):
-                        affiliation.update({
-                            "schemeUri": "https://ror.org",
-                            "affiliationIdentifer": contrib['contributor_affiliationIdentifier'],
-                            "affiliationScheme": "ROR"})
-                    contributor['affiliation'] = [affiliation]
-                
-                #if orcid is there
-                if contrib.get('contributor_nameIdentifier'):
-                    contributor['nameIdentifier'] = [{
-                        "schemeUri": "https://orcid.org",
-                        "nameIdentifier":contrib['contributor_nameIdentifier'],
-                        "nameIdentifierScheme": "ORCID"}]
-                
-                
-                #add to contributors    
-                contributors.append(contributor)
-                
-        #build location array
-        geo_locations = []
         
-        if self.metadata.get('geoLocationPlace') or (self.metadata.get('pointLatitude') and self.metadata.get('pointLongitude')):
-            geo_location = {}
-            
-            if self.metadata.get('geoLocationPlace'):
-                geo_location['geoLocationPlace'] = self.metadata['geoLocationPlace']
-            
-            if self.metadata.get('pointLatitude') and self.metadata.get('pointLongitude'):
-                geo_location['geoLocationsPoint'] = {
-                    "pointLatitude": float(self.metadata['pointLatitude']),
-                    "pointLongitude": float(self.metadata['pointLongitude'])}
-            
-            geo_locations.append(geo_location)
-        
-        #build date array
-        dates = []
-        
-        if self.metadata.get('startDate') or self.metadata.get('endDate'):
-            date_range = ""
-            
-            if self.metadata.get('startDate') and self.metadata.get('endDate') and self.metadata.get('startTime') and self.metadata.get('endTime'):
-                date_range = f"{self.metadata['startDate']}T{self.metadata['startTime']}/{self.metadata['endDate']}T{self.metadata['endTime']}"
-            elif self.metadata.get('startDate') and self.metadata.get('endDate'):
-                date_range = f"{self.metadata['startDate']}/{self.metadata['endDate']}"
-            elif self.metadata.get('startDate'):
-                date_range = self.metadata['startDate']
-            elif self.metadata.get('endDate'):
-                date_range = self.metadata['endDate']
-            
-            if date_range:
-                dates.append({
-                    "date": date_range,
-                    "dateType": "Collected"})   
+    
+####################
+    #### TESTING ###
+    def load_existing(self, path):
+        #start from an existing DataCite JSON/XML file
+        #orcid and ror ids in the file are kept as they are, no lookups
+        record = load_record(path)
+        self.metadata = to_generator_metadata(record)
+        print(f"Loaded existing metadata: {record.title or path}")
         
-        #build subjects (keywords)
-        subjects = []
-        if self.metadata.get('keywords_list'):
-            for keyword in self.metadata['keywords_list']:
-                subjects.append({"subject":keyword})
+    def load_data_files(self, paths):
+        #time period, location and variable names from the data files (CSV/NetCDF),
+        #run() then shows them and asks if they need changing
+        profile, errors = profile_paths(paths)
+        for error in errors:
+            print(f"Could not read {error}")
+        if profile is None:
+            raise ValueError("no CSV or NetCDF data files found")
         
+        #with gaps in the data: the first period here, the others in collection_periods
+        start, end = profile.periods[0] if len(profile.periods) > 1 else (profile.start, profile.end)
+        if start:
+            self.metadata['startDate'] = start.strftime('%Y-%m-%d')
+            self.metadata['startTime'] = start.strftime('%H:%M:%S')
+        if end:
+            self.metadata['endDate'] = end.strftime('%Y-%m-%d')
+            self.metadata['endTime'] = end.strftime('%H:%M:%S')
+        if len(profile.periods) > 1:
+            self.metadata['collection_periods'] = profile.period_dates()[1:]
+        location = profile.location()
+        if location:
+            lake_name, latitude, longitude = location
+            self.metadata['geoLocationPlace'] = lake_name or os.path.splitext(profile.path.split(', ')[0])[0]
+            self.metadata['pointLatitude'] = str(latitude)
+            self.metadata['pointLongitude'] = str(longitude)
+        keywords = list(self.metadata.get('keywords_list') or [])
+        present = {k.casefold() for k in keywords}
+        self.metadata['keywords_list'] = keywords + [v for v in profile.variables if v.casefold() not in present]
+        print(f"Read {profile.rows} rows from {profile.path}")
+        for note in profile.notes:
+            print(f"Not filled in: {note}")
         
-        datacite_json = {
-            "data": {
-                "type": "dois",
-                "attributes": {
-                    "titles": [{"title" : self.metadata.get('title', '')}],
-                    "creators": creators,
-                    "publisher": "Datalakes",
-                    "publicationYear": int(self.metadata.get('publicationYear')),
-                    "resourceType": self.metadata.get('resourceType')
-                    },
-                    "descriptions": [{"description": self.metadata.get('description', ''), "descriptionType": "Abstract"}]
-                }
-            }
-       
-        #add in the other optional fields
-        if contributors:
-            datacite_json["data"]["attributes"]["contributors"] = contributors
-        if geo_locations:
-            datacite_json["data"]["attributes"]["geoLocations"] = geo_locations
-        if dates:
-            datacite_json["data"]["attributes"]["dates"] = dates
-        if subjects:
-            datacite_json["data"]["attributes"]["subjects"] = subjects
-        if self.metadata.get('doi'):
-            datacite_json["data"]["attributes"]["doi"] = self.metadata['doi']
-        if self.metadata.get('license'):
-            datacite_json["data"]["attributes"]["rightsList"] = [{"rights": self.metadata['license']}]
-        if self.metadata.get('version'):
-            datacite_json["data"]["attributes"]["version"] = self.metadata['version']
+    def load_manifest(self, folder):
+        #DataCite sizes/formats and the checksums of every file in the dataset folder
+        def progress(done, total):
+            print(f"\rChecksums: {done}/{total} files", end = "", flush = True)
+        self.manifest = build_manifest(folder, progress = progress)
+        print()
+        self.metadata['sizes'] = datacite_sizes(self.manifest)
+        self.metadata['formats'] = datacite_formats(self.manifest)
+        print(f"Sizes: {', '.join(self.metadata['sizes'])}")
+        print(f"Formats: {', '.join(self.metadata['formats'])}")
         
-        return datacite_json
-
         
+    def save_draft(self):
+        #only the sections that changed since the last save are written
+        sections = {name: keys for name, keys, _ in self.SECTIONS}
+        self.draft_hashes = save_draft(self.draft_id, group_sections(self.metadata, sections, rest = "OTHER"),
+                                       self.draft_hashes, front_end = 'terminal', title = self.metadata.get('title', ''))
+    
+    def resume_draft(self, draft_id):
+        #go on with a draft from before, run() then asks per section if it needs changing
+        sections, self.draft_hashes = load_draft(draft_id)
+        for section in sections.values():
+            self.metadata.update(section)
+        self.draft_id = draft_id
+        print(f"Resumed: {self.metadata.get('title') or 'draft without a title'}")
     
-####################
-    #### TESTING ###
     def run(self):
         self.print_welcome()
-        self.collect_initial_metadata()
-        self.collect_contributors()
-        self.collect_location()
-        self.collect_attributes()
-        self.collect_keywords()
-        self.collect_temporal_coverage()
+        
+        for section_name, keys, method in self.SECTIONS:
+            #loaded from an existing file or a draft, only redo the section if they want to
+            if any(self.metadata.get(key) for key in keys):
+                self.display_section_summary(section_name, {key: self.metadata.get(key, '') for key in keys})
+                if not self.get_yes_no(f"\nChange the {section_name.lower()}?"):
+                    continue
+            getattr(self, method)()
+            self.save_draft()
         print(f"\nFinal metadata so far: {self.metadata}")
 
 
@@ -1154,6 +1222,53 @@ class DatalakeMetadataGen:
 if __name__ == "__main__":
     print('Starting metadata generator test...')
     generator = DatalakeMetadataGen()
+    
+    #unfinished metadata from before (interrupted)?
+    drafts = list_drafts('terminal', limit = 5)
+    if drafts:
+        print("\nUnfinished metadata:")
+        for i, draft in enumerate(drafts, 1):
+            print(f"{i}. {draft['title'] or 'No title yet'} ({draft['updated_at'].replace('T', ' ')})")
+        choice = generator.get_user_input("Number of the draft to go on with (Enter for new metadata)", required = False)
+        if choice.isdigit() and 1 <= int(choice) <= len(drafts):
+            generator.resume_draft(drafts[int(choice) - 1]['id'])
+    
+    #updating an existing dataset?
+    if generator.get_yes_no("\nStart from an existing metadata file (DataCite JSON or XML)?"):
+        while True:
+            existing_file = generator.get_user_input("Path to the metadata file")
+            try:
+                generator.load_existing(existing_file)
+                break
+            except (OSError, ValueError) as e:
+                print(f"Could not load the file: {e}")
+                if not generator.get_yes_no("Try another file?"):
+                    break
+    
+    #dates, location and variables straight from the data
+    if generator.get_yes_no("\nFill in the time period, location and keywords from the data files (CSV or NetCDF)?"):
+        while True:
+            data_path = generator.get_user_input("Data file(s) or folder (wildcards like data/*.csv work)")
+            try:
+                generator.load_data_files([data_path])
+                break
+            except ValueError as e:
+                print(f"Could not read the data: {e}")
+                if not generator.get_yes_no("Try another path?"):
+                    break
+    
+    #sizes, formats and checksums of the data
+    if generator.get_yes_no("\nAdd the file sizes, formats and checksums of the dataset folder?"):
+        while True:
+            data_folder = generator.get_user_input("Dataset folder")
+            try:
+                generator.load_manifest(data_folder)
+                break
+            except (OSError, ValueError) as e:
+                print(f"Could not read the folder: {e}")
+                if not generator.get_yes_no("Try another folder?"):
+                    break
+    
     generator.run()
 
     #generate the json                   
@@ -1161,7 +1276,21 @@ if __name__ == "__main__":
     print("\nPlease wait......")
 
     datacite_json = generator.to_datacite_json()
-    print(json.dumps(generator.to_datacite_json(), indent=2))
+    print(json_dumps(datacite_json))
+    
+    #check it against the DataCite schema
+    schema_errors = validate_datacite(datacite_json)
+    if schema_errors:
+        print("\nWarning: the metadata does not fully match the DataCite schema:")
+        for error in schema_errors:
+            print(f"    {error}")
+    
+    #described before? (only checked when there is a metadata catalog)
+    duplicates = check_duplicates(from_generator_metadata(generator.metadata))
+    if duplicates:
+        print("\nWarning: this looks like a dataset that already has metadata:")
+        for score, row in duplicates:
+            print(f"    {score:.0%} similar: {row['title']} ({row['path']})")
     
     #save the file
     if generator.get_yes_no("\nWould you like to save this to a file? (y/n): "):
@@ -1191,9 +1320,42 @@ if __name__ == "__main__":
                 print(f"Failed to create directory: {e}")
                 
             
-        with open(file_loc, "w") as f:
-            json.dump(datacite_json, f, indent = 2)
+        write_json(file_loc, datacite_json)
         print(f"Metadata saved to {filename}.json")
+        #finished, the draft isn't needed any more
+        delete_draft(generator.draft_id)
+        #keep the catalog up to date (only if there is one)
+        if add_to_catalog(file_loc):
+            print("Added to the metadata catalog")
+            #the keyword suggestions learn from it straight away
+            update_model()
+        
+        #checksum files next to the metadata, to check the data against later
+        if generator.manifest:
+            manifest_folder = os.path.join(output_directory, f"{filename}_checksums")
+            os.makedirs(manifest_folder, exist_ok = True)
+            for path in write_manifests(generator.manifest, manifest_folder):
+                print(f"Checksums saved to {path}")
+        
+        #other formats (DataCite XML, schema.org JSON-LD, ISO 19115), all from the same record
+        if generator.get_yes_no("\nAlso save the metadata in other formats?"):
+            bundle = ExportBundle.from_generator_metadata(generator.metadata)
+            other_formats = [name for name in EXPORT_FORMATS if name != "datacite-json"]
+            for i, name in enumerate(other_formats, 1):
+                print(f"{i}. {EXPORT_FORMATS[name].label}")
+            choices = generator.get_user_input("Formats to save (comma seperated numbers)", required = False)
+            
+            for choice in choices.split(','):
+                choice = choice.strip()
+                if not choice.isdigit() or not 1 <= int(choice) <= len(other_formats):
+                    if choice:
+                        print(f"Skipping unknown choice '{choice}'")
+                    continue
+                name = other_formats[int(choice) - 1]
+                export_file = bundle.filename(name, filename)
+                with open(os.path.join(output_directory, export_file), "w", encoding="utf-8") as f:
+                    f.write(bundle.render(name))
+                print(f"Metadata saved to {export_file}")
         
             
 
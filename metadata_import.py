@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:41:19 2026
+
+Read existing DataCite records (JSON or XML) back into the metadata model,
+so a dataset can be updated without typing everything in again.
+ORCID and ROR identifiers already in the record are trusted as they are,
+nothing is looked up again (no network calls).
+
+The XML is read with iterparse, each creator/contributor/location is handled
+and thrown away as soon as its closing tag is reached.
+"""
+
+import io
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from metadata_model import (Affiliation, Contributor, Creator, DatasetMetadata, DateRange,
+                            GeoLocation, Subject, DEFAULT_LANG, ENVELOPE_INFORMATION, PUBLISHER, overall_box)
+
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+#written by iter_descriptions, read back into the creator email
+CONTACT_PATTERN = re.compile(r'^Creator contact: (?P<name>.*) - (?P<email>\S+@\S+)$')
+
+
+##################################################
+"""HELPERS"""
+##################################################
+
+def _clean_orcid(value: str) -> str:
+    #identifiers are sometimes stored as the full url
+    return re.sub(r'^https?://(www\.)?orcid\.org/', '', (value or '').strip())
+
+
+def _clean_ror(value: str) -> str:
+    return re.sub(r'^https?://ror\.org/', '', (value or '').strip())
+
+
+def _parse_date_range(value: str, date_type: str, information: str = '') -> DateRange:
+    value = (value or '').strip()
+    if '/' in value:
+        start, end = value.split('/', 1)
+        return DateRange(start=start.strip(), end=end.strip(), date_type=date_type, information=information)
+    return DateRange(start=value, date_type=date_type, information=information)
+
+
+def _drop_envelope(record: DatasetMetadata):
+    #the overall collection period is added when writing (metadata_model.iter_dates),
+    #it isn't read back as a period of its own
+    collected = [d for d in record.dates if d.date_type == "Collected"]
+    if len(collected) > 2:
+        record.dates = [d for d in record.dates
+                        if not (d.date_type == "Collected" and d.information == ENVELOPE_INFORMATION)]
+
+
+def _year(value):
+    try:
+        return int(str(value).strip()[:4])
+    except (TypeError, ValueError):
+        return DatasetMetadata().publication_year
+
+
+def _resource_type(general, text) -> str:
+    #resourceTypeGeneral Other keeps the free text that was exported with it (e.g. Lake survey)
+    text = (text or '').strip()
+    if general and (general != "Other" or not text):
+        return general
+    return text or 'Dataset'
+
+
+def _apply_description(record: DatasetMetadata, text: str, description_type: str):
+    #the creator email is stored as an extra description, put it back on the creator
+    match = CONTACT_PATTERN.match(text or '')
+    if description_type == "Other" and match:
+        for creator in record.creators:
+            if creator.name == match.group('name') and not creator.email:
+                creator.email = match.group('email')
+                return
+        if record.creators and not record.creators[0].email:
+            record.creators[0].email = match.group('email')
+        return
+    if description_type == "Abstract" and not record.description:
+        record.description = text or ''
+
+
+##################################################
+"""DATACITE JSON"""
+##################################################
+
+def _person_from_json(entry: dict, cls):
+    orcid_id = ""
+    #older files used nameIdentifier instead of nameIdentifiers
+    identifiers = entry.get('nameIdentifiers') or entry.get('nameIdentifier') or []
+    if isinstance(identifiers, dict):
+        identifiers = [identifiers]
+    for identifier in identifiers:
+        if isinstance(identifier, dict) and identifier.get('nameIdentifierScheme', 'ORCID').upper() == 'ORCID':
+            value = identifier.get('nameIdentifier')
+            if isinstance(value, str):
+                orcid_id = _clean_orcid(value)
+                break
+
+    affiliation = None
+    affiliations = entry.get('affiliation') or []
+    if isinstance(affiliations, (str, dict)):
+        affiliations = [affiliations]
+    if affiliations:
+        first = affiliations[0]
+        if isinstance(first, str):
+            affiliation = Affiliation(name=first)
+        else:
+            #affiliationIdentifer was a typo in older files from the terminal version
+            ror_id = first.get('affiliationIdentifier') or first.get('affiliationIdentifer') or ''
+            affiliation = Affiliation(name=first.get('name', ''), ror_id=_clean_ror(ror_id))
+
+    name = entry.get('name', '')
+    if not name and (entry.get('givenName') or entry.get('familyName')):
+        name = f"{entry.get('givenName', '')} {entry.get('familyName', '')}".strip()
+
+    person = cls(name=name, orcid_id=orcid_id, affiliation=affiliation,
+                 name_type=entry.get('nameType') or 'Personal')
+    if cls is Contributor:
+        person.contributor_type = entry.get('contributorType') or 'Other'
+    return person
+
+
+def _box(values: dict):
+    #geoLocationBox (json keys or xml tags) -> (west, east, south, north), None if incomplete
+    try:
+        return tuple(float(values[key]) for key in ('westBoundLongitude', 'eastBoundLongitude',
+                                                    'southBoundLatitude', 'northBoundLatitude'))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _polygon(points) -> list:
+    #(latitude, longitude) pairs as read -> floats, points that can't be read are left out
+    polygon = []
+    for latitude, longitude in points:
+        try:
+            polygon.append((float(latitude), float(longitude)))
+        except (TypeError, ValueError):
+            continue
+    return polygon
+
+
+def _drop_overall_box(record: DatasetMetadata):
+    #the box around all locations is added when writing (metadata_model.iter_geo_locations),
+    #a box-only location that is exactly that box isn't read back as a location of its own
+    boxes = [i for i, g in enumerate(record.geo_locations)
+             if g.box and not (g.place or g.has_point() or g.polygon)]
+    if len(boxes) != 1:
+        return
+    location = record.geo_locations.pop(boxes[0])
+    if overall_box(record) != location.box:
+        record.geo_locations.insert(boxes[0], location)
+
+
+def from_datacite_json(document: dict) -> DatasetMetadata:
+    #accepts the full {"data": {"attributes": ...}} document or just the attributes
+    data = document.get('data', document)
+    attributes = data.get('attributes', data)
+
+    titles = attributes.get('titles') or [{}]
+    types = attributes.get('types') or {}
+    publisher = attributes.get('publisher') or PUBLISHER
+    if isinstance(publisher, dict):
+        publisher = publisher.get('name', PUBLISHER)
+
+    record = DatasetMetadata(
+        title=titles[0].get('title', ''),
+        publication_year=_year(attributes.get('publicationYear')),
+        resource_type=_resource_type(types.get('resourceTypeGeneral'), types.get('resourceType') or attributes.get('resourceType')),
+        publisher=publisher,
+        doi=attributes.get('doi') or '',
+        version=attributes.get('version') or '',
+        language=attributes.get('language') or titles[0].get('xml:lang') or DEFAULT_LANG)
+
+    record.creators = [_person_from_json(c, Creator) for c in attributes.get('creators') or []]
+    record.contributors = [_person_from_json(c, Contributor) for c in attributes.get('contributors') or []]
+
+    #older files from the terminal version had the descriptions outside attributes
+    descriptions = attributes.get('descriptions') or data.get('descriptions') or []
+    for description in descriptions:
+        _apply_description(record, description.get('description', ''), description.get('descriptionType', ''))
+
+    for location in attributes.get('geoLocations') or []:
+        #geoLocationsPoint was a typo in older files from the terminal version
+        point = location.get('geoLocationPoint') or location.get('geoLocationsPoint') or {}
+        latitude = point.get('pointLatitude')
+        longitude = point.get('pointLongitude')
+        box = location.get('geoLocationBox')
+        polygon = [p.get('polygonPoint') or {} for p in location.get('geoLocationPolygon') or []]
+        record.geo_locations.append(GeoLocation(
+            place=location.get('geoLocationPlace', ''),
+            latitude=None if latitude is None else float(latitude),
+            longitude=None if longitude is None else float(longitude),
+            box=_box(box) if box else None,
+            polygon=_polygon((p.get('pointLatitude'), p.get('pointLongitude')) for p in polygon)))
+    _drop_overall_box(record)
+
+    for entry in attributes.get('dates') or []:
+        record.dates.append(_parse_date_range(entry.get('date', ''), entry.get('dateType') or 'Collected',
+                                              entry.get('dateInformation', '')))
+    _drop_envelope(record)
+
+    for subject in attributes.get('subjects') or []:
+        record.subjects.append(Subject(subject=subject.get('subject', ''),
+                                       scheme=subject.get('subjectScheme', ''),
+                                       scheme_uri=subject.get('schemeUri', ''),
+                                       lang=subject.get('xml:lang') or subject.get('lang') or DEFAULT_LANG))
+
+    record.sizes = [str(size) for size in attributes.get('sizes') or []]
+    record.formats = [str(file_format) for file_format in attributes.get('formats') or []]
+
+    rights = attributes.get('rightsList') or []
+    if rights:
+        record.license = rights[0].get('rights', '')
+
+    return record
+
+
+##################################################
+"""DATACITE XML"""
+##################################################
+
+def _local(tag: str) -> str:
+    #drop the namespace, {http://datacite.org/schema/kernel-4}creator -> creator
+    return tag.rsplit('}', 1)[-1]
+
+
+def _children(elem):
+    return [(_local(child.tag), child) for child in elem]
+
+
+def _person_from_xml(elem, cls):
+    tag = _local(elem.tag)
+    name = ""
+    given = family = ""
+    orcid_id = ""
+    affiliation = None
+    name_type = "Personal"
+    for child_tag, child in _children(elem):
+        if child_tag == f"{tag}Name":
+            name = (child.text or '').strip()
+            name_type = child.get('nameType') or 'Personal'
+        elif child_tag == "givenName":
+            given = (child.text or '').strip()
+        elif child_tag == "familyName":
+            family = (child.text or '').strip()
+        elif child_tag == "nameIdentifier" and not orcid_id:
+            if (child.get('nameIdentifierScheme') or 'ORCID').upper() == 'ORCID':
+                orcid_id = _clean_orcid(child.text)
+        elif child_tag == "affiliation" and affiliation is None:
+            affiliation = Affiliation(name=(child.text or '').strip(),
+                                      ror_id=_clean_ror(child.get('affiliationIdentifier', '')))
+    if not name:
+        name = f"{given} {family}".strip()
+    person = cls(name=name, orcid_id=orcid_id, affiliation=affiliation, name_type=name_type)
+    if cls is Contributor:
+        person.contributor_type = elem.get('contributorType') or 'Other'
+    return person
+
+
+def _geo_location_from_xml(elem) -> GeoLocation:
+    location = GeoLocation()
+    for child_tag, child in _children(elem):
+        if child_tag == "geoLocationPlace":
+            location.place = (child.text or '').strip()
+        elif child_tag == "geoLocationPoint":
+            values = {t: (c.text or '').strip() for t, c in _children(child)}
+            try:
+                location.latitude = float(values['pointLatitude'])
+                location.longitude = float(values['pointLongitude'])
+            except (KeyError, ValueError):
+                location.latitude = location.longitude = None
+        elif child_tag == "geoLocationBox":
+            location.box = _box({t: (c.text or '').strip() for t, c in _children(child)})
+        elif child_tag == "geoLocationPolygon":
+            points = ({t: (c.text or '').strip() for t, c in _children(point)}
+                      for point_tag, point in _children(child) if point_tag == "polygonPoint")
+            location.polygon = _polygon((p.get('pointLatitude'), p.get('pointLongitude')) for p in points)
+    return location
+
+
+#where the elements of the record are, other places (e.g. the creators of a relatedItem) are skipped
+#the items of the lists are one level deeper, in their container
+TOP_LEVEL = {"identifier", "publisher", "publicationYear", "resourceType", "language", "version"}
+CONTAINERS = {"creator": "creators", "contributor": "contributors", "title": "titles", "subject": "subjects",
+              "date": "dates", "size": "sizes", "format": "formats", "rights": "rightsList",
+              "description": "descriptions", "geoLocation": "geoLocations"}
+
+
+def iter_datacite_xml(source):
+    #yields one DatasetMetadata per <resource>, works for single records and
+    #for the <resources> bulk files from datacite_xml.write_bulk_xml
+    record = None
+    #the open elements, and their tags below <resource>
+    stack, path = [], []
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        tag = _local(elem.tag)
+
+        if event == "start":
+            if tag == "resource":
+                record = DatasetMetadata()
+                path = []
+            elif record is not None:
+                path.append(tag)
+            stack.append(elem)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if record is None:
+            continue
+
+        if tag == "resource":
+            _drop_overall_box(record)
+            _drop_envelope(record)
+            yield record
+            record = None
+            #a bulk file keeps growing otherwise
+            if parent is not None:
+                parent.remove(elem)
+            continue
+
+        in_record = (len(path) == 1 and tag in TOP_LEVEL) or (len(path) == 2 and path[0] == CONTAINERS.get(tag))
+        path.pop()
+        if not in_record:
+            #a block of the record is done (and everything in it read), free it
+            if not path:
+                parent.remove(elem)
+            continue
+
+        if tag == "identifier":
+            if elem.get('identifierType', 'DOI') == 'DOI':
+                record.doi = (elem.text or '').strip()
+        elif tag == "creator":
+            record.creators.append(_person_from_xml(elem, Creator))
+        elif tag == "contributor":
+            record.contributors.append(_person_from_xml(elem, Contributor))
+        elif tag == "title":
+            if not record.title and not elem.get('titleType'):
+                record.title = (elem.text or '').strip()
+        elif tag == "publisher":
+            record.publisher = (elem.text or '').strip() or PUBLISHER
+        elif tag == "publicationYear":
+            record.publication_year = _year(elem.text)
+        elif tag == "resourceType":
+            record.resource_type = _resource_type(elem.get('resourceTypeGeneral'), elem.text)
+        elif tag == "subject":
+            record.subjects.append(Subject(subject=(elem.text or '').strip(),
+                                           scheme=elem.get('subjectScheme', ''),
+                                           scheme_uri=elem.get('schemeURI', ''),
+                                           lang=elem.get(XML_LANG) or DEFAULT_LANG))
+        elif tag == "date":
+            record.dates.append(_parse_date_range(elem.text, elem.get('dateType') or 'Collected',
+                                                  elem.get('dateInformation', '')))
+        elif tag == "language":
+            record.language = (elem.text or '').strip() or DEFAULT_LANG
+        elif tag == "size":
+            record.sizes.append((elem.text or '').strip())
+        elif tag == "format":
+            record.formats.append((elem.text or '').strip())
+        elif tag == "version":
+            record.version = (elem.text or '').strip()
+        elif tag == "rights":
+            if not record.license:
+                record.license = (elem.text or '').strip()
+        elif tag == "description":
+            _apply_description(record, (elem.text or '').strip(), elem.get('descriptionType', ''))
+        elif tag == "geoLocation":
+            record.geo_locations.append(_geo_location_from_xml(elem))
+
+        #done with this element, free it
+        elem.clear()
+        if not path:
+            parent.remove(elem)
+
+
+def from_datacite_xml(source) -> DatasetMetadata:
+    for record in iter_datacite_xml(source):
+        return record
+    raise ValueError("No DataCite <resource> element found in the XML")
+
+
+##################################################
+"""FILES"""
+##################################################
+
+def load_record(source, filename: str = "") -> DatasetMetadata:
+    #source is a path, bytes (e.g. an uploaded file) or an open binary file
+    if isinstance(source, (str, os.PathLike)):
+        filename = filename or str(source)
+        #big xml files are streamed straight from disk
+        if filename.lower().endswith('.xml'):
+            try:
+                return from_datacite_xml(source)
+            except ET.ParseError as e:
+                raise ValueError(f"Could not read '{filename}' as DataCite XML: {e}") from e
+        with open(source, 'rb') as f:
+            content = f.read()
+    elif isinstance(source, bytes):
+        content = source
+    else:
+        content = source.read()
+
+    is_xml = filename.lower().endswith('.xml') or content.lstrip().startswith(b'<')
+    try:
+        if is_xml:
+            return from_datacite_xml(io.BytesIO(content))
+        return from_datacite_json(json.loads(content))
+    except (ET.ParseError, ValueError, AttributeError, TypeError) as e:
+        raise ValueError(f"Could not read '{filename or 'file'}' as DataCite {'XML' if is_xml else 'JSON'}: {e}") from e
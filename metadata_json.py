@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:02:15 2026
+
+JSON writing for the metadata files.
+Uses orjson when it is installed (a lot faster for batch jobs writing thousands
+of records) and falls back to the standard json library when it is not.
+
+Canonical mode sorts the keys and rounds the coordinates to a fixed number of
+decimals (other numbers are written as they are), so the same metadata always gives the same bytes and the
+files can be hashed and deduplicated.
+"""
+
+import hashlib
+import json
+import math
+
+#optional, pip install orjson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+#6 decimals is ~0.1 m, more than enough for sampling locations
+COORD_DECIMALS = 6
+#the keys with coordinates (DataCite geoLocations and the terminal script), only these are rounded
+COORD_FIELDS = frozenset({'pointLatitude', 'pointLongitude', 'westBoundLongitude', 'eastBoundLongitude',
+                          'southBoundLatitude', 'northBoundLatitude', 'latitude', 'longitude'})
+
+
+def _canonical_value(value, coordinate: bool = False):
+    #walk through dicts/lists, round the floats under a coordinate key
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Cannot write non-finite number {value} to metadata JSON")
+        if coordinate:
+            value = round(value, COORD_DECIMALS)
+        #-0.0 and 0.0 should not give different files
+        return value + 0.0
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v, k in COORD_FIELDS) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(v, coordinate) for v in value]
+    return value
+
+
+def dumps_bytes(obj, canonical: bool = False) -> bytes:
+    #serialize to utf-8 bytes with 2 space indent
+    if canonical:
+        obj = _canonical_value(obj)
+
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2
+        if canonical:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+
+    #same layout as orjson so both backends give the same files
+    #(only numbers written in exponent form, e.g. 1e-05, differ between the two)
+    return json.dumps(obj, indent=2, sort_keys=canonical, ensure_ascii=False).encode('utf-8')
+
+
+def dumps(obj, canonical: bool = False) -> str:
+    return dumps_bytes(obj, canonical=canonical).decode('utf-8')
+
+
+def content_hash(obj) -> str:
+    #sha256 of the canonical form, identical metadata = identical hash
+    return hashlib.sha256(dumps_bytes(obj, canonical=True)).hexdigest()
+
+
+def write_json(path, obj, canonical: bool = True) -> str:
+    #write the metadata file and return its content hash
+    data = dumps_bytes(obj, canonical=canonical)
+    with open(path, "wb") as f:
+        f.write(data)
+    return hashlib.sha256(data).hexdigest()
@@ -0,0 +1,676 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+Shared metadata model for the terminal generator and the streamlit app.
+Both front ends collect their answers into the same (slotted) dataclasses and
+a single serializer turns that into DataCite JSON, so the conversion only
+lives in one place.
+More info on DataCite metadata schema : https://datacite-metadata-schema.readthedocs.io/en/4.6/properties/
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from geometry import bounding_box
+from keyword_vocabulary import get_vocabulary
+from metadata_time import envelope, merge_date_ranges
+
+
+PUBLISHER = "Datalakes"
+DEFAULT_LANG = "en-us"
+ORCID_SCHEME_URI = "https://orcid.org"
+ROR_SCHEME_URI = "https://ror.org"
+
+#dateInformation of the overall period written when there are several collection periods
+ENVELOPE_INFORMATION = "Overall collection period"
+
+#typical orcid format 0000-0000-0000-0000
+ORCID_PATTERN = r'^\d{4}-\d{4}-\d{4}-\d{4}$'
+
+#the controlled list of resourceTypeGeneral (kernel 4.6), anything else is written as Other
+RESOURCE_TYPES_GENERAL = (
+    "Audiovisual", "Award", "Book", "BookChapter", "Collection", "ComputationalNotebook",
+    "ConferencePaper", "ConferenceProceeding", "DataPaper", "Dataset", "Dissertation", "Event",
+    "Image", "Instrument", "InteractiveResource", "Journal", "JournalArticle", "Model",
+    "OutputManagementPlan", "PeerReview", "PhysicalObject", "Preprint", "Project", "Report",
+    "Service", "Software", "Sound", "Standard", "StudyRegistration", "Text", "Workflow", "Other")
+
+
+##################################################
+"""THE MODEL"""
+##################################################
+
+#slots keep each record small, there can be a lot of these in a batch run
+@dataclass(slots=True)
+class Affiliation:
+    name: str
+    ror_id: str = ""
+
+
+@dataclass(slots=True)
+class Creator:
+    name: str
+    orcid_id: str = ""
+    affiliation: Affiliation | None = None
+    email: str = ""
+    name_type: str = "Personal"
+
+
+@dataclass(slots=True)
+class Contributor:
+    name: str
+    orcid_id: str = ""
+    affiliation: Affiliation | None = None
+    #required by DataCite, co-authors don't have their own type
+    contributor_type: str = "Other"
+    name_type: str = "Personal"
+
+
+@dataclass(slots=True)
+class GeoLocation:
+    place: str = ""
+    latitude: float | None = None
+    longitude: float | None = None
+    #(west, east, south, north)
+    box: tuple | None = None
+    #outline as [(latitude, longitude), ...], first point repeated at the end
+    polygon: list = field(default_factory=list)
+
+    def has_point(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+    def is_empty(self) -> bool:
+        return not (self.place or self.has_point() or self.box or self.polygon)
+
+
+@dataclass(slots=True)
+class DateRange:
+    start: str = ""
+    end: str = ""
+    date_type: str = "Collected"
+    information: str = ""
+
+    def to_string(self) -> str:
+        #DataCite wants ranges as start/end (RKMS-ISO8601)
+        if self.start and self.end:
+            return f"{self.start}/{self.end}"
+        return self.start or self.end
+
+
+@dataclass(slots=True)
+class Subject:
+    subject: str
+    scheme: str = ""
+    scheme_uri: str = ""
+    lang: str = DEFAULT_LANG
+
+
+@dataclass(slots=True)
+class DatasetMetadata:
+    title: str = ""
+    description: str = ""
+    creators: list[Creator] = field(default_factory=list)
+    contributors: list[Contributor] = field(default_factory=list)
+    publication_year: int = field(default_factory=lambda: datetime.now().year)
+    resource_type: str = "Dataset"
+    publisher: str = PUBLISHER
+    geo_locations: list[GeoLocation] = field(default_factory=list)
+    dates: list[DateRange] = field(default_factory=list)
+    subjects: list[Subject] = field(default_factory=list)
+    doi: str = ""
+    license: str = ""
+    version: str = ""
+    language: str = DEFAULT_LANG
+    #free text like "15 files", "1.2 GB" and MIME types, from file_manifest.py
+    sizes: list[str] = field(default_factory=list)
+    formats: list[str] = field(default_factory=list)
+
+
+##################################################
+"""HELPERS"""
+##################################################
+
+def _to_float(value):
+    #coordinates come in as strings from both front ends
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _affiliation(name, ror_id=""):
+    name = (name or "").strip()
+    if not name:
+        return None
+    return Affiliation(name=name, ror_id=(ror_id or "").strip())
+
+
+def merge_periods(periods) -> list:
+    #[{'start': ..., 'end': ...}] (collection_periods of the front ends) -> merged and sorted, same form
+    merged = merge_date_ranges(DateRange(start=str(p.get('start') or ''), end=str(p.get('end') or '')) for p in periods)
+    return [{'start': d.start, 'end': d.end} for d in merged]
+
+
+def keyword_subjects(keywords) -> list:
+    #keywords from the keyword lists get their usual spelling and the subjectScheme/schemeUri
+    #("chlorophyll-a" and "Chlorophyll A" are then the same keyword, kept once)
+    #other names of a term are kept as they are, see keyword_replacements
+    vocabulary = get_vocabulary()
+    subjects, seen = [], set()
+    for keyword in keywords:
+        term = vocabulary.lookup(keyword)
+        subject = (Subject(subject=keyword) if term is None
+                   else Subject(subject=term.subject, scheme=term.scheme, scheme_uri=term.scheme_uri))
+        if subject.subject.casefold() not in seen:
+            seen.add(subject.subject.casefold())
+            subjects.append(subject)
+    return subjects
+
+
+def keyword_replacements(keywords) -> list:
+    #[(keyword, term)] for the keywords that are another name of a term in the lists ("DO"),
+    #shown to the user to take the term instead, never replaced without asking
+    vocabulary = get_vocabulary()
+    found = []
+    for keyword in keywords:
+        term = vocabulary.alias_of(keyword)
+        if term is not None:
+            found.append((keyword, term))
+    return found
+
+
+def split_keywords(text: str) -> list:
+    #keywords are entered comma seperated or one per line
+    if not text:
+        return []
+    return [k.strip() for k in text.replace('\n', ',').split(',') if k.strip()]
+
+
+##################################################
+"""FROM THE FRONT ENDS INTO THE MODEL"""
+##################################################
+
+def from_generator_metadata(metadata: dict) -> DatasetMetadata:
+    #convert the DatalakeMetadataGen.metadata dict (terminal version)
+    record = DatasetMetadata(
+        title=metadata.get('title', '') or '',
+        description=metadata.get('description', '') or '',
+        publication_year=_to_int(metadata.get('publicationYear'), datetime.now().year),
+        resource_type=metadata.get('resourceType') or 'Dataset',
+        doi=metadata.get('doi', '') or '',
+        license=metadata.get('license', '') or '',
+        version=metadata.get('version', '') or '',
+        sizes=list(metadata.get('sizes') or []),
+        formats=list(metadata.get('formats') or []))
+
+    #creator, orcid and email are stored together as identifiers
+    if metadata.get('creatorName'):
+        orcid_id = ""
+        email = ""
+        for identifier in metadata.get('identifiers') or []:
+            if identifier.get('identifier_type') == 'ORCID' and not orcid_id:
+                orcid_id = identifier.get('identifier', '')
+            elif identifier.get('identifier_type') == 'email' and not email:
+                email = identifier.get('identifier', '')
+
+        record.creators.append(Creator(
+            name=metadata['creatorName'],
+            orcid_id=orcid_id,
+            affiliation=_affiliation(metadata.get('affiliation'), metadata.get('affiliationIdentifier')),
+            email=email))
+
+    for contrib in metadata.get('contributors') or []:
+        if not contrib.get('contributorName'):
+            continue
+        record.contributors.append(Contributor(
+            name=contrib['contributorName'],
+            orcid_id=contrib.get('contributor_nameIdentifier', '') or '',
+            affiliation=_affiliation(contrib.get('contributor_affiliation'),
+                                     contrib.get('contributor_affiliationIdentifier'))))
+
+    #the terminal version asks for a single point location, the others (from a loaded file) come after it
+    place = metadata.get('geoLocationPlace', '') or ''
+    latitude = _to_float(metadata.get('pointLatitude'))
+    longitude = _to_float(metadata.get('pointLongitude'))
+    if place or (latitude is not None and longitude is not None):
+        if latitude is None or longitude is None:
+            latitude = longitude = None
+        record.geo_locations.append(GeoLocation(place=place, latitude=latitude, longitude=longitude))
+    for location in metadata.get('other_locations') or []:
+        latitude = _to_float(location.get('latitude'))
+        longitude = _to_float(location.get('longitude'))
+        if latitude is None or longitude is None:
+            latitude = longitude = None
+        record.geo_locations.append(GeoLocation(
+            place=location.get('place', '') or '', latitude=latitude, longitude=longitude,
+            box=tuple(location['box']) if location.get('box') else None,
+            polygon=[tuple(point) for point in location.get('polygon') or []]))
+
+    #date + optional time
+    start = metadata.get('startDate', '') or ''
+    end = metadata.get('endDate', '') or ''
+    if start and metadata.get('startTime'):
+        start = f"{start}T{metadata['startTime']}"
+    if end and metadata.get('endTime'):
+        end = f"{end}T{metadata['endTime']}"
+    periods = [DateRange(start=start, end=end)] if start or end else []
+    #more collection periods after the first one
+    periods += [DateRange(start=p.get('start', '') or '', end=p.get('end', '') or '')
+                for p in metadata.get('collection_periods') or []]
+    record.dates.extend(merge_date_ranges(periods))
+
+    record.subjects.extend(keyword_subjects(metadata.get('keywords_list') or []))
+
+    return record
+
+
+def from_session_state(state) -> DatasetMetadata:
+    #convert the streamlit session state (app version)
+    #state only needs a .get(), so a plain dict works as well
+    record = DatasetMetadata(
+        title=state.get('dataset_title', '') or '',
+        description=state.get('dataset_description', '') or '',
+        publication_year=_to_int(state.get('publication_year'), datetime.now().year),
+        resource_type=state.get('resource_type') or 'Dataset',
+        doi=state.get('dataset_doi', '') or '',
+        license=state.get('license', '') or '',
+        version=state.get('dataset_version', '') or '',
+        sizes=list(state.get('sizes') or []),
+        formats=list(state.get('formats') or []))
+
+    author_first = (state.get('author_first_name', '') or '').strip()
+    author_last = (state.get('author_last_name', '') or '').strip()
+    if author_first and author_last:
+        author_orcid = state.get('author_orcid_data') or {}
+        orcid_id = author_orcid.get('orcid_id', '')
+        #fall back to the manually entered orcid
+        manual_orcid = (state.get('manual_author_orcid', '') or '').strip()
+        if not orcid_id and re.match(ORCID_PATTERN, manual_orcid):
+            orcid_id = manual_orcid
+        author_ror = state.get('author_ror_data') or {}
+
+        record.creators.append(Creator(
+            name=f"{author_first} {author_last}",
+            orcid_id=orcid_id,
+            affiliation=_affiliation(state.get('author_affiliation', ''), author_ror.get('ror_id', '')),
+            email=(state.get('author_email', '') or '').strip()))
+
+    for contrib in state.get('contributors') or []:
+        orcid_data = contrib.get('orcid_data') or {}
+        ror_data = contrib.get('ror_data') or {}
+        record.contributors.append(Contributor(
+            name=contrib['name'],
+            orcid_id=orcid_data.get('orcid_id', ''),
+            affiliation=_affiliation(contrib.get('affiliation', ''), ror_data.get('ror_id', ''))))
+
+    for location in state.get('locations') or []:
+        latitude = _to_float(location.get('latitude'))
+        longitude = _to_float(location.get('longitude'))
+        #skip half entered points, same as before
+        if latitude is None or longitude is None:
+            continue
+        record.geo_locations.append(GeoLocation(
+            place=location.get('lake_name', ''), latitude=latitude, longitude=longitude,
+            polygon=[tuple(p) for p in location.get('polygon') or []]))
+
+    #a list of collection periods replaces the start/end date inputs
+    #(the date inputs always have a value, so they can't be an extra period)
+    periods = state.get('collection_periods') or []
+    if periods:
+        record.dates.extend(merge_date_ranges(
+            DateRange(start=str(p.get('start') or ''), end=str(p.get('end') or '')) for p in periods))
+    else:
+        start_date = state.get('start_date')
+        end_date = state.get('end_date')
+        if start_date or end_date:
+            record.dates.append(DateRange(start=str(start_date or ''), end=str(end_date or '')))
+
+    record.subjects.extend(keyword_subjects(split_keywords(state.get('keywords', ''))))
+
+    return record
+
+
+##################################################
+"""FROM THE MODEL BACK INTO THE FRONT ENDS"""
+##################################################
+
+def split_name(name: str):
+    #(first, last) - handles both "Given Family" and "Family, Given"
+    name = (name or "").strip()
+    if ',' in name:
+        last, first = name.split(',', 1)
+        return first.strip(), last.strip()
+    parts = name.split(' ', 1)
+    return parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def _to_date(value: str):
+    #date_input needs a date object, only full YYYY-MM-DD dates can be used
+    try:
+        return date.fromisoformat((value or '')[:10])
+    except ValueError:
+        return None
+
+
+def _orcid_data(person) -> dict:
+    #same shape as the ORCID lookup results, so the app treats it as selected
+    #the identifier is trusted as is, no lookup needed
+    if not person.orcid_id:
+        return {}
+    given, family = split_name(person.name)
+    return {'orcid_id': person.orcid_id,
+            'given_names': given,
+            'family_name': family,
+            'institution': person.affiliation.name if person.affiliation else '',
+            'display_name': person.name}
+
+
+def _ror_data(affiliation) -> dict:
+    if not affiliation or not affiliation.ror_id:
+        return {}
+    return {'ror_id': affiliation.ror_id, 'name': affiliation.name, 'country': 'N/A', 'aliases': []}
+
+
+def to_session_state(record: DatasetMetadata) -> dict:
+    #the session state keys used by the app sections
+    #(resource type has to be one of the selectbox options)
+    state = {
+        'dataset_title': record.title,
+        'dataset_description': record.description,
+        'publication_year': record.publication_year,
+        'resource_type': record.resource_type if record.resource_type in ("Dataset", "Software", "Collection") else "Other",
+        'dataset_version': record.version,
+        'license': record.license,
+        'dataset_doi': record.doi,
+        'sizes': list(record.sizes),
+        'formats': list(record.formats),
+        'keywords': ", ".join(s.subject for s in record.subjects),
+        'contributors': [],
+        'locations': []}
+
+    if record.creators:
+        creator = record.creators[0]
+        state['author_first_name'], state['author_last_name'] = split_name(creator.name)
+        state['author_email'] = creator.email
+        state['author_affiliation'] = creator.affiliation.name if creator.affiliation else ''
+        state['author_orcid_data'] = _orcid_data(creator)
+        state['author_ror_data'] = _ror_data(creator.affiliation)
+
+    #the app only has one author, any extra creators become contributors
+    for person in record.creators[1:] + record.contributors:
+        contrib = {'name': person.name,
+                   'affiliation': person.affiliation.name if person.affiliation else ''}
+        if person.orcid_id:
+            contrib['orcid_data'] = _orcid_data(person)
+        if person.affiliation and person.affiliation.ror_id:
+            contrib['ror_data'] = _ror_data(person.affiliation)
+        state['contributors'].append(contrib)
+
+    for location in record.geo_locations:
+        if location.has_point():
+            state_location = {'lake_name': location.place,
+                              'latitude': str(location.latitude),
+                              'longitude': str(location.longitude)}
+            if location.polygon:
+                state_location['polygon'] = [list(p) for p in location.polygon]
+            state['locations'].append(state_location)
+
+    collected = [d for d in record.dates if d.date_type == "Collected"]
+    #always set, so loading a record with one period clears the list of the one before
+    state['collection_periods'] = []
+    if len(collected) > 1:
+        state['collection_periods'] = [{'start': d.start, 'end': d.end} for d in collected]
+        collected = [envelope(collected) or collected[0]]
+    if collected:
+        start_date = _to_date(collected[0].start)
+        end_date = _to_date(collected[0].end)
+        if start_date:
+            state['start_date'] = start_date
+        if end_date:
+            state['end_date'] = end_date
+
+    return state
+
+
+def _split_datetime(value: str):
+    #"2021-03-01T12:00:00" -> ("2021-03-01", "12:00:00")
+    if 'T' in (value or ''):
+        day, time = value.split('T', 1)
+        return day, time
+    return value or '', ''
+
+
+def to_generator_metadata(record: DatasetMetadata) -> dict:
+    #the DatalakeMetadataGen.metadata keys used by the terminal version
+    metadata = {
+        'title': record.title,
+        'description': record.description,
+        'publicationYear': record.publication_year,
+        'resourceType': record.resource_type,
+        'license': record.license,
+        'doi': record.doi,
+        'version': record.version,
+        'sizes': list(record.sizes),
+        'formats': list(record.formats),
+        'keywords_list': [s.subject for s in record.subjects]}
+
+    if record.creators:
+        creator = record.creators[0]
+        identifiers = []
+        if creator.orcid_id:
+            identifiers.append({'identifier': creator.orcid_id, 'identifier_type': 'ORCID'})
+        if creator.email:
+            identifiers.append({'identifier': creator.email, 'identifier_type': 'email'})
+        metadata.update({
+            'creatorName': creator.name,
+            'affiliation': creator.affiliation.name if creator.affiliation else '',
+            'affiliationIdentifier': creator.affiliation.ror_id if creator.affiliation else '',
+            'identifiers': identifiers})
+
+    contributors = []
+    for person in record.creators[1:] + record.contributors:
+        contributors.append({
+            'contributorName': person.name,
+            'contributor_affiliation': person.affiliation.name if person.affiliation else '',
+            'contributor_affiliationIdentifier': person.affiliation.ror_id if person.affiliation else '',
+            'contributor_nameIdentifier': person.orcid_id})
+    if contributors:
+        metadata['contributors'] = contributors
+
+    #the terminal version asks for a single point location, the other locations and the boxes/outlines
+    #are kept in other_locations (like the collection periods after the first one)
+    locations = list(record.geo_locations)
+    if locations and not locations[0].box and not locations[0].polygon:
+        location = locations.pop(0)
+        metadata.update({
+            'geoLocationPlace': location.place,
+            'pointLatitude': '' if location.latitude is None else str(location.latitude),
+            'pointLongitude': '' if location.longitude is None else str(location.longitude)})
+    if locations:
+        metadata['other_locations'] = [{'place': location.place, 'latitude': location.latitude,
+                                        'longitude': location.longitude,
+                                        'box': list(location.box) if location.box else None,
+                                        'polygon': [list(point) for point in location.polygon]}
+                                       for location in locations]
+
+    collected = [d for d in record.dates if d.date_type == "Collected"]
+    if collected:
+        metadata['startDate'], metadata['startTime'] = _split_datetime(collected[0].start)
+        metadata['endDate'], metadata['endTime'] = _split_datetime(collected[0].end)
+        if len(collected) > 1:
+            metadata['collection_periods'] = [{'start': d.start, 'end': d.end} for d in collected[1:]]
+
+    return metadata
+
+
+##################################################
+"""FROM THE MODEL INTO DATACITE"""
+##################################################
+
+def _person_to_datacite(person) -> dict:
+    entry = {"name": person.name,
+             "nameType": person.name_type}
+
+    if person.orcid_id:
+        entry["nameIdentifiers"] = [{
+            "schemeUri": ORCID_SCHEME_URI,
+            "nameIdentifier": person.orcid_id,
+            "nameIdentifierScheme": "ORCID"}]
+
+    if person.affiliation:
+        affiliation = {"name": person.affiliation.name}
+        if person.affiliation.ror_id:
+            affiliation.update({
+                "schemeUri": ROR_SCHEME_URI,
+                "affiliationIdentifier": person.affiliation.ror_id,
+                "affiliationIdentifierScheme": "ROR"})
+        entry["affiliation"] = [affiliation]
+
+    return entry
+
+
+def _geo_location_to_datacite(location: GeoLocation) -> dict:
+    geo_location = {}
+    if location.place:
+        geo_location["geoLocationPlace"] = location.place
+    if location.has_point():
+        geo_location["geoLocationPoint"] = {
+            "pointLatitude": location.latitude,
+            "pointLongitude": location.longitude}
+    if location.box:
+        west, east, south, north = location.box
+        geo_location["geoLocationBox"] = {
+            "westBoundLongitude": west,
+            "eastBoundLongitude": east,
+            "southBoundLatitude": south,
+            "northBoundLatitude": north}
+    if location.polygon:
+        geo_location["geoLocationPolygon"] = [
+            {"polygonPoint": {"pointLatitude": latitude, "pointLongitude": longitude}}
+            for latitude, longitude in location.polygon]
+    return geo_location
+
+
+def _subject_to_datacite(subject: Subject) -> dict:
+    entry = {"subject": subject.subject}
+    if subject.scheme:
+        entry["subjectScheme"] = subject.scheme
+    if subject.scheme_uri:
+        entry["schemeUri"] = subject.scheme_uri
+    if subject.lang:
+        entry["xml:lang"] = subject.lang
+    return entry
+
+
+def resource_type_general(resource_type: str) -> str:
+    #the free resource type as one of RESOURCE_TYPES_GENERAL ("data paper" -> DataPaper)
+    key = re.sub(r'[^a-z]', '', (resource_type or '').lower())
+    for general in RESOURCE_TYPES_GENERAL:
+        if general.lower() == key:
+            return general
+    return "Other"
+
+
+def iter_descriptions(record: DatasetMetadata):
+    #(description, descriptionType) pairs, shared by the json and xml writers
+    yield record.description, "Abstract"
+
+    #there is not currently (Jan 2026) a field for the creator email
+    #so it goes into an extra description until that changes
+    for creator in record.creators:
+        if creator.email:
+            yield f"Creator contact: {creator.name} - {creator.email}", "Other"
+
+
+def overall_box(record: DatasetMetadata):
+    #the box around all the points and outlines of a record (west, east, south, north),
+    #None if there is only one point or a location already has a box
+    if any(location.box for location in record.geo_locations):
+        return None
+    latitudes = [location.latitude for location in record.geo_locations if location.has_point()]
+    longitudes = [location.longitude for location in record.geo_locations if location.has_point()]
+    for location in record.geo_locations:
+        latitudes.extend(latitude for latitude, _ in location.polygon)
+        longitudes.extend(longitude for _, longitude in location.polygon)
+    box = bounding_box(latitudes, longitudes)
+    if box is None or (box[0] == box[1] and box[2] == box[3]):
+        return None
+    return box
+
+
+def iter_geo_locations(record: DatasetMetadata):
+    #the locations of the record plus the box around all of them,
+    #shared by the json and xml writers
+    yield from (location for location in record.geo_locations if not location.is_empty())
+    box = overall_box(record)
+    if box is not None:
+        yield GeoLocation(box=box)
+
+
+def iter_dates(record: DatasetMetadata):
+    #the dates of the record plus, with several collection periods, the overall period,
+    #shared by the json and xml writers
+    dates = [d for d in record.dates if d.to_string()]
+    yield from dates
+    collected = [d for d in dates if d.date_type == "Collected"]
+    if len(collected) > 1:
+        overall = envelope(collected)
+        if overall is not None:
+            overall.information = ENVELOPE_INFORMATION
+            yield overall
+
+
+def to_datacite(record: DatasetMetadata) -> dict:
+    """Convert a DatasetMetadata record to DataCite JSON format"""
+    lang = record.language
+    attributes = {
+        "titles": [{"title": record.title, "xml:lang": lang}],
+        "creators": [_person_to_datacite(c) for c in record.creators],
+        "publisher": record.publisher,
+        "publicationYear": record.publication_year,
+        "types": {"resourceTypeGeneral": resource_type_general(record.resource_type),
+                  "resourceType": record.resource_type},
+        "descriptions": [{"description": text, "descriptionType": description_type, "xml:lang": lang}
+                         for text, description_type in iter_descriptions(record)]
+        }
+
+    #add in the other optional fields
+    if record.contributors:
+        attributes["contributors"] = []
+        for contrib in record.contributors:
+            contributor = _person_to_datacite(contrib)
+            contributor["contributorType"] = contrib.contributor_type or "Other"
+            attributes["contributors"].append(contributor)
+
+    geo_locations = [_geo_location_to_datacite(g) for g in iter_geo_locations(record)]
+    if geo_locations:
+        attributes["geoLocations"] = geo_locations
+
+    dates = [{"date": d.to_string(), "dateType": d.date_type} | ({"dateInformation": d.information} if d.information else {})
+             for d in iter_dates(record)]
+    if dates:
+        attributes["dates"] = dates
+
+    if record.subjects:
+        attributes["subjects"] = [_subject_to_datacite(s) for s in record.subjects]
+    if record.doi:
+        attributes["doi"] = record.doi
+    if record.license:
+        attributes["rightsList"] = [{"rights": record.license, "xml:lang": lang}]
+    if record.version:
+        attributes["version"] = record.version
+    if record.sizes:
+        attributes["sizes"] = list(record.sizes)
+    if record.formats:
+        attributes["formats"] = list(record.formats)
+
+    return {"data": {"type": "dois", "attributes": attributes}}
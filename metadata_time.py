@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:02:37 2026
+
+Reading the dates we write (and the ones people type) into numbers that can be
+compared, so the catalog can search collection periods.
+
+Accepted: 2021, 2021-03, 2021-03-01, 2021-03-01T12:00, 2021-03-01T12:00:00,
+2021-03-01 12:00:00, with an optional Z or +01:00 (without one it is taken as UTC).
+A date without time covers the whole day (a month the whole month, ...),
+so 2021-03-01/2021-09-30 includes the 30th of September.
+
+Periods can be open: "2021-03-01/", "2021-03-01/..", "/2021-09-30".
+A DateRange with only a start (no end date given in the form) is an ongoing collection.
+
+Several collection periods (seasonal campaigns, deployments) are merged where they
+overlap or touch (sort by start, then one sweep), and periods can be found in a
+column of time stamps by splitting it where there is a long gap.
+"""
+
+import calendar
+import csv
+import io
+import re
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+
+#stand-ins for "no start"/"no end", far outside any real date (about 300 000 years)
+OPEN_START = -1e13
+OPEN_END = 1e13
+
+#periods closer than this (seconds) are one period, 2021-03-05 and 2021-03-06 touch
+ADJACENT_SECONDS = 1.0
+#time stamps further apart than this start a new period (one day)
+PERIOD_GAP_SECONDS = 86400.0
+
+DATETIME_PATTERN = re.compile(
+    r'^(?P<year>\d{4})(?:-(?P<month>\d{1,2})(?:-(?P<day>\d{1,2})'
+    r'(?:[T ](?P<hour>\d{1,2})(?::(?P<minute>\d{2})(?::(?P<second>\d{2})(?:\.(?P<fraction>\d+))?)?)?'
+    r'\s*(?P<tz>Z|[+-]\d{2}:?\d{2})?)?)?)?$')
+
+
+def parse_instant(value: str, upper: bool = False) -> float:
+    #seconds since 1970 (UTC), upper=True gives the last moment of the day/month/year
+    #that the value stands for instead of the first one
+    match = DATETIME_PATTERN.match((value or '').strip())
+    if not match:
+        raise ValueError(f"Not a date: '{value}'")
+    parts = match.groupdict()
+
+    year = int(parts['year'])
+    month = int(parts['month'] or 1)
+    day = int(parts['day'] or 1)
+    hour = int(parts['hour'] or 0)
+    minute = int(parts['minute'] or 0)
+    second = int(parts['second'] or 0)
+    microsecond = int((parts['fraction'] or '0')[:6].ljust(6, '0'))
+
+    tz = timezone.utc
+    if parts['tz'] and parts['tz'] != 'Z':
+        sign = -1 if parts['tz'][0] == '-' else 1
+        digits = parts['tz'][1:].replace(':', '')
+        tz = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+
+    start = datetime(year, month, day, hour, minute, second, microsecond, tzinfo=tz)
+    if not upper or parts['fraction']:
+        return start.timestamp()
+
+    #how long the value lasts, from the most precise part given
+    if parts['second']:
+        length = timedelta(seconds=1)
+    elif parts['minute']:
+        length = timedelta(minutes=1)
+    elif parts['hour']:
+        length = timedelta(hours=1)
+    elif parts['day']:
+        length = timedelta(days=1)
+    elif parts['month']:
+        length = timedelta(days=calendar.monthrange(year, month)[1])
+    else:
+        length = timedelta(days=366 if calendar.isleap(year) else 365)
+    return (start + length).timestamp() - 1e-6
+
+
+def parse_period(value: str) -> tuple:
+    #"start/end" (either side can be empty or "..") or a single date -> (start, end) in seconds
+    value = (value or '').strip()
+    if '/' in value:
+        start, end = (part.strip() for part in value.split('/', 1))
+    else:
+        start = end = value
+    if not start and not end:
+        raise ValueError("Empty period")
+    start_ts = OPEN_START if start in ('', '..') else parse_instant(start)
+    end_ts = OPEN_END if end in ('', '..') else parse_instant(end, upper=True)
+    if start_ts > end_ts:
+        raise ValueError(f"Period '{value}' ends before it starts")
+    return start_ts, end_ts
+
+
+def date_range_bounds(date_range) -> tuple:
+    #(start, end) in seconds for a metadata_model.DateRange, a missing side is open
+    start_ts = parse_instant(date_range.start) if date_range.start else OPEN_START
+    end_ts = parse_instant(date_range.end, upper=True) if date_range.end else OPEN_END
+    if start_ts == OPEN_START and end_ts == OPEN_END:
+        raise ValueError("Empty period")
+    if start_ts > end_ts:
+        raise ValueError(f"Period '{date_range.to_string()}' ends before it starts")
+    return start_ts, end_ts
+
+
+##################################################
+"""SEVERAL PERIODS"""
+##################################################
+
+def merge_intervals(starts, ends, gap=ADJACENT_SECONDS):
+    #overlapping/touching intervals -> (starts, ends, group of every input interval), sorted
+    #sort by start, then a new group begins where the start is after every end so far (+ gap)
+    starts = np.asarray(starts, dtype=float)
+    ends = np.asarray(ends, dtype=float)
+    if not len(starts):
+        return starts, ends, np.empty(0, dtype=np.int64)
+    order = np.argsort(starts)
+    sorted_starts, sorted_ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(sorted_ends)
+    new_group = np.empty(len(starts), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = sorted_starts[1:] > reach[:-1] + gap
+    firsts = np.flatnonzero(new_group)
+    groups = np.empty(len(starts), dtype=np.int64)
+    groups[order] = np.cumsum(new_group) - 1
+    return sorted_starts[firsts], np.maximum.reduceat(sorted_ends, firsts), groups
+
+
+def intervals_from_timestamps(timestamps, max_gap=PERIOD_GAP_SECONDS):
+    #seconds since 1970 (any order, NaN ignored) -> (starts, ends) of the periods with data,
+    #a new period starts after a gap longer than max_gap
+    times = np.asarray(timestamps, dtype=float)
+    times = np.sort(times[~np.isnan(times)])
+    if not len(times):
+        return times, times
+    breaks = np.flatnonzero(np.diff(times) > max_gap)
+    return times[np.r_[0, breaks + 1]], times[np.r_[breaks, len(times) - 1]]
+
+
+def format_instant(ts: float, upper: bool = False) -> str:
+    #seconds -> the shortest string that parse_instant reads back to the same day/second
+    #(a whole day -> 2021-03-01, otherwise 2021-03-01T12:00:00Z), open ends -> ''
+    if ts <= OPEN_START or ts >= OPEN_END:
+        return ''
+    #upper bounds are the last microsecond of the period
+    moment = datetime.fromtimestamp(ts + 1e-6 if upper else ts, tz=timezone.utc)
+    if moment.hour == moment.minute == moment.second == 0 and moment.microsecond < 10:
+        day = moment - timedelta(days=1) if upper else moment
+        return day.strftime('%Y-%m-%d')
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def merge_date_ranges(ranges, gap=ADJACENT_SECONDS) -> list:
+    #metadata_model.DateRange list -> merged DateRange list, sorted by start
+    #a period that didn't merge with another one is kept as it was written,
+    #ranges that can't be read are kept at the end
+    readable, bounds, unreadable = [], [], []
+    for date_range in ranges:
+        try:
+            bounds.append(date_range_bounds(date_range))
+            readable.append(date_range)
+        except ValueError:
+            if date_range.to_string():
+                unreadable.append(date_range)
+    if not readable:
+        return unreadable
+
+    starts, ends = np.array(bounds).T
+    merged_starts, merged_ends, groups = merge_intervals(starts, ends, gap)
+    sizes = np.bincount(groups, minlength=len(merged_starts))
+    single = {group: i for i, group in enumerate(groups) if sizes[group] == 1}
+
+    date_type = readable[0].date_type
+    merged = []
+    for group, (start_ts, end_ts) in enumerate(zip(merged_starts, merged_ends)):
+        if group in single:
+            merged.append(readable[single[group]])
+        else:
+            merged.append(type(readable[0])(start=format_instant(start_ts), end=format_instant(end_ts, upper=True),
+                                            date_type=date_type))
+    return merged + unreadable
+
+
+def envelope(ranges):
+    #the period from the earliest start to the latest end (as written), None if no range can be read
+    bounds = []
+    for date_range in ranges:
+        try:
+            bounds.append((date_range_bounds(date_range), date_range))
+        except ValueError:
+            continue
+    if not bounds:
+        return None
+    (_, first), (_, last) = min(bounds, key=lambda b: b[0][0]), max(bounds, key=lambda b: b[0][1])
+    return type(first)(start=first.start, end=last.end, date_type=first.date_type)
+
+
+def read_periods(text: str):
+    #CSV with start and end columns (or just two columns, or one "start/end" column)
+    #-> ([{'start': ..., 'end': ...}], problems)
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    rows = [row for row in csv.reader(io.StringIO(text), dialect) if any(cell.strip() for cell in row)]
+    if not rows:
+        return [], ["The file is empty"]
+
+    header = [cell.strip().lower() for cell in rows[0]]
+    if 'start' in header:
+        start_column, end_column = header.index('start'), header.index('end') if 'end' in header else None
+        rows = rows[1:]
+    else:
+        start_column, end_column = 0, 1 if len(header) > 1 else None
+
+    periods, problems = [], []
+    for number, row in enumerate(rows, 1):
+        start = row[start_column].strip() if start_column < len(row) else ''
+        end = row[end_column].strip() if end_column is not None and end_column < len(row) else ''
+        if end_column is None and '/' in start:
+            start, end = (part.strip() for part in start.split('/', 1))
+        try:
+            parse_period(f"{start}/{end}")
+        except ValueError as e:
+            problems.append(f"row {number}: {e}")
+            continue
+        periods.append({'start': start, 'end': end})
+    return periods, problems
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:20:48 2026
+
+Check the generated metadata against the DataCite 4.6 schema.
+The schema (schemas/datacite-4.6.json) is compiled once into plain python
+checks and cached, so validating a record is just running through those checks.
+
+To check whole folders of metadata files from the terminal:
+    python metadata_validate.py lint ./metadata_output
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schemas", "datacite-4.6.json")
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None}
+
+
+##################################################
+"""COMPILE THE SCHEMA"""
+##################################################
+
+def _compile(schema: dict, root: dict, refs: dict):
+    #turn one schema node into a function(value, path, errors)
+    #only the keywords used in the bundled schema are supported
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if ref not in refs:
+            #placeholder first so recursive references work
+            refs[ref] = None
+            node = root
+            for part in ref.lstrip('#/').split('/'):
+                node = node[part]
+            refs[ref] = _compile(node, root, refs)
+        return lambda value, path, errors: refs[ref](value, path, errors)
+
+    checks = []
+
+    if 'type' in schema:
+        types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        type_names = " or ".join(types)
+    else:
+        type_checks = None
+
+    if 'enum' in schema:
+        allowed = schema['enum']
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {', '.join(map(str, allowed))}")
+        checks.append(check_enum)
+
+    if 'pattern' in schema:
+        pattern = re.compile(schema['pattern'])
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append(f"{path}: {value!r} does not match {pattern.pattern}")
+        checks.append(check_pattern)
+
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+
+        def check_min_length(value, path, errors):
+            if isinstance(value, str) and len(value.strip()) < min_length:
+                errors.append(f"{path}: must not be empty")
+        checks.append(check_min_length)
+
+    if 'minimum' in schema or 'maximum' in schema:
+        minimum = schema.get('minimum')
+        maximum = schema.get('maximum')
+
+        def check_range(value, path, errors):
+            if minimum is not None and value < minimum:
+                errors.append(f"{path}: {value} is below the minimum of {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path}: {value} is above the maximum of {maximum}")
+        checks.append(check_range)
+
+    if 'required' in schema:
+        required = schema['required']
+
+        def check_required(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}: missing required property '{key}'")
+        checks.append(check_required)
+
+    if 'properties' in schema:
+        properties = {k: _compile(v, root, refs) for k, v in schema['properties'].items()}
+        additional = schema.get('additionalProperties', True)
+
+        def check_properties(value, path, errors):
+            for key, item in value.items():
+                validator = properties.get(key)
+                if validator is not None:
+                    validator(item, f"{path}.{key}", errors)
+                elif additional is False:
+                    #this is what catches typos like affiliationIdentifer or xlm:lang
+                    errors.append(f"{path}: unexpected property '{key}'")
+        checks.append(check_properties)
+
+    if 'items' in schema:
+        item_validator = _compile(schema['items'], root, refs)
+
+        def check_items(value, path, errors):
+            for i, item in enumerate(value):
+                item_validator(item, f"{path}[{i}]", errors)
+        checks.append(check_items)
+
+    if 'minItems' in schema:
+        min_items = schema['minItems']
+
+        def check_min_items(value, path, errors):
+            if len(value) < min_items:
+                errors.append(f"{path}: needs at least {min_items} entr{'y' if min_items == 1 else 'ies'}")
+        checks.append(check_min_items)
+
+    if 'anyOf' in schema:
+        options = [_compile(s, root, refs) for s in schema['anyOf']]
+
+        def check_any_of(value, path, errors):
+            for option in options:
+                option_errors = []
+                option(value, path, option_errors)
+                if not option_errors:
+                    return
+            errors.append(f"{path}: {value!r} is not an allowed value")
+        checks.append(check_any_of)
+
+    def validate(value, path, errors):
+        if type_checks is not None and not any(check(value) for check in type_checks):
+            errors.append(f"{path}: expected {type_names}, got {type(value).__name__}")
+            return
+        for check in checks:
+            check(value, path, errors)
+
+    return validate
+
+
+@lru_cache(maxsize=None)
+def get_validator(schema_path: str = SCHEMA_PATH):
+    #compile once per process
+    with open(schema_path, encoding="utf-8") as f:
+        schema = json.load(f)
+    return _compile(schema, schema, {})
+
+
+def validate_datacite(metadata: dict) -> list:
+    #returns a list of error messages, empty list means valid
+    errors = []
+    get_validator()(metadata, "$", errors)
+    return errors
+
+
+##################################################
+"""LINT FOLDERS OF METADATA FILES"""
+##################################################
+
+def find_metadata_files(paths) -> list:
+    #all json files in the given files/folders
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                files.extend(os.path.join(dirpath, f) for f in filenames if f.lower().endswith('.json'))
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def lint_file(path: str):
+    #validate one file, returns (path, errors)
+    try:
+        with open(path, 'rb') as f:
+            metadata = json.loads(f.read())
+    except (OSError, ValueError) as e:
+        return path, [f"could not read file: {e}"]
+    return path, validate_datacite(metadata)
+
+
+def lint(paths, workers: int = None):
+    #check all the files in parallel, yields (path, errors) in file order
+    files = find_metadata_files(paths)
+    if len(files) < 2 or workers == 1:
+        yield from map(lint_file, files)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(lint_file, files, chunksize=max(1, len(files) // 64))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate DataCite metadata files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    lint_parser = subparsers.add_parser("lint", help="check metadata files or whole folders")
+    lint_parser.add_argument("paths", nargs="+", help="metadata files or folders")
+    lint_parser.add_argument("--workers", type=int, default=None, help="number of parallel workers (default: all cores)")
+    lint_parser.add_argument("--quiet", action="store_true", help="only report files with errors")
+    args = parser.parse_args(argv)
+
+    checked = failed = 0
+    for path, errors in lint(args.paths, workers=args.workers):
+        checked += 1
+        if errors:
+            failed += 1
+            print(f"FAIL {path}")
+            for error in errors:
+                print(f"    {error}")
+        elif not args.quiet:
+            print(f"OK   {path}")
+
+    print(f"\n{checked} files checked, {failed} with errors")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
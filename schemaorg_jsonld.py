@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:10:52 2026
+
+schema.org JSON-LD version of the metadata, this is what search engines
+(e.g. Google Dataset Search) pick up from the Datalakes pages.
+More info : https://schema.org/Dataset
+"""
+
+from metadata_model import DatasetMetadata, ORCID_SCHEME_URI, ROR_SCHEME_URI, iter_geo_locations
+
+
+def _person_to_jsonld(person) -> dict:
+    entry = {"@type": "Person", "name": person.name}
+    if person.orcid_id:
+        entry["identifier"] = f"{ORCID_SCHEME_URI}/{person.orcid_id}"
+    if person.affiliation:
+        organization = {"@type": "Organization", "name": person.affiliation.name}
+        if person.affiliation.ror_id:
+            organization["identifier"] = f"{ROR_SCHEME_URI}/{person.affiliation.ror_id}"
+        entry["affiliation"] = organization
+    return entry
+
+
+def to_schemaorg_jsonld(record: DatasetMetadata) -> dict:
+    jsonld = {
+        "@context": "https://schema.org",
+        "@type": "Dataset",
+        "name": record.title,
+        "description": record.description,
+        "creator": [_person_to_jsonld(c) for c in record.creators],
+        "publisher": {"@type": "Organization", "name": record.publisher},
+        "datePublished": str(record.publication_year),
+        "inLanguage": record.language}
+
+    if record.contributors:
+        jsonld["contributor"] = [_person_to_jsonld(c) for c in record.contributors]
+    if record.doi:
+        jsonld["identifier"] = f"https://doi.org/{record.doi}"
+    if record.version:
+        jsonld["version"] = record.version
+    if record.license:
+        jsonld["license"] = record.license
+    if record.subjects:
+        jsonld["keywords"] = [s.subject for s in record.subjects]
+    if record.formats:
+        jsonld["encodingFormat"] = list(record.formats)
+
+    places = []
+    for location in iter_geo_locations(record):
+        place = {"@type": "Place"}
+        if location.place:
+            place["name"] = location.place
+        if location.has_point():
+            place["geo"] = {"@type": "GeoCoordinates",
+                            "latitude": location.latitude,
+                            "longitude": location.longitude}
+        #GeoShape: "south west north east" for a box, "lat lon lat lon ..." for a polygon
+        shapes = []
+        if location.box:
+            west, east, south, north = location.box
+            shapes.append({"@type": "GeoShape", "box": f"{south} {west} {north} {east}"})
+        if location.polygon:
+            shapes.append({"@type": "GeoShape",
+                           "polygon": " ".join(f"{lat} {lon}" for lat, lon in location.polygon)})
+        geo = ([place["geo"]] if "geo" in place else []) + shapes
+        if geo:
+            place["geo"] = geo[0] if len(geo) == 1 else geo
+        places.append(place)
+    if places:
+        jsonld["spatialCoverage"] = places
+
+    #schema.org takes the same ISO 8601 start/end intervals
+    collected = [d.to_string() for d in record.dates if d.date_type == "Collected" and d.to_string()]
+    if collected:
+        jsonld["temporalCoverage"] = collected[0] if len(collected) == 1 else collected
+
+    return jsonld
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 30 11:37:02 2026
+
+Keeps the memory of the app sessions in check. On a shared server (Renku) every
+browser tab is a session with its own session state, and the ORCID/ROR search
+results used to stay in it until the session ended.
+
+Search results are removed once one of them is used (in the app) and at the
+latest LOOKUP_TTL_SECONDS after the search. The size of every session is
+measured now and then (everything in its session state, objects shared between
+keys counted once) and kept per server process, so the largest sessions can be
+listed; a session over SESSION_BUDGET_BYTES is printed to the server log.
+"""
+
+import os
+import sys
+import threading
+import time
+import types
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+#session state keys of lookups, only needed until a result is picked
+TRANSIENT_PREFIXES = ('orcid_results_', 'orcid_search_performed_', 'ror_results_')
+LOOKUP_TTL_SECONDS = int(os.environ.get("METADATA_LOOKUP_TTL", 15 * 60))
+SESSION_BUDGET_BYTES = int(os.environ.get("METADATA_SESSION_BUDGET", 50 * 2**20))
+#measuring walks through everything in the session, not on every rerun
+MEASURE_SECONDS = 30
+#sessions not seen for this long are closed, they are dropped from the list
+FORGET_SECONDS = 60 * 60
+
+#kept in the session state itself
+TIMES_KEY = 'lookup_key_times'
+MEASURED_KEY = 'session_measured_at'
+
+#not part of the session, just referenced from it
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def footprint(value, seen: set = None) -> int:
+    #about the bytes of a value and everything in it, objects in seen (ids) aren't counted again
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+            continue
+        seen.add(id(obj))
+        #tables and arrays know their size better
+        if hasattr(obj, 'memory_usage') and hasattr(obj, 'columns'):
+            total += int(obj.memory_usage(deep=True).sum())
+            continue
+        if hasattr(obj, 'nbytes') and hasattr(obj, 'dtype'):
+            total += int(obj.nbytes)
+            continue
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif not isinstance(obj, (str, bytes, int, float, complex, bool, type(None))):
+            if isinstance(getattr(obj, '__dict__', None), dict):
+                stack.append(obj.__dict__)
+            for cls in type(obj).__mro__:
+                slots = getattr(cls, '__slots__', ())
+                for slot in [slots] if isinstance(slots, str) else slots:
+                    if hasattr(obj, slot):
+                        stack.append(getattr(obj, slot))
+    return total
+
+
+def format_bytes(size: int) -> str:
+    for unit in ('bytes', 'kB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'bytes' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _stamp(state, key: str) -> int:
+    #what the age of a key follows: a new search stores a new list (the flag is always True,
+    #it follows the results of the same search)
+    if key.startswith('orcid_search_performed_'):
+        return id(state.get('orcid_results_' + key[len('orcid_search_performed_'):]))
+    return id(state[key])
+
+
+def evict_stale(state, now: float = None, ttl: float = LOOKUP_TTL_SECONDS) -> list:
+    #removes lookup keys older than ttl (since the search), returns the removed keys
+    now = time.time() if now is None else now
+    times = state.get(TIMES_KEY) or {}
+    kept, evicted = {}, []
+    for key in [key for key in state.keys() if str(key).startswith(TRANSIENT_PREFIXES)]:
+        stamp = _stamp(state, key)
+        since, old_stamp = times.get(key, (now, stamp))
+        if old_stamp != stamp:
+            since = now
+        if now - since > ttl:
+            evicted.append(key)
+        else:
+            kept[key] = (since, stamp)
+    for key in evicted:
+        del state[key]
+    state[TIMES_KEY] = kept
+    return evicted
+
+
+def measure(state) -> dict:
+    #{key: bytes}, what several keys share is counted for the first one
+    seen = set()
+    return {key: footprint(state[key], seen) for key in list(state.keys())}
+
+
+@dataclass(slots=True)
+class SessionFootprint:
+    session_id: str
+    total: int
+    largest_keys: tuple  #((key, bytes), ...) the biggest ones
+    seen_at: float
+
+
+class SessionRegistry:
+    #the last measurement of each session of this server process
+    __slots__ = ("_sessions", "_lock")
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, sizes: dict, now: float = None) -> SessionFootprint:
+        now = time.time() if now is None else now
+        largest = tuple(sorted(sizes.items(), key=lambda item: -item[1])[:5])
+        entry = SessionFootprint(session_id, sum(sizes.values()), largest, now)
+        with self._lock:
+            self._sessions[session_id] = entry
+            for old_id in [s for s, e in self._sessions.items() if now - e.seen_at > FORGET_SECONDS]:
+                del self._sessions[old_id]
+        return entry
+
+    def largest(self, n=5) -> list:
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda entry: -entry.total)[:n]
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(entry.total for entry in self._sessions.values())
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+@lru_cache(maxsize=1)
+def get_registry() -> SessionRegistry:
+    #one per server process, all sessions run in it
+    return SessionRegistry()
+
+
+def track_session(session_id: str, state, now: float = None):
+    #after every rerun: old lookup results out, and now and then the size of the session
+    #returns the new measurement, None if it wasn't measured this time
+    now = time.time() if now is None else now
+    evict_stale(state, now)
+    if now - state.get(MEASURED_KEY, 0) < MEASURE_SECONDS:
+        return None
+    state[MEASURED_KEY] = now
+    entry = get_registry().record(session_id, measure(state), now)
+    if entry.total > SESSION_BUDGET_BYTES:
+        print(f"Session {session_id[:8]} uses {format_bytes(entry.total)} (budget {format_bytes(SESSION_BUDGET_BYTES)}), "
+              f"largest: {', '.join(f'{key} {format_bytes(size)}' for key, size in entry.largest_keys)}")
+    return entry
+
+
+def session_report(n=5) -> list:
+    #the largest sessions as rows for a table
+    registry = get_registry()
+    return [{'session': entry.session_id[:8],
+             'size': format_bytes(entry.total),
+             'largest keys': ', '.join(f"{key} ({format_bytes(size)})" for key, size in entry.largest_keys[:3]),
+             'last seen': time.strftime('%H:%M:%S', time.localtime(entry.seen_at))}
+            for entry in registry.largest(n)]
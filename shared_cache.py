@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 31 09:52:18 2026
+
+Cache for what all app processes look up the same way: the ORCID and ROR
+search results and the keyword index. With several streamlit processes (one
+per Renku session, or several behind a proxy) each process used to fill its
+own; with a shared store a process that was just started finds them there.
+
+The store is picked with the METADATA_CACHE environment variable:
+
+    memory                              in the process only (default)
+    sqlite:///shared/metadata_cache.sqlite
+                                        a SQLite file on a volume all processes see
+                                        (WAL, readers don't wait for a writer)
+    redis://[:password@]host:6379/0     a Redis server, or anything speaking its protocol
+
+Values are JSON (dicts, lists, text, numbers), nothing is unpickled from a
+store. A store that can't be opened or reached doesn't stop the app, the lookup is then
+just done again (see cached()), and the store is left alone for BACKOFF_SECONDS
+so the lookups don't each wait for its timeout.
+
+New stores are added with register_backend, the URL scheme picks the store:
+
+    @register_backend("my-scheme")
+    class MyCache(CacheBackend):
+        ...
+
+For trying the Redis store without a Redis server there is a small stand-in
+(GET, SET with EX/PX, DEL, EXISTS, PING, SELECT, AUTH, FLUSHDB):
+python shared_cache.py serve [--port 6379]
+"""
+
+import abc
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from urllib.parse import unquote, urlparse
+
+
+DEFAULT_CACHE = os.environ.get("METADATA_CACHE", "memory")
+#keys in a shared Redis start with this
+KEY_PREFIX = "metadata:"
+#entries kept by the in-process store
+MEMORY_MAX_ITEMS = 10000
+#the SQLite store removes expired entries every this many writes
+SQLITE_PRUNE_EVERY = 200
+#a store that failed isn't tried again for this long (METADATA_CACHE_BACKOFF)
+BACKOFF_SECONDS = float(os.environ.get("METADATA_CACHE_BACKOFF", 30))
+
+
+class CacheError(Exception):
+    pass
+
+
+#what a store that can't be opened or reached raises
+STORE_ERRORS = (OSError, sqlite3.Error, CacheError, ValueError)
+
+
+#all the known stores, URL scheme -> class
+CACHE_BACKENDS = {}
+
+
+def register_backend(scheme: str):
+    #class decorator, the class gets the parsed URL in from_url
+    def decorator(cls):
+        CACHE_BACKENDS[scheme] = cls
+        return cls
+    return decorator
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data: bytes):
+    return json.loads(data.decode('utf-8'))
+
+
+class CacheBackend(abc.ABC):
+    #get -> the value or None, set with a ttl in seconds (None: kept until deleted)
+    #a store without all three can't be created
+    name = ""
+    #time.time() until which cache_get/cache_put skip the store, after a failure
+    down_until = 0.0
+
+    @classmethod
+    def from_url(cls, url):
+        return cls()
+
+    @abc.abstractmethod
+    def get(self, key: str):
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value, ttl: float = None):
+        ...
+
+    @abc.abstractmethod
+    def delete(self, key: str):
+        ...
+
+
+##################################################
+"""STORES"""
+##################################################
+
+@register_backend("memory")
+class MemoryCache(CacheBackend):
+    #this process only, the least recently used entries go first when it is full
+    name = "memory"
+
+    def __init__(self, max_items: int = MEMORY_MAX_ITEMS):
+        self.max_items = max_items
+        self._items = OrderedDict()  #key -> (expires_at or None, JSON)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.time():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+        #stored as JSON too, so a caller changing the result doesn't change the cache
+        return _loads(entry[1])
+
+    def set(self, key: str, value, ttl: float = None):
+        with self._lock:
+            self._items[key] = (None if ttl is None else time.time() + ttl, _dumps(value))
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._items.pop(key, None)
+
+
+@register_backend("sqlite")
+class SQLiteCache(CacheBackend):
+    #a file on a shared volume, one connection per call like the other SQLite stores
+    name = "sqlite"
+    SCHEMA = "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires_at REAL)"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writes = 0
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(self.SCHEMA)
+        finally:
+            conn.close()
+
+    @classmethod
+    def from_url(cls, url):
+        #sqlite:///absolute/path or sqlite://relative/path
+        path = unquote(url.netloc + url.path)
+        if not path:
+            raise CacheError("The sqlite cache needs a file: sqlite:///path/to/metadata_cache.sqlite")
+        return cls(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        #several processes write, wait a bit for the others instead of failing
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, key: str):
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                               (key, time.time())).fetchone()
+        finally:
+            conn.close()
+        return None if row is None else _loads(row[0])
+
+    def set(self, key: str, value, ttl: float = None):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+                             (key, _dumps(value), None if ttl is None else time.time() + ttl))
+                self._writes += 1
+                if self._writes % SQLITE_PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        finally:
+            conn.close()
+
+    def delete(self, key: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        finally:
+            conn.close()
+
+
+@register_backend("redis")
+class RedisCache(CacheBackend):
+    #a Redis server, spoken to directly (RESP protocol), one connection kept per process
+    name = "redis"
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: str = None,
+                 timeout: float = 2.0):
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url):
+        db = url.path.strip('/')
+        return cls(url.hostname or "localhost", url.port or 6379, int(db) if db else 0,
+                   unquote(url.password) if url.password else None)
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        if self.password:
+            self._call('AUTH', self.password)
+        if self.db:
+            self._call('SELECT', self.db)
+
+    def _close(self):
+        for closable in (self._reader, self._sock):
+            if closable is not None:
+                try:
+                    closable.close()
+                except OSError:
+                    pass
+        self._sock = self._reader = None
+
+    def _call(self, *args):
+        parts = [a if isinstance(a, bytes) else str(a).encode('utf-8') for a in args]
+        self._sock.sendall(b''.join([b'*%d\r\n' % len(parts)] + [b'$%d\r\n%s\r\n' % (len(p), p) for p in parts]))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError("The Redis connection was closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            raise CacheError(rest.decode('utf-8'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise CacheError(f"Unexpected reply from Redis: {line[:40]!r}")
+
+    def command(self, *args):
+        #one command, connects when needed; a kept connection that broke (server restarted,
+        #idle timeout) is connected again once, a server that can't be reached isn't tried twice
+        with self._lock:
+            reconnect = self._sock is not None
+            while True:
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if not reconnect:
+                        raise
+                    reconnect = False
+
+    def get(self, key: str):
+        data = self.command('GET', KEY_PREFIX + key)
+        return None if data is None else _loads(data)
+
+    def set(self, key: str, value, ttl: float = None):
+        if ttl is None:
+            self.command('SET', KEY_PREFIX + key, _dumps(value))
+        else:
+            self.command('SET', KEY_PREFIX + key, _dumps(value), 'PX', max(1, int(ttl * 1000)))
+
+    def delete(self, key: str):
+        self.command('DEL', KEY_PREFIX + key)
+
+
+def open_cache(url: str = None) -> CacheBackend:
+    #"memory", "sqlite:///path" or "redis://host:port/db"
+    url = url or DEFAULT_CACHE
+    parsed = urlparse(url if '://' in url else url + '://')
+    try:
+        backend = CACHE_BACKENDS[parsed.scheme]
+    except KeyError:
+        raise CacheError(f"Unknown cache '{url}'. Known: {', '.join(CACHE_BACKENDS)}") from None
+    return backend.from_url(parsed)
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> CacheBackend:
+    #the store of METADATA_CACHE, once per process (raises if it can't be opened, see usable_cache)
+    return open_cache()
+
+
+#a store that can't be reached is only reported once per process
+_reported = set()
+#the store of METADATA_CACHE couldn't be opened (volume not mounted...), not tried again before this time
+_open_retry_at = 0.0
+
+
+def _report(name: str, error: Exception):
+    if name not in _reported:
+        _reported.add(name)
+        print(f"The {name} cache can't be used, going on without it "
+              f"(tried again every {BACKOFF_SECONDS:.0f} s): {error}")
+
+
+def _failed(cache: CacheBackend, error: Exception):
+    #the store is skipped for a while, then tried again
+    cache.down_until = time.time() + BACKOFF_SECONDS
+    _report(cache.name, error)
+
+
+def usable_cache(cache: CacheBackend = None):
+    #the given store or the one of METADATA_CACHE, None while it is skipped after a failure
+    global _open_retry_at
+    if cache is None:
+        if time.time() < _open_retry_at:
+            return None
+        try:
+            cache = get_cache()
+        except STORE_ERRORS as e:
+            _open_retry_at = time.time() + BACKOFF_SECONDS
+            _report(DEFAULT_CACHE.split(':')[0], e)
+            return None
+    return None if time.time() < cache.down_until else cache
+
+
+def cache_get(key: str, cache: CacheBackend = None):
+    #the stored value or None, also None when the store can't be opened or reached
+    cache = usable_cache(cache)
+    if cache is None:
+        return None
+    try:
+        return cache.get(key)
+    except STORE_ERRORS as e:
+        _failed(cache, e)
+        return None
+
+
+def cache_put(key: str, value, ttl: float = None, cache: CacheBackend = None):
+    cache = usable_cache(cache)
+    if cache is None:
+        return
+    try:
+        cache.set(key, value, ttl)
+    except STORE_ERRORS as e:
+        _failed(cache, e)
+
+
+def cached(key: str, make, ttl: float = None, cache: CacheBackend = None):
+    #the stored value of key, or make() stored for the other processes as well
+    #(None isn't stored, so a lookup that failed is tried again the next time)
+    value = cache_get(key, cache)
+    if value is None:
+        value = make()
+        if value is not None:
+            cache_put(key, value, ttl, cache)
+    return value
+
+
+##################################################
+"""STAND-IN REDIS SERVER"""
+##################################################
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.strip().split()  #inline command (e.g. typed in telnet)
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        db = 0
+        while True:
+            try:
+                args = self._read_command()
+            except (OSError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            reply, db = self.server.run(args, db)
+            self.wfile.write(reply)
+
+
+class StandInRedis(socketserver.ThreadingTCPServer):
+    #just enough of Redis for the cache, data in memory, for trying out and tests
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 6379)):
+        super().__init__(address, _StandInHandler)
+        self.data = {}  #(db, key) -> (value, expires_at or None)
+        self.lock = threading.Lock()
+
+    def _get(self, db, key):
+        entry = self.data.get((db, key))
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[(db, key)]
+            return None
+        return entry
+
+    def run(self, args, db):
+        command = args[0].decode('utf-8', 'replace').upper()
+        with self.lock:
+            if command == 'PING':
+                return b'+PONG\r\n', db
+            if command == 'AUTH':
+                return b'+OK\r\n', db
+            if command == 'SELECT' and len(args) == 2:
+                return b'+OK\r\n', int(args[1])
+            if command == 'GET' and len(args) == 2:
+                entry = self._get(db, args[1])
+                return (b'$-1\r\n' if entry is None else b'$%d\r\n%s\r\n' % (len(entry[0]), entry[0])), db
+            if command == 'SET' and len(args) >= 3:
+                expires_at = None
+                options = [a.upper() for a in args[3:]]
+                if len(options) == 2 and options[0] in (b'EX', b'PX'):
+                    expires_at = time.time() + int(options[1]) / (1 if options[0] == b'EX' else 1000)
+                self.data[(db, args[1])] = (args[2], expires_at)
+                return b'+OK\r\n', db
+            if command in ('DEL', 'EXISTS') and len(args) >= 2:
+                found = [key for key in args[1:] if self._get(db, key) is not None]
+                if command == 'DEL':
+                    for key in found:
+                        del self.data[(db, key)]
+                return b':%d\r\n' % len(found), db
+            if command == 'FLUSHDB':
+                self.data = {k: v for k, v in self.data.items() if k[0] != db}
+                return b'+OK\r\n', db
+        return b"-ERR unknown command or wrong number of arguments for '%s'\r\n" % args[0], db
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared cache of the metadata app")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the stand-in Redis server (for trying out, data in memory)")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=6379)
+    check = commands.add_parser("check", help="write and read a value in the cache of METADATA_CACHE (or --url)")
+    check.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        with StandInRedis((args.host, args.port)) as server:
+            print(f"Stand-in Redis on {args.host}:{args.port}, use METADATA_CACHE=redis://{args.host}:{args.port}/0")
+            server.serve_forever()
+    else:
+        cache = open_cache(args.url)
+        started = time.perf_counter()
+        cache.set("check", {"time": time.time()}, ttl=60)
+        value = cache.get("check")
+        print(f"{cache.name}: {'ok' if value else 'value not found'} ({(time.perf_counter() - started) * 1000:.1f} ms)")